@@ -0,0 +1,24 @@
+# app/__init__.py
+"""
+RC Car Tracker 패키지
+
+하위 모듈은 `app.server`, `app.analytics` 처럼 처음 접근할 때 로드한다.
+(import app 만으로 Flask / pyserial / NumPy 가 딸려오지 않도록)
+"""
+import importlib
+
+_SUBMODULES = {
+    "analytics", "cluster", "config", "events", "export", "heats", "history",
+    "journal", "leaderboard", "metrics", "records", "results", "server",
+    "telemetry", "wire", "bluetooth",
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,118 @@
+# app/analytics.py
+"""
+드라이버별 레이스 분석 (NumPy 벡터 연산)
+
+history.RaceStore 의 typed array 를 np.frombuffer 로 복사 없이 읽고,
+파이썬 루프 없이 bincount / lexsort 로 드라이버 단위 통계를 계산한다.
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.history import RaceStore
+from app.results import lap_splits  # 구간 정의는 /api/results 와 공유
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def _none_if_nan(value: float, digits: int = 1) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), digits)
+
+
+def driver_report(store: RaceStore, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                  driver: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    드라이버별 통계
+    - best_lap_ms / mean_lap_ms / std_lap_ms / 퍼센타일 (랩 구간 기준)
+    - consistency: 변동계수(std / mean), 작을수록 일정함
+    - improvement_ms_per_race: 레이스 평균 구간의 회귀 기울기 (음수 = 빨라지는 중)
+    """
+    n_races = len(store)
+    n_drivers = len(store.names)
+    if n_races == 0:
+        return []
+
+    # ── 열 데이터 (복사 없는 view) ─────────────────────────
+    elapsed = np.frombuffer(store.laps, dtype=np.uint32)[: store.offsets[n_races]].astype(np.float64)
+    offsets = np.frombuffer(store.offsets, dtype=np.uint64)[: n_races + 1].astype(np.int64)
+    race_driver = np.frombuffer(store.driver, dtype=np.uint32)[:n_races].astype(np.int64)
+
+    laps_per_race = np.diff(offsets)
+    splits = lap_splits(elapsed, offsets, laps_per_race)
+    race_of_lap = np.repeat(np.arange(n_races), laps_per_race)
+    lap_driver = race_driver[race_of_lap]
+
+    # ── 랩 단위 통계 ─────────────────────────────────────
+    lap_count = np.bincount(lap_driver, minlength=n_drivers)
+    lap_sum = np.bincount(lap_driver, weights=splits, minlength=n_drivers)
+    lap_sq = np.bincount(lap_driver, weights=splits * splits, minlength=n_drivers)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = lap_sum / lap_count
+        std = np.sqrt(np.clip(lap_sq / lap_count - mean * mean, 0, None))
+        cv = std / mean
+
+    # 드라이버별로 정렬된 구간 → 최저값/퍼센타일을 인덱스 계산만으로 구함
+    order = np.lexsort((splits, lap_driver))
+    sorted_splits = splits[order]
+    group_start = np.cumsum(lap_count) - lap_count
+    has_laps = lap_count > 0
+    safe_start = np.where(has_laps, group_start, 0)
+    best = np.where(has_laps, sorted_splits[safe_start] if len(sorted_splits) else np.nan, np.nan)
+
+    pct_values = {}
+    for q in percentiles:
+        pos = safe_start + (q / 100.0) * np.maximum(lap_count - 1, 0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        if len(sorted_splits):
+            lo_v, hi_v = sorted_splits[lo], sorted_splits[hi]
+            pct_values[q] = np.where(has_laps, lo_v + (hi_v - lo_v) * (pos - lo), np.nan)
+        else:
+            pct_values[q] = np.full(n_drivers, np.nan)
+
+    # ── 레이스 단위 통계 (세션별 향상도) ───────────────────
+    with np.errstate(invalid="ignore", divide="ignore"):
+        race_mean = np.bincount(race_of_lap, weights=splits, minlength=n_races) / laps_per_race
+    valid_race = laps_per_race > 0
+    race_count = np.bincount(race_driver, weights=valid_race, minlength=n_drivers)
+
+    # 드라이버 안에서 몇 번째 레이스인지 (시간순)
+    race_order = np.argsort(race_driver, kind="stable")
+    races_per_driver = np.bincount(race_driver, minlength=n_drivers)
+    ordinal = np.empty(n_races, dtype=np.float64)
+    ordinal[race_order] = np.arange(n_races) - np.repeat(np.cumsum(races_per_driver) - races_per_driver,
+                                                         races_per_driver)
+
+    x = np.where(valid_race, ordinal, 0.0)
+    y = np.where(valid_race, race_mean, 0.0)
+    sx = np.bincount(race_driver, weights=x, minlength=n_drivers)
+    sy = np.bincount(race_driver, weights=y, minlength=n_drivers)
+    sxx = np.bincount(race_driver, weights=x * x, minlength=n_drivers)
+    sxy = np.bincount(race_driver, weights=x * y, minlength=n_drivers)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = race_count * sxx - sx * sx
+        slope = np.where(denom > 0, (race_count * sxy - sx * sy) / denom, np.nan)
+
+    # ── 결과 조립 (드라이버 수만큼만 루프) ───────────────────
+    report = []
+    for code, name in enumerate(store.names):
+        if driver and name != driver:
+            continue
+        if not has_laps[code]:
+            continue
+        report.append({
+            "name": name,
+            "races": int(race_count[code]),
+            "laps": int(lap_count[code]),
+            "best_lap_ms": _none_if_nan(best[code], 0),
+            "mean_lap_ms": _none_if_nan(mean[code]),
+            "std_lap_ms": _none_if_nan(std[code]),
+            "consistency": _none_if_nan(cv[code], 4),
+            "improvement_ms_per_race": _none_if_nan(slope[code]),
+            "percentiles": {f"p{q:g}": _none_if_nan(pct_values[q][code]) for q in percentiles},
+        })
+
+    report.sort(key=lambda r: r["best_lap_ms"])
+    return report
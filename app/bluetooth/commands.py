@@ -0,0 +1,133 @@
+# app/bluetooth/commands.py
+"""
+응답 확인(ack) 기반 명령 채널
+
+펌웨어는 요청 ID 를 지원하지 않으므로, 기대 응답(예: START → WAITING_FOR_TRIGGER)이
+같은 명령들끼리 보낸 순서(FIFO)로 짝을 맞춘다. 응답이 없으면 timeout 마다 재전송하고,
+재시도까지 모두 실패하면 Future 에 CommandError 를 넣는다.
+
+왕복 시간은 재전송이 없었던 명령만 히스토그램에 기록한다 (재전송된 명령은
+어느 전송에 대한 응답인지 알 수 없으므로 제외 - Karn 알고리즘).
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, Optional
+
+from app import metrics
+
+RTT_HISTOGRAM = "command_rtt_ms"
+
+
+class CommandError(Exception):
+    """명령 전송/응답 실패"""
+
+
+class _Pending:
+    __slots__ = ("cmd", "expect", "future", "sent_at", "attempts", "retries", "timeout", "timer", "resolved")
+
+    def __init__(self, cmd: str, expect: str, timeout: float, retries: int):
+        self.cmd = cmd
+        self.expect = expect
+        self.future: Future = Future()
+        self.sent_at = 0.0
+        self.attempts = 0
+        self.retries = retries
+        self.timeout = timeout
+        self.timer: Optional[threading.Timer] = None
+        self.resolved = False  # 결과를 넣을 쪽이 락 안에서 True 로 바꿈
+
+
+class CommandChannel:
+    """명령 전송 + 응답 대기 (writer 는 한 줄을 보내고 성공 여부를 반환하는 함수)"""
+
+    def __init__(self, writer: Callable[[str], bool]):
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Deque[_Pending]] = {}
+        self.rtt = metrics.histogram(RTT_HISTOGRAM)
+
+    def request(self, cmd: str, expect: str, timeout: float = 2.0, retries: int = 2) -> Future:
+        """
+        명령을 보내고 Future 를 즉시 반환
+        성공: 왕복 시간(ms, 재전송 시 마지막 전송 기준) / 실패: CommandError
+        """
+        pending = _Pending(cmd, expect, timeout, retries)
+        with self._lock:
+            self._pending.setdefault(expect, deque()).append(pending)
+        self._send(pending)
+        return pending.future
+
+    def _send(self, pending: _Pending) -> None:
+        with self._lock:
+            if pending.resolved:
+                return
+            pending.attempts += 1
+            pending.sent_at = time.perf_counter()
+            pending.timer = threading.Timer(pending.timeout, self._on_timeout, args=(pending,))
+            pending.timer.daemon = True
+            pending.timer.start()
+        if pending.attempts > 1:
+            metrics.inc("command_retries")
+            print(f"🔁 [TX] 재전송 ({pending.attempts - 1}/{pending.retries}): {pending.cmd}")
+        if not self._writer(pending.cmd):
+            # 포트가 닫혀 있음 → 재시도해도 소용없으니 바로 실패 (/start 가 timeout 만큼 막히지 않도록)
+            metrics.inc("command_write_failures")
+            with self._lock:
+                if pending.resolved:
+                    return
+                pending.resolved = True
+                queue = self._pending.get(pending.expect)
+                if queue and pending in queue:
+                    queue.remove(pending)
+            pending.timer.cancel()
+            print(f"❌ [TX] 전송 실패 (포트 닫힘): {pending.cmd}")
+            pending.future.set_exception(CommandError(f"Serial port not open, '{pending.cmd}' not sent"))
+
+    def _on_timeout(self, pending: _Pending) -> None:
+        with self._lock:
+            if pending.resolved:
+                return
+            give_up = pending.attempts > pending.retries
+            if give_up:
+                pending.resolved = True
+                queue = self._pending.get(pending.expect)
+                if queue and pending in queue:
+                    queue.remove(pending)
+        if give_up:
+            metrics.inc("command_timeouts")
+            print(f"❌ [TX] 응답 없음: {pending.cmd} (시도 {pending.attempts}회)")
+            pending.future.set_exception(
+                CommandError(f"No '{pending.expect}' reply to '{pending.cmd}' after {pending.attempts} attempts"))
+        else:
+            self._send(pending)
+
+    def on_line(self, line: str) -> bool:
+        """수신 줄이 대기 중인 명령의 응답이면 처리하고 True"""
+        with self._lock:
+            queue = self._pending.get(line)
+            if not queue:
+                return False
+            pending = queue.popleft()
+            pending.resolved = True
+            if pending.timer:
+                pending.timer.cancel()
+            rtt_ms = (time.perf_counter() - pending.sent_at) * 1000
+        if pending.attempts == 1:
+            self.rtt.observe(rtt_ms)
+        print(f"✅ [ACK] {pending.cmd} → {line} ({rtt_ms:.0f} ms)")
+        pending.future.set_result(round(rtt_ms, 1))
+        return True
+
+    def cancel_all(self, reason: str) -> None:
+        """대기 중인 명령을 모두 실패 처리 (포트 교체 등)"""
+        with self._lock:
+            pendings = [p for q in self._pending.values() for p in q]
+            self._pending.clear()
+            for pending in pendings:
+                pending.resolved = True
+        for pending in pendings:
+            if pending.timer:
+                pending.timer.cancel()
+            pending.future.set_exception(CommandError(reason))
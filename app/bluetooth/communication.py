@@ -1,17 +1,64 @@
+from concurrent.futures import Future
+
 from app.bluetooth.state import runner, lap_data, race_status
-from app.bluetooth.listener import send_command  # ✅ 새로 추가한 함수만 사용
+from app.bluetooth.listener import request_command, request_telemetry  # ✅ 응답 확인 명령 채널
+from app.events import publish_command_result, publish_target_set, publish_reset
+from app.journal import record_target_set, record_reset  # ✅ 크래시 복구용 저널
+from app import telemetry
+
+def _report_ack(cmd):
+    """명령 응답 결과를 SSE command 이벤트로 알리는 Future 콜백"""
+    def report(future):
+        error = future.exception()
+        if error:
+            publish_command_result(cmd, False, error=str(error))
+        else:
+            publish_command_result(cmd, True, rtt_ms=future.result())
+    return report
 
 def set_target_runner(name, laps):
-    runner["name"] = name
-    runner["total_laps"] = laps
-    lap_data.clear()
-    race_status["ended"] = False
-    race_status["avg_lap_time"] = 0
-    race_status["start_time"] = None
+    """
+    START 명령 전송, 펌웨어가 WAITING_FOR_TRIGGER 로 응답하면 러너 지정
+    반환값: 러너 지정까지 끝나면 완료되는 Future (결과: 왕복 ms, 실패: CommandError)
+
+    응답 전에 러너를 바꾸면 START 가 실패해도 대상이 바뀐 채로 남고 target_set 이
+    나가므로 (히트 대기열이 없는 레이스를 진행 중으로 봄), 상태 변경은 응답 후에만 한다.
+    응답 줄을 처리하는 리스너 스레드에서 바로 적용되므로 그 뒤의 LAP 은 새 러너로 기록된다.
+    """
+    started = Future()
+
+    def apply(ack):
+        error = ack.exception()
+        if error:
+            print(f"⚠️ START 실패, 대상 유지: {error}")
+            started.set_exception(error)
+            return
+        runner["name"] = name
+        runner["total_laps"] = laps
+        lap_data.clear()
+        race_status["ended"] = False
+        race_status["avg_lap_time"] = 0
+        race_status["start_time"] = None
+
+        record_target_set(name, laps)
+        print(f"🎯 Target set: {name}, {laps} laps")
+        publish_target_set(name, laps)
+        started.set_result(ack.result())
 
-    print(f"🎯 Target set: {name}, {laps} laps")
     # 포트는 listener가 이미 열어둠 → 거기로 전송
-    send_command(f"START {laps}")
+    cmd = f"START {laps}"
+    request_command(cmd, expect="WAITING_FOR_TRIGGER").add_done_callback(apply)
+    started.add_done_callback(_report_ack(cmd))
+    return started
+
+def set_telemetry(enabled):
+    """
+    센서 거리 스트리밍 켜기/끄기
+    반환값: 펌웨어의 TELEMETRY_ON / TELEMETRY_OFF 응답 후 상태까지 바뀌면 완료되는 Future (결과: 왕복 ms)
+    """
+    ack = request_telemetry(enabled)
+    ack.add_done_callback(_report_ack(telemetry.command(enabled)[0]))
+    return ack
 
 def reset_lap_data():
     lap_data.clear()
@@ -19,6 +66,8 @@ def reset_lap_data():
     runner["total_laps"] = 0
     race_status["ended"] = False
     race_status["avg_lap_time"] = 0
+    record_reset()
+    publish_reset()
     print("🧹 Lap 데이터 초기화 완료")
 
 
@@ -46,7 +95,7 @@ def get_current_laps():
         avg_ms = sum(durations) // len(durations)
 
     return {
-        "lap_times": laps,
+        "lap_times": laps.tolist(),
         "ended": ended,
         "avg_lap_time": avg_ms,  # ms
         "avg_time": avg_ms,      # 호환 키
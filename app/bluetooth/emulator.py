@@ -0,0 +1,391 @@
+# app/bluetooth/emulator.py
+"""
+랩 타이머 펌웨어 에뮬레이터 (lap/bluetooth_lap_timer/bluetooth_lap_timer.ino)
+
+스케치의 상태기계(START n → WAITING_FOR_TRIGGER → RACE_STARTED → LAP:<ms> → RACE_ENDED,
+PING → PONG 에코, TELEMETRY ON/OFF → D:<cm>, 3초 쿨다운, 50ms 센서 주기)를 그대로 따라 하면서, 가상의 차가 센서 앞을 지나가게 한다.
+리스너는 TCP(socket://127.0.0.1:7777) 또는 pty(/dev/pts/N) 를 COM 포트처럼 연다.
+
+    # 차 3대 (포트 7777, 7778, 7779), 실제보다 20배 빠르게
+    python -m app.bluetooth.emulator --cars 3 --port 7777 --speed 20
+
+    # 평균 8초 ± 0.5초 랩, 통과 누락 2%, 노이즈 5%, 송신 줄 손실 1%
+    python -m app.bluetooth.emulator --lap-mean 8 --lap-sd 0.5 --miss 0.02 --noise 0.05 --drop 0.01
+
+    SERIAL_PORT=socket://127.0.0.1:7777 python main.py
+
+스크립트에서 쓸 때는 CarProfile / Emulator 를 직접 만들고 serve_tcp() 또는 serve_pty() 를 호출한다.
+"""
+import argparse
+import math
+import os
+import random
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+# ── 스케치와 같은 상수 ─────────────────────────────────────
+COOLDOWN_TIME = 3000      # ms
+DETECT_DISTANCE = 15      # cm 미만이면 감지
+LOOP_DELAY = 50           # ms, loop() 마지막 delay(50)
+FAR_DISTANCE = 200        # 아무것도 없을 때 거리 (cm)
+NEAR_DISTANCE = 5         # 차가 지나갈 때 거리 (cm)
+
+PTY_OUTAGE = 1.0          # 초, pty 에서 --disconnect-every 로 끊긴 뒤 다시 응답하기까지
+
+
+@dataclass
+class CarProfile:
+    """가상 차량 설정 (시간 단위: ms)"""
+    name: str = "car1"
+    lap_mean_ms: float = 10000.0
+    lap_sd_ms: float = 800.0
+    distribution: str = "normal"      # normal | uniform | lognormal
+    min_lap_ms: float = 3500.0        # 쿨다운(3초)보다 짧은 랩은 현실적으로 없음
+    pass_ms: float = 250.0            # 센서 앞을 지나가는 시간
+    start_delay_ms: float = 1500.0    # WAITING_FOR_TRIGGER 이후 첫 통과까지
+    miss_prob: float = 0.0            # 통과를 센서가 놓칠 확률
+    noise_prob: float = 0.0           # 통과 직후 반사 등으로 한 번 더 가까운 값이 잡힐 확률
+    seed: Optional[int] = None
+
+    def next_lap_ms(self, rng: random.Random) -> float:
+        if self.distribution == "uniform":
+            half = self.lap_sd_ms * 3 ** 0.5   # 표준편차가 lap_sd_ms 인 균등분포
+            lap = rng.uniform(self.lap_mean_ms - half, self.lap_mean_ms + half)
+        elif self.distribution == "lognormal":
+            sigma2 = (self.lap_sd_ms / self.lap_mean_ms) ** 2
+            mu = math.log(self.lap_mean_ms) - math.log(1 + sigma2) / 2
+            lap = rng.lognormvariate(mu, math.log(1 + sigma2) ** 0.5)
+        else:
+            lap = rng.gauss(self.lap_mean_ms, self.lap_sd_ms)
+        return max(self.min_lap_ms, lap)
+
+
+class LapTimerFirmware:
+    """스케치의 전역 변수 + loop() 한 번을 그대로 옮긴 상태기계"""
+
+    def __init__(self):
+        self.is_waiting = False
+        self.is_racing = False
+        self.lap_count = 0
+        self.total_laps = 0
+        self.lap_start_time = 0
+        self.last_detection_time = 0
+        self.is_object_detected = False
+        self.telemetry = False
+
+    def can_detect_new_lap(self, now: int) -> bool:
+        return (now - self.last_detection_time) >= COOLDOWN_TIME
+
+    def handle_command(self, cmd: str) -> List[str]:
+        out = []
+        if cmd.startswith("START"):
+            try:
+                self.total_laps = int(cmd[6:].strip() or 0)
+            except ValueError:
+                self.total_laps = 0   # String.toInt() 은 실패 시 0
+            self.lap_count = 0
+            self.is_waiting = True
+            self.is_racing = False
+            self.last_detection_time = 0
+            self.is_object_detected = False
+            out.append("WAITING_FOR_TRIGGER")
+        elif cmd.startswith("PING"):
+            out.append("PONG" + cmd[4:])   # 링크 품질 측정용 에코
+        elif cmd.startswith("TELEMETRY"):
+            self.telemetry = cmd.endswith("ON")
+            out.append("TELEMETRY_ON" if self.telemetry else "TELEMETRY_OFF")
+        return out
+
+    def loop(self, now: int, distance: float) -> List[str]:
+        """loop() 의 센서 처리 부분 (명령 처리는 handle_command)"""
+        out = []
+        if self.is_waiting and distance < DETECT_DISTANCE:
+            if not self.is_object_detected and self.can_detect_new_lap(now):
+                self.lap_start_time = now
+                self.is_waiting = False
+                self.is_racing = True
+                self.last_detection_time = now
+                out.append("RACE_STARTED")
+            self.is_object_detected = True
+        elif self.is_waiting and distance >= DETECT_DISTANCE:
+            self.is_object_detected = False
+
+        if self.is_racing and distance < DETECT_DISTANCE:
+            if not self.is_object_detected and self.can_detect_new_lap(now):
+                current_lap = now - self.lap_start_time
+                self.lap_count += 1
+                self.last_detection_time = now
+                out.append(f"LAP:{current_lap}")
+                if self.lap_count >= self.total_laps:
+                    self.is_racing = False
+                    out.append("RACE_ENDED")
+            self.is_object_detected = True
+        elif self.is_racing and distance >= DETECT_DISTANCE:
+            self.is_object_detected = False
+        return out
+
+
+class VirtualTrack:
+    """차가 센서 앞을 지나가는 시간대를 만들고 그 시점의 거리값을 돌려줌"""
+
+    def __init__(self, car: CarProfile, rng: random.Random):
+        self.car = car
+        self.rng = rng
+        self.windows: List[List[float]] = []   # [시작, 끝] (ms)
+        self.next_pass: Optional[float] = None
+
+    def arm(self, now: int) -> None:
+        self.windows.clear()
+        self.next_pass = now + self.car.start_delay_ms
+
+    def stop(self) -> None:
+        self.next_pass = None
+
+    def distance(self, now: int) -> float:
+        # 다음 통과 예약 → 감지 구간 생성
+        while self.next_pass is not None and self.next_pass <= now + LOOP_DELAY:
+            start = self.next_pass
+            if self.rng.random() >= self.car.miss_prob:
+                self.windows.append([start, start + self.car.pass_ms])
+                if self.rng.random() < self.car.noise_prob:
+                    # 통과 직후 짧은 반사 (보통 쿨다운에 걸러짐)
+                    echo = start + self.car.pass_ms + self.rng.uniform(100, 2 * COOLDOWN_TIME)
+                    self.windows.append([echo, echo + LOOP_DELAY])
+            self.next_pass = start + self.car.next_lap_ms(self.rng)
+
+        self.windows = [w for w in self.windows if w[1] >= now]
+        for start, end in self.windows:
+            if start <= now <= end:
+                return NEAR_DISTANCE
+        return FAR_DISTANCE
+
+
+class Emulator:
+    """
+    가상 랩 타이머 한 대
+    - speed: 시뮬레이션 배속 (20 → 실제 1초에 20초 진행, LAP 값도 시뮬레이션 ms)
+    - drop_prob: 송신 줄을 잃어버릴 확률 (블루투스 손실)
+    - disconnect_every: N초(실제 시간)마다 연결을 끊음 (0 = 안 끊음)
+    """
+
+    def __init__(self, car: CarProfile, speed: float = 1.0, drop_prob: float = 0.0,
+                 disconnect_every: float = 0.0, verbose: bool = True):
+        self.car = car
+        self.speed = speed
+        self.drop_prob = drop_prob
+        self.disconnect_every = disconnect_every
+        self.verbose = verbose
+        self.rng = random.Random(car.seed)
+        self.firmware = LapTimerFirmware()
+        self.track = VirtualTrack(car, self.rng)
+        self._sensor_rng = random.Random(car.seed)   # 텔레메트리 노이즈 (랩 시간 난수열과 분리)
+        self.sent = 0
+        self.dropped = 0
+        self._t0 = time.perf_counter()
+        self._stop = threading.Event()
+
+    def millis(self) -> int:
+        return int((time.perf_counter() - self._t0) * self.speed * 1000)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _log(self, msg: str) -> None:
+        if self.verbose:
+            print(f"[{self.car.name}] {msg}", flush=True)
+
+    # ── 전송 계층 공통 루프 ────────────────────────────────
+    def run(self, read_fn, write_fn) -> None:
+        """
+        read_fn(timeout) -> bytes (연결 끊김: None), write_fn(bytes)
+        실제 시간이 시뮬레이션 시간을 따라잡을 때만 대기하므로 높은 배속에서도 tick 이 밀리지 않는다.
+        """
+        rx = b""
+        sim_now = self.millis()
+        connected_at = time.perf_counter()
+        while not self._stop.is_set():
+            if self.disconnect_every and time.perf_counter() - connected_at >= self.disconnect_every:
+                self._log("🔌 링크 끊김 (시뮬레이션)")
+                return
+
+            # 다음 tick 까지 실제 시간으로 남은 만큼만 수신 대기
+            wait = max(0.0, (sim_now - self.millis()) / 1000 / self.speed)
+            data = read_fn(wait)
+            if data is None:
+                self._log("🔌 상대가 연결을 끊음")
+                return
+            rx += data
+            if self.millis() < sim_now:
+                continue
+
+            out = []
+            # Serial.available() → readStringUntil('\n') 은 loop 한 번에 한 줄
+            if b"\n" in rx:
+                line, rx = rx.split(b"\n", 1)
+                cmd = line.decode(errors="ignore").strip()
+                self._log(f"📥 {cmd}")
+                out += self.firmware.handle_command(cmd)
+                if cmd.startswith("START"):
+                    self.track.arm(sim_now)
+
+            distance = self.track.distance(sim_now)
+            if self.firmware.telemetry:
+                # 실제 센서처럼 ±몇 cm 흔들림 (감지 판단에는 영향 없음)
+                out.append(f"D:{max(0, round(distance + self._sensor_rng.gauss(0, 1.5)))}")
+            out += self.firmware.loop(sim_now, distance)
+            if not (self.firmware.is_waiting or self.firmware.is_racing):
+                self.track.stop()
+
+            for msg in out:
+                if self.rng.random() < self.drop_prob:
+                    self.dropped += 1
+                    self._log(f"💨 (손실) {msg}")
+                    continue
+                self.sent += 1
+                self._log(f"📤 {msg}")
+                write_fn((msg + "\r\n").encode())   # Serial.println 은 CRLF
+
+            sim_now += LOOP_DELAY
+
+    # ── TCP ───────────────────────────────────────────────
+    def serve_tcp(self, port: int, host: str = "127.0.0.1") -> None:
+        """socket://host:port 로 접속하는 리스너를 한 번에 하나씩 받는다"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((host, port))
+        server.listen(1)
+        server.settimeout(0.5)
+        self._log(f"📡 socket://{host}:{port} 대기 중")
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, addr = server.accept()
+                except socket.timeout:
+                    continue
+                self._log(f"🔗 연결됨: {addr[0]}:{addr[1]}")
+                with conn:
+                    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+                    def read(timeout, conn=conn):
+                        ready, _, _ = select.select([conn], [], [], timeout)
+                        if not ready:
+                            return b""
+                        try:
+                            data = conn.recv(4096)
+                        except OSError:
+                            return None
+                        return data or None
+
+                    def write(data, conn=conn):
+                        try:
+                            conn.sendall(data)
+                        except OSError:
+                            pass
+
+                    self.run(read, write)
+        finally:
+            server.close()
+
+    # ── pty (Linux / macOS) ───────────────────────────────
+    def serve_pty(self) -> str:
+        """가상 시리얼 포트를 만들고 경로를 반환 (에뮬레이터는 백그라운드 스레드에서 동작)"""
+        import tty
+
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        path = os.ttyname(slave)
+        self._log(f"📡 가상 시리얼 포트: {path}")
+
+        def read(timeout):
+            ready, _, _ = select.select([master], [], [], timeout)
+            if not ready:
+                return b""
+            try:
+                return os.read(master, 4096)
+            except OSError:
+                return b""
+
+        def write(data):
+            try:
+                os.write(master, data)
+            except OSError:
+                pass
+
+        def serve():
+            # pty 는 닫았다 다시 열 수 없으므로, 끊김은 PTY_OUTAGE 초 동안 수신을 버리고 응답하지 않는 것으로 흉내
+            # (TCP 의 accept 루프처럼 run() 이 끝나도 스레드는 계속 돈다)
+            while not self._stop.is_set():
+                self.run(read, write)
+                if self._stop.is_set():
+                    break
+                outage_end = time.perf_counter() + PTY_OUTAGE
+                while time.perf_counter() < outage_end and not self._stop.is_set():
+                    read(max(0.0, outage_end - time.perf_counter()))
+                self._log("🔗 링크 복구 (시뮬레이션)")
+
+        threading.Thread(target=serve, daemon=True, name=f"emulator-{self.car.name}").start()
+        return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RC Tracker 랩 타이머 펌웨어 에뮬레이터")
+    parser.add_argument("--cars", type=int, default=1, help="가상 차량(랩 타이머) 수")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777, help="첫 번째 차량 TCP 포트 (차량마다 +1)")
+    parser.add_argument("--pty", action="store_true", help="TCP 대신 pty 가상 시리얼 포트 사용")
+    parser.add_argument("--speed", type=float, default=1.0, help="시뮬레이션 배속")
+    parser.add_argument("--lap-mean", type=float, default=10.0, help="평균 랩 시간 (초)")
+    parser.add_argument("--lap-sd", type=float, default=0.8, help="랩 시간 표준편차 (초)")
+    parser.add_argument("--dist", choices=("normal", "uniform", "lognormal"), default="normal")
+    parser.add_argument("--spread", type=float, default=0.1, help="차량 간 평균 랩 차이 비율")
+    parser.add_argument("--miss", type=float, default=0.0, help="통과 누락 확률")
+    parser.add_argument("--noise", type=float, default=0.0, help="노이즈(중복 감지 시도) 확률")
+    parser.add_argument("--drop", type=float, default=0.0, help="송신 줄 손실 확률")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="N초마다 링크 끊기")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    emulators = []
+    for i in range(args.cars):
+        car = CarProfile(
+            name=f"car{i + 1}",
+            lap_mean_ms=args.lap_mean * 1000 * (1 + rng.uniform(-args.spread, args.spread)),
+            lap_sd_ms=args.lap_sd * 1000,
+            distribution=args.dist,
+            miss_prob=args.miss,
+            noise_prob=args.noise,
+            seed=None if args.seed is None else args.seed + i,
+        )
+        emulators.append(Emulator(car, speed=args.speed, drop_prob=args.drop,
+                                  disconnect_every=args.disconnect_every, verbose=not args.quiet))
+
+    threads = []
+    for i, emu in enumerate(emulators):
+        if args.pty:
+            path = emu.serve_pty()
+            print(f"SERIAL_PORT={path}")
+        else:
+            t = threading.Thread(target=emu.serve_tcp, args=(args.port + i, args.host), daemon=True)
+            t.start()
+            threads.append(t)
+            print(f"SERIAL_PORT=socket://{args.host}:{args.port + i}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for emu in emulators:
+            emu.stop()
+        total_sent = sum(e.sent for e in emulators)
+        total_dropped = sum(e.dropped for e in emulators)
+        print(f"\n👋 종료: 송신 {total_sent}줄, 손실 {total_dropped}줄")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,34 @@
 # app/bluetooth/listener.py
 
 import threading
-import serial
+from concurrent.futures import Future
 from time import time
 from app.bluetooth.state import runner, lap_data, race_status
 from app.leaderboard import insert_result
-from app.bluetooth.port_scanner import find_first_usable_port
+from app.history import append_race
 from app.events import (
     publish_race_started,
     publish_lap,
     publish_race_ended,
 )
-from app.config import CONFIG
+from app.config import get_config, subscribe
+from app.journal import (  # ✅ 크래시 복구용 저널 (큐에 넣기만 하므로 랩 처리 지연 없음)
+    record_race_started,
+    record_lap,
+    record_race_ended,
+    record_result_saved,
+)
+from app.bluetooth.commands import CommandChannel
+from app import telemetry
+
+# 시리얼 오류 후 재연결 대기 시간 (초)
+RECONNECT_DELAY = 3.0
+
+# LAP 값 상한 (lap_data 는 uint32 배열)
+LAP_MAX = 0xFFFFFFFF
 
-# ✅ CONFIG에서 설정값 가져오기
-BAUDRATE = CONFIG.serial.baudrate
-LISTENING_PORT = CONFIG.serial.port
+# ✅ 설정 변경으로 포트를 다시 열어야 할 때 set
+_reopen = threading.Event()
 
 # ✅ 전역 시리얼 핸들
 SER_HANDLE = None
@@ -41,39 +54,123 @@ def send_command(cmd: str) -> bool:
         return False
 
 
+def _on_config_change(old, new):
+    """시리얼 설정이 바뀌면 리스너가 포트를 다시 열도록 알림"""
+    if old.serial != new.serial:
+        print(f"🔁 시리얼 설정 변경: {old.serial.port}@{old.serial.baudrate} → "
+              f"{new.serial.port}@{new.serial.baudrate}")
+        _reopen.set()
+    if old.telemetry.enabled != new.telemetry.enabled:
+        request_telemetry(new.telemetry.enabled)
+
+
+# ✅ 응답 확인 명령 채널 (START n → WAITING_FOR_TRIGGER)
+COMMANDS = CommandChannel(send_command)
+
+
+def request_command(cmd: str, expect: str):
+    """명령을 보내고 응답을 기다리는 Future 반환 (timeout/재시도는 현재 설정 기준)"""
+    serial_cfg = get_config().serial
+    return COMMANDS.request(cmd, expect, timeout=serial_cfg.command_timeout,
+                            retries=serial_cfg.command_retries)
+
+
+def request_telemetry(enabled: bool) -> Future:
+    """
+    TELEMETRY ON/OFF 전송, 펌웨어 응답을 받은 뒤에만 telemetry 상태 반영
+    반환값: 상태 반영까지 끝나면 완료되는 Future (결과: 왕복 ms, 실패: CommandError)
+    응답은 리스너 스레드가 처리하므로 리스너 스레드에서는 기다리지 말 것
+    """
+    applied = Future()
+    cmd, expect = telemetry.command(enabled)
+
+    def apply(ack):
+        error = ack.exception()
+        if error:
+            print(f"⚠️ 텔레메트리 {cmd} 실패: {error}")
+            applied.set_exception(error)
+            return
+        telemetry.set_enabled(enabled)
+        applied.set_result(ack.result())
+
+    request_command(cmd, expect).add_done_callback(apply)
+    return applied
+
+
 def start_listener(insert_result_callback):
+    subscribe(_on_config_change)
+
     def listen():
         global SER_HANDLE
-        try:
-            with serial.Serial(LISTENING_PORT, BAUDRATE, timeout=CONFIG.serial.timeout) as ser:
-                SER_HANDLE = ser  # ✅ 전역 핸들 보관
-                print(f"📡 Listening on {LISTENING_PORT} (baudrate: {BAUDRATE})...")
-                while True:
-                    if ser.in_waiting:
+        # ✅ pyserial 은 리스너 스레드에서 지연 import (웹 서버 기동을 막지 않음)
+        import serial
+
+        # 포트 감시 루프: 오류가 나면 재연결, 설정이 바뀌면 새 포트로 다시 연다
+        while True:
+            _reopen.clear()
+            serial_cfg = get_config().serial
+            try:
+                # serial_for_url: COM5 같은 일반 포트 외에 socket://host:port, loop:// 도 열 수 있음
+                with serial.serial_for_url(serial_cfg.port, serial_cfg.baudrate,
+                                           timeout=serial_cfg.timeout) as ser:
+                    SER_HANDLE = ser  # ✅ 전역 핸들 보관
+                    print(f"📡 Listening on {serial_cfg.port} (baudrate: {serial_cfg.baudrate})...")
+                    if telemetry.is_wanted():
+                        # 펌웨어가 재부팅되면 꺼져 있으므로 열 때마다 다시 켬 (응답은 아래 루프에서 처리)
+                        request_telemetry(True)
+                    while not _reopen.is_set():
+                        # in_waiting 폴링 대신 timeout 이 있는 블로킹 readline (CPU 점유 없음)
                         raw = ser.readline()
-                        decoded = raw.decode(errors="ignore").strip()
-                        if decoded:
-                            handle_message(decoded, insert_result_callback)
-        except Exception as e:
-            print(f"❌ Serial Error: {e}")
+                        if raw:
+                            handle_raw(raw, insert_result_callback)
+            except Exception as e:
+                print(f"❌ Serial Error: {e}")
+            finally:
+                SER_HANDLE = None
+                COMMANDS.cancel_all("Serial port closed")
+                telemetry.port_closed()
+
+            if not _reopen.is_set():
+                # 설정 변경이 오면 대기 없이 바로 다시 연다
+                _reopen.wait(RECONNECT_DELAY)
 
     thread = threading.Thread(target=listen)
     thread.daemon = True
     thread.start()
 
 
+def handle_raw(raw: bytes, insert_result_callback):
+    """시리얼에서 읽은 한 줄 처리"""
+    # ✅ 텔레메트리(D:<cm>, 20Hz)는 디코딩/출력/이벤트 없이 링 버퍼로 (랩 처리 경로와 분리)
+    if raw.startswith(telemetry.PREFIX):
+        telemetry.ingest_line(raw)
+        return
+    decoded = raw.decode(errors="ignore").strip()
+    if decoded:
+        handle_message(decoded, insert_result_callback)
+
+
 def handle_message(line, insert_result_callback):
     print(f"📥 수신 데이터: {line}")
 
+    # 명령 응답(ack)이면 대기 중인 요청을 완료
+    if COMMANDS.on_line(line):
+        return
+
     if line == "RACE_STARTED":
         race_status["ended"] = False
         race_status["start_time"] = int(time() * 1000)
+        record_race_started(race_status["start_time"])
         publish_race_started(race_status["start_time"])
         print("🚦 경주 시작됨")
 
     elif line.startswith("LAP:"):
         try:
             lap_time = int(line[4:])
+            if not 0 <= lap_time <= LAP_MAX:
+                # array('I') 에 넣을 수 없는 값 (OverflowError 로 리스너가 포트를 다시 열지 않도록)
+                print(f"⚠️ LAP 값 범위 초과, 무시됨: {lap_time}")
+                return
             name = runner["name"]
             total = runner["total_laps"]
 
@@ -82,6 +179,7 @@ def handle_message(line, insert_result_callback):
                 return
 
             lap_data[name].append(lap_time)
+            record_lap(lap_time)
             print(f"⏱️ {name} - Lap {len(lap_data[name])}: {lap_time} ms")
 
             # 구간 시간(seg) 계산
@@ -98,11 +196,16 @@ def handle_message(line, insert_result_callback):
                 durations = [laps[i] - laps[i - 1] for i in range(1, len(laps))]
                 avg = sum(durations) // len(durations)
 
+                started_at = race_status.get("start_time")
                 race_status["ended"] = True
                 race_status["avg_time"] = avg
                 race_status["start_time"] = laps[0]
 
-                insert_result_callback(name, total, avg)
+                # ✅ 분석/내보내기용 전체 기록 (랩 구간 포함) → 그 race_id 로 리더보드에 저장
+                # (저장 완료 기록 전에 죽어도 복구 시 race_id 로 이미 저장된 쪽은 건너뜀)
+                race_id = append_race(name, total, laps, started_at)
+                insert_result_callback(name, total, avg, race_id)
+                record_result_saved()
                 print(f"✅ {name} 완료! 평균: {avg}ms")
 
         except ValueError:
@@ -110,5 +213,7 @@ def handle_message(line, insert_result_callback):
 
     elif line == "RACE_ENDED":
         race_status["ended"] = True
-        publish_race_ended(int(time() * 1000))
+        ended_at = int(time() * 1000)
+        record_race_ended(ended_at)
+        publish_race_ended(ended_at)
         print("🏁 경주 종료")
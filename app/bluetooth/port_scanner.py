@@ -1,6 +1,7 @@
-import serial.tools.list_ports
-
 def find_first_usable_port(exclude_ports=None):
+    import serial
+    import serial.tools.list_ports
+
     exclude_ports = exclude_ports or []
     ports = serial.tools.list_ports.comports()
     candidates = [p.device for p in ports if p.device not in exclude_ports]
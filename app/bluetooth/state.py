@@ -1,12 +1,15 @@
 # app/bluetooth/state.py
+from array import array
 from collections import defaultdict
+from app.records import LAP_TYPECODE
 
 runner = {
     "name": None,
     "total_laps": 0
 }
 
-lap_data = defaultdict(list)
+# ✅ 드라이버별 누적 랩 시간 (uint32 ms 배열)
+lap_data = defaultdict(lambda: array(LAP_TYPECODE))
 
 race_status = {
     "ended": False,
@@ -21,6 +24,27 @@ def reset_state():
     race_status["ended"] = False
     race_status["avg_time"] = 0
 
+def snapshot():
+    """현재 레이스 상태 (JSON 직렬화 가능, 클러스터 복제용)"""
+    name = runner["name"]
+    return {
+        "runner": dict(runner),
+        "lap_times": lap_data[name].tolist() if name in lap_data else [],
+        "race_status": dict(race_status),
+    }
+
+def restore(snap):
+    """snapshot() 결과로 상태 교체 (읽는 쪽이 빈 dict 를 보지 않도록 키 단위로 갱신)"""
+    new_runner = snap.get("runner") or {}
+    name = new_runner.get("name")
+    if name:
+        lap_data[name] = array(LAP_TYPECODE, snap.get("lap_times") or [])
+    for other in [key for key in lap_data if key != name]:
+        lap_data.pop(other, None)
+    runner["name"] = name
+    runner["total_laps"] = new_runner.get("total_laps", 0)
+    race_status.update(snap.get("race_status") or {})
+
 def get_status():
     name = runner["name"]
     total = runner["total_laps"]
@@ -38,7 +62,7 @@ def get_status():
     avg = sum(laps) // total if ended else 0
 
     return {
-        "lap_times": laps,
+        "lap_times": laps.tolist(),
         "ended": ended,
         "avg_time": avg,
         "rank": None
@@ -0,0 +1,203 @@
+# app/cluster.py
+"""
+다중 노드 배포: ingest 노드 1대 → web 노드 N대
+
+- ingest: 시리얼 리스너와 레이스 상태를 가진 노드. TCP 포트(cluster.publish_port)로
+  이벤트/레이스 상태/리더보드 변경을 줄 단위 JSON 으로 발행한다.
+- web: 상태 없이 ingest 에 접속해 스냅샷을 받은 뒤 변경분을 따라가며
+  /result, /laps, /events 를 로컬 복제본으로 응답한다.
+
+메시지 (한 줄에 JSON 하나):
+    {"kind": "snapshot", "seq": n, "race": {...}, "leaderboard": [...], "heats": {...}}
+    {"kind": "event", "seq": n, "type": "lap", "payload": {...}, "race": {...}}
+    {"kind": "leaderboard", "seq": n, "board": [...], "race": {...}}
+    {"kind": "ping", "seq": n}
+"""
+import json
+import socket
+import threading
+import time
+from queue import Queue, Full
+from typing import Any, Dict, List, Optional
+
+from app import events, heats, leaderboard
+from app.bluetooth import state
+
+PING_INTERVAL = 10.0        # 초, 연결 유지 확인
+READ_TIMEOUT = 3 * PING_INTERVAL
+RECONNECT_DELAY = 2.0
+SEND_QUEUE_SIZE = 2000      # 이 이상 밀린 구독자는 끊고 재접속(스냅샷)하게 함
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _Subscriber:
+    def __init__(self, conn: socket.socket, addr):
+        self.conn = conn
+        self.addr = f"{addr[0]}:{addr[1]}"
+        self.queue: "Queue[Optional[bytes]]" = Queue(maxsize=SEND_QUEUE_SIZE)
+        self.alive = True
+
+    def close(self):
+        self.alive = False
+        try:
+            self.queue.put_nowait(None)
+        except Full:
+            pass
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class Publisher:
+    """ingest 노드: 구독자(web 노드)에게 변경분을 전송"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._subscribers: List[_Subscriber] = []
+        self._seq = 0
+
+    def start(self) -> None:
+        events.add_listener(self._on_event)
+        leaderboard.on_change(self._on_leaderboard)
+        threading.Thread(target=self._accept_loop, name="cluster-publisher", daemon=True).start()
+        threading.Thread(target=self._ping_loop, name="cluster-ping", daemon=True).start()
+
+    # ── 발행 ─────────────────────────────────────────────
+    def _broadcast(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self._seq += 1
+            message["seq"] = self._seq
+            data = _encode(message)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(data)
+            except Full:
+                print(f"⚠️ [cluster] {sub.addr} 전송 지연 → 연결 종료 (재접속 시 스냅샷)")
+                self._drop(sub)
+
+    def _on_event(self, event_type: str, payload: Dict[str, Any]) -> None:
+        self._broadcast({"kind": "event", "type": event_type, "payload": payload, "race": state.snapshot()})
+
+    def _on_leaderboard(self, board) -> None:
+        self._broadcast({"kind": "leaderboard", "board": board, "race": state.snapshot()})
+
+    def _ping_loop(self) -> None:
+        while True:
+            time.sleep(PING_INTERVAL)
+            self._broadcast({"kind": "ping"})
+
+    # ── 연결 관리 ─────────────────────────────────────────
+    def _drop(self, sub: _Subscriber) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+        sub.close()
+
+    def _accept_loop(self) -> None:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.host, self.port))
+        server.listen(16)
+        print(f"📣 [cluster] 이벤트 발행 중: {self.host}:{self.port}")
+        while True:
+            conn, addr = server.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sub = _Subscriber(conn, addr)
+            # 스냅샷과 구독 등록을 같은 락 안에서 → 사이에 발행된 변경분이 빠지지 않음
+            with self._lock:
+                self._seq += 1
+                snapshot = _encode({
+                    "kind": "snapshot",
+                    "seq": self._seq,
+                    "race": state.snapshot(),
+                    "leaderboard": leaderboard.load_leaderboard(),
+                    "heats": heats.snapshot(),
+                })
+                sub.queue.put_nowait(snapshot)
+                self._subscribers.append(sub)
+            print(f"🔗 [cluster] web 노드 접속: {sub.addr}")
+            threading.Thread(target=self._send_loop, args=(sub,), daemon=True).start()
+
+    def _send_loop(self, sub: _Subscriber) -> None:
+        try:
+            while sub.alive:
+                data = sub.queue.get()
+                if data is None:
+                    break
+                sub.conn.sendall(data)
+        except OSError:
+            pass
+        finally:
+            self._drop(sub)
+            print(f"🔌 [cluster] web 노드 연결 종료: {sub.addr}")
+
+
+class Replica:
+    """web 노드: ingest 에 접속해 로컬 상태/리더보드/SSE 를 최신으로 유지"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.connected = False
+        self.last_seq = 0
+
+    def start(self) -> None:
+        leaderboard.set_replica([])
+        threading.Thread(target=self._run, name="cluster-replica", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=5) as conn:
+                    conn.settimeout(READ_TIMEOUT)
+                    print(f"📡 [cluster] ingest 노드 접속: {self.host}:{self.port}")
+                    for line in conn.makefile("rb"):
+                        self._apply(json.loads(line))
+            except (OSError, ValueError) as e:
+                print(f"❌ [cluster] ingest 연결 오류: {e}")
+            self.connected = False
+            time.sleep(RECONNECT_DELAY)
+
+    def _apply(self, message: Dict[str, Any]) -> None:
+        kind = message.get("kind")
+        seq = message.get("seq", 0)
+        if kind != "snapshot" and self.last_seq and seq != self.last_seq + 1:
+            print(f"⚠️ [cluster] 순번 누락: {self.last_seq} → {seq}")
+        self.last_seq = seq
+
+        if kind == "snapshot":
+            state.restore(message["race"])
+            leaderboard.set_replica(message.get("leaderboard") or [])
+            if message.get("heats"):
+                heats.set_replica(message["heats"])
+            self.connected = True
+            print(f"✅ [cluster] 스냅샷 적용 (seq {seq})")
+        elif kind == "event":
+            state.restore(message["race"])
+            if message["type"] == "heats":
+                heats.set_replica(message.get("payload") or {})
+            events.publish_raw(message["type"], message.get("payload") or {})
+        elif kind == "leaderboard":
+            state.restore(message["race"])
+            leaderboard.set_replica(message.get("board") or [])
+
+
+def start_node(config) -> Optional[object]:
+    """설정된 역할에 맞게 발행/구독 시작 (standalone 은 아무것도 하지 않음)"""
+    cluster = config.cluster
+    if cluster.role == "ingest":
+        publisher = Publisher(cluster.publish_host, cluster.publish_port)
+        publisher.start()
+        return publisher
+    if cluster.role == "web":
+        replica = Replica(cluster.ingest_host, cluster.publish_port)
+        replica.start()
+        return replica
+    return None
@@ -1,6 +1,9 @@
+import json
 import os
-from dataclasses import dataclass, field
-from typing import List
+import threading
+import time
+from dataclasses import dataclass, field, fields, is_dataclass, replace
+from typing import Callable, List, Optional
 
 @dataclass
 class SerialConfig:
@@ -9,6 +12,8 @@ class SerialConfig:
     baudrate: int = 9600
     timeout: float = 1.0
     auto_detect: bool = False  # 기존 동작 유지를 위해 False로 시작
+    command_timeout: float = 2.0  # 명령 응답(ack) 대기 시간 (초)
+    command_retries: int = 2      # 응답이 없을 때 재전송 횟수
 
 @dataclass
 class ServerConfig:
@@ -22,11 +27,21 @@ class DataConfig:
     """데이터 관리 설정"""
     data_dir: str = "data"
     leaderboard_file: str = "leaderboard.json"
+    history_file: str = "races.bin"  # 랩 시간까지 포함한 전체 레이스 기록 (RaceRecord 바이너리)
+    journal_file: str = "race.journal"  # 진행 중 레이스 저널 (재시작 시 복구, 빈 문자열이면 끔)
     
     @property
     def leaderboard_path(self) -> str:
         return os.path.join(self.data_dir, self.leaderboard_file)
 
+    @property
+    def history_path(self) -> str:
+        return os.path.join(self.data_dir, self.history_file)
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.data_dir, self.journal_file)
+
 @dataclass
 class RaceConfig:
     """레이스 규칙 설정"""
@@ -35,6 +50,22 @@ class RaceConfig:
     default_laps: int = 5
     max_leaderboard_entries: int = 10
 
+@dataclass
+class ClusterConfig:
+    """다중 노드 설정 (standalone: 한 프로세스 / ingest: 시리얼+발행 / web: 구독+웹 서비스)"""
+    role: str = "standalone"
+    publish_host: str = "0.0.0.0"   # ingest: 이벤트 발행 포트 바인딩 주소
+    publish_port: int = 5600
+    ingest_host: str = "127.0.0.1"  # web: 접속할 ingest 노드 주소
+
+@dataclass
+class TelemetryConfig:
+    """센서 거리 텔레메트리 설정 (펌웨어 D:<cm> 스트리밍)"""
+    enabled: bool = False      # 포트를 열 때 TELEMETRY ON 전송
+    capacity: int = 12000      # 트랙별 링 버퍼 샘플 수 (20Hz 기준 10분)
+    max_points: int = 2000     # 한 번의 조회/스트림 프레임 최대 점 수
+    stream_interval: float = 0.5  # SSE 스트림 전송 주기 (초)
+
 @dataclass
 class AppConfig:
     """애플리케이션 전체 설정"""
@@ -42,11 +73,39 @@ class AppConfig:
     server: ServerConfig = field(default_factory=ServerConfig)
     data: DataConfig = field(default_factory=DataConfig)
     race: RaceConfig = field(default_factory=RaceConfig)
+    cluster: ClusterConfig = field(default_factory=ClusterConfig)
+    telemetry: TelemetryConfig = field(default_factory=TelemetryConfig)
 
-def load_config() -> AppConfig:
-    """환경변수에서 설정을 로드"""
-    config = AppConfig()
-    
+# ✅ 설정 파일 (JSON, 섹션별 부분 지정 가능). 실행 중 변경하면 자동 반영
+CONFIG_FILE = os.getenv("CONFIG_FILE", "config.json")
+WATCH_INTERVAL = 1.0  # 초
+
+# 실행 중에는 바꿀 수 없는 섹션 (포트 바인딩, 데이터 파일 경로)
+RESTART_ONLY_SECTIONS = ("server", "data", "cluster")
+
+
+def _apply_file(config: AppConfig, data: dict) -> None:
+    """JSON 값을 설정에 덮어씀 (알 수 없는 키/타입 불일치는 ValueError)"""
+    if not isinstance(data, dict):
+        raise ValueError("설정 파일 최상위는 객체여야 합니다")
+    for section, values in data.items():
+        target = getattr(config, section, None)
+        if not is_dataclass(target) or not isinstance(values, dict):
+            raise ValueError(f"알 수 없는 섹션: {section}")
+        known = {f.name: f.type for f in fields(target)}
+        for key, value in values.items():
+            if key not in known:
+                raise ValueError(f"알 수 없는 설정: {section}.{key}")
+            expected = known[key]
+            if expected is float and type(value) is int:
+                value = float(value)
+            if type(value) is not expected:
+                raise ValueError(f"{section}.{key} 는 {expected.__name__} 이어야 합니다")
+            setattr(target, key, value)
+
+
+def _apply_env(config: AppConfig) -> None:
+    """환경변수 설정 (설정 파일보다 우선)"""
     # 서버 설정
     if os.getenv("DEBUG"):
         config.server.debug = os.getenv("DEBUG").lower() == "true"
@@ -73,6 +132,19 @@ def load_config() -> AppConfig:
     if os.getenv("SERIAL_AUTO_DETECT"):
         config.serial.auto_detect = os.getenv("SERIAL_AUTO_DETECT").lower() == "true"
     
+    # 클러스터 설정
+    if os.getenv("NODE_ROLE"):
+        config.cluster.role = os.getenv("NODE_ROLE").lower()
+
+    if os.getenv("INGEST_HOST"):
+        config.cluster.ingest_host = os.getenv("INGEST_HOST")
+
+    if os.getenv("CLUSTER_PORT"):
+        try:
+            config.cluster.publish_port = int(os.getenv("CLUSTER_PORT"))
+        except ValueError:
+            pass
+    
     # 데이터 설정
     if os.getenv("DATA_DIR"):
         config.data.data_dir = os.getenv("DATA_DIR")
@@ -89,8 +161,157 @@ def load_config() -> AppConfig:
             config.race.default_laps = int(os.getenv("DEFAULT_LAPS"))
         except ValueError:
             pass
-    
+
+
+def validate_config(config: AppConfig) -> None:
+    """값 범위 검증 (문제가 있으면 ValueError)"""
+    errors = []
+    race = config.race
+    if race.min_laps < 1:
+        errors.append("race.min_laps 는 1 이상이어야 합니다")
+    if race.min_laps > race.max_laps:
+        errors.append("race.min_laps 가 race.max_laps 보다 큽니다")
+    if not race.min_laps <= race.default_laps <= race.max_laps:
+        errors.append("race.default_laps 는 min_laps ~ max_laps 사이여야 합니다")
+    if race.max_leaderboard_entries < 1:
+        errors.append("race.max_leaderboard_entries 는 1 이상이어야 합니다")
+    if not config.serial.port:
+        errors.append("serial.port 가 비어 있습니다")
+    if config.serial.baudrate <= 0:
+        errors.append("serial.baudrate 는 양수여야 합니다")
+    if config.serial.timeout <= 0:
+        errors.append("serial.timeout 은 양수여야 합니다 (리스너가 설정 변경을 확인하는 주기)")
+    if config.serial.command_timeout <= 0:
+        errors.append("serial.command_timeout 은 양수여야 합니다")
+    if config.serial.command_retries < 0:
+        errors.append("serial.command_retries 는 0 이상이어야 합니다")
+    if not 0 < config.server.port < 65536:
+        errors.append("server.port 범위 오류")
+    if config.cluster.role not in ("standalone", "ingest", "web"):
+        errors.append("cluster.role 은 standalone / ingest / web 중 하나여야 합니다")
+    if not 0 < config.cluster.publish_port < 65536:
+        errors.append("cluster.publish_port 범위 오류")
+    if config.telemetry.capacity < 1:
+        errors.append("telemetry.capacity 는 1 이상이어야 합니다")
+    if config.telemetry.max_points < 3:
+        errors.append("telemetry.max_points 는 3 이상이어야 합니다")
+    if config.telemetry.stream_interval <= 0:
+        errors.append("telemetry.stream_interval 은 양수여야 합니다")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+
+def load_config(path: Optional[str] = None) -> AppConfig:
+    """기본값 → 설정 파일 → 환경변수 순으로 설정을 로드"""
+    config = AppConfig()
+    path = path or CONFIG_FILE
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            _apply_file(config, json.load(f))
+    _apply_env(config)
+    validate_config(config)
+    return config
+
+
+# ── 현재 설정 (핫 리로드) ─────────────────────────────────
+# 요청 경로에서는 get_config() 로 참조 하나만 읽는다 (락 없음).
+# 새 설정은 완성/검증된 객체를 만든 뒤 참조를 한 번에 바꿔서 적용한다.
+_current: Optional[AppConfig] = None
+_init_lock = threading.Lock()
+_subscribers: List[Callable[[AppConfig, AppConfig], None]] = []
+
+
+def get_config() -> AppConfig:
+    """현재 설정 (반환된 객체는 수정하지 말 것)"""
+    config = _current
+    if config is None:
+        with _init_lock:
+            if _current is None:
+                try:
+                    _set_current(load_config())
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ 설정 파일 오류, 기본값 + 환경변수 사용: {e}")
+                    fallback = AppConfig()
+                    _apply_env(fallback)
+                    _set_current(fallback)
+            config = _current
     return config
 
-# 글로벌 설정 인스턴스
-CONFIG = load_config()
+
+def _set_current(config: AppConfig) -> None:
+    global _current
+    _current = config
+
+
+def subscribe(callback: Callable[[AppConfig, AppConfig], None]) -> None:
+    """설정 변경 알림 등록: callback(old, new)"""
+    _subscribers.append(callback)
+
+
+def apply_config(new: AppConfig) -> bool:
+    """검증 후 원자적으로 교체하고 구독자에게 알림. 바뀐 게 있으면 True"""
+    old = get_config()
+    validate_config(new)
+
+    # 재시작이 필요한 섹션은 현재 값 유지
+    pinned = {}
+    for section in RESTART_ONLY_SECTIONS:
+        if getattr(new, section) != getattr(old, section):
+            print(f"⚠️ {section} 설정 변경은 재시작 후 적용됩니다")
+        pinned[section] = getattr(old, section)
+    new = replace(new, **pinned)
+
+    if new == old:
+        return False
+    _set_current(new)
+    print("🔧 설정 적용 완료")
+    for callback in list(_subscribers):
+        try:
+            callback(old, new)
+        except Exception as e:
+            print(f"⚠️ 설정 변경 알림 처리 오류: {e}")
+    return True
+
+
+def reload_config(path: Optional[str] = None) -> bool:
+    """설정 파일을 다시 읽어 적용. 검증 실패 시 기존 설정 유지"""
+    try:
+        return apply_config(load_config(path))
+    except (OSError, ValueError) as e:
+        print(f"❌ 설정 리로드 실패 (기존 설정 유지): {e}")
+        return False
+
+
+def start_config_watcher(path: Optional[str] = None, interval: float = WATCH_INTERVAL) -> threading.Thread:
+    """설정 파일의 변경(mtime/크기)을 감시하는 백그라운드 스레드 시작"""
+    path = path or CONFIG_FILE
+
+    def signature():
+        try:
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def watch():
+        last = signature()
+        while True:
+            time.sleep(interval)
+            current = signature()
+            if current != last:
+                last = current
+                print(f"📝 설정 파일 변경 감지: {path}")
+                reload_config(path)
+
+    get_config()
+    thread = threading.Thread(target=watch, name="config-watcher", daemon=True)
+    thread.start()
+    print(f"👀 설정 파일 감시 중: {os.path.abspath(path)}")
+    return thread
+
+# 글로벌 설정 인스턴스 (후방호환: app.config.CONFIG 는 항상 현재 설정)
+# `from app.config import CONFIG` 는 그 시점 값에 고정되므로, 실행 중 바뀌는 값은 get_config() 사용
+def __getattr__(name):
+    if name == "CONFIG":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
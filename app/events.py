@@ -1,16 +1,54 @@
 # app/events.py
 import time
 import json
-from queue import Queue, Empty
-from typing import Dict, Any, Generator
+import threading
+from queue import Queue, Empty, Full
+from typing import Dict, Any, Callable, Generator, List
 
-# 내부 버스/캐시
-_event_bus: "Queue[Dict[str, Any]]" = Queue()
+# 구독자(SSE 연결)마다 큐 하나 → 모든 연결이 같은 이벤트를 받는다
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+_subscribers: "List[Queue[Dict[str, Any]]]" = []
+_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+_lock = threading.Lock()
 _latest_lap: Dict[str, Any] = {"id": None, "ms": None}
 
 # 공통 publish
 def _publish(event_type: str, payload: Dict[str, Any]) -> None:
-    _event_bus.put({"type": event_type, "payload": payload})
+    ev = {"type": event_type, "payload": payload}
+    with _lock:
+        subscribers = list(_subscribers)
+        listeners = list(_listeners)
+    for q in subscribers:
+        try:
+            q.put_nowait(ev)
+        except Full:
+            pass  # 너무 느린 구독자는 건너뜀 (재연결 시 /laps 로 복구)
+    for listener in listeners:
+        try:
+            listener(event_type, payload)
+        except Exception as e:
+            print(f"⚠️ 이벤트 리스너 오류: {e}")
+
+def subscribe() -> "Queue[Dict[str, Any]]":
+    q: "Queue[Dict[str, Any]]" = Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _lock:
+        _subscribers.append(q)
+    return q
+
+def unsubscribe(q: "Queue[Dict[str, Any]]") -> None:
+    with _lock:
+        if q in _subscribers:
+            _subscribers.remove(q)
+
+def add_listener(listener: Callable[[str, Dict[str, Any]], None]) -> None:
+    """모든 이벤트를 동기 호출로 받는 리스너 등록 (클러스터 전달 등)"""
+    with _lock:
+        _listeners.append(listener)
+
+def publish_raw(event_type: str, payload: Dict[str, Any]) -> None:
+    """다른 노드에서 받은 이벤트를 그대로 로컬 구독자에게 전달"""
+    _publish(event_type, payload)
 
 # === 공개 API (리스너에서 호출) ==============================================
 def publish_race_started(ts_ms: int) -> None:
@@ -25,18 +63,41 @@ def publish_lap(seg_ms: int) -> None:
 def publish_race_ended(ts_ms: int) -> None:
     _publish("race_ended", {"ts": int(ts_ms)})
 
+def publish_config_updated() -> None:
+    """설정 파일 리로드 → 프론트엔드가 /api/config 를 다시 읽도록 알림"""
+    _publish("config_updated", {"ts": int(time.time() * 1000)})
+
+def publish_command_result(cmd: str, ok: bool, rtt_ms=None, error: str = None) -> None:
+    """명령 응답 확인 결과 (ok=False 면 재시도까지 응답 없음)"""
+    _publish("command", {"cmd": cmd, "ok": bool(ok), "rtt_ms": rtt_ms, "error": error})
+
+def publish_target_set(name: str, laps: int) -> None:
+    """다음 러너 지정 (펌웨어가 START 에 WAITING_FOR_TRIGGER 로 응답한 뒤, 실패하면 보내지 않음)"""
+    _publish("target_set", {"name": name, "laps": int(laps)})
+
+def publish_reset() -> None:
+    _publish("reset", {"ts": int(time.time() * 1000)})
+
+def publish_heats(snapshot: Dict[str, Any]) -> None:
+    """히트 대기열 상태 전체 (대기열/현재 히트/자동 진행/마지막 교체 시간)"""
+    _publish("heats", snapshot)
+
 def get_latest_lap() -> Dict[str, Any]:
     return dict(_latest_lap)
 
 # === SSE 제너레이터 ===========================================================
 def sse_generator() -> Generator[str, None, None]:
-    # 초기 keep-alive
-    yield "event: ping\ndata: {}\n\n"
-    while True:
-        try:
-            ev = _event_bus.get(timeout=25)
-            et = ev.get("type") or "message"
-            payload = ev.get("payload") or {}
-            yield f"event: {et}\n" + f"data: {json.dumps(payload)}\n\n"
-        except Empty:
-            yield "event: ping\ndata: {}\n\n"
+    q = subscribe()
+    try:
+        # 초기 keep-alive
+        yield "event: ping\ndata: {}\n\n"
+        while True:
+            try:
+                ev = q.get(timeout=25)
+                et = ev.get("type") or "message"
+                payload = ev.get("payload") or {}
+                yield f"event: {et}\n" + f"data: {json.dumps(payload)}\n\n"
+            except Empty:
+                yield "event: ping\ndata: {}\n\n"
+    finally:
+        unsubscribe(q)
@@ -0,0 +1,112 @@
+# app/export.py
+"""
+레이스/랩 데이터 내보내기
+
+- csv     : 랩 한 줄씩 (race_id, name, total_laps, started_at, ended_at, lap, lap_ms, elapsed_ms)
+- ndjson  : 레이스 한 줄씩 (구간/누적 랩 시간 포함)
+- npz     : 열 단위 NumPy 아카이브 (Parquet 대용, pyarrow 없이 np.load 로 바로 읽힘)
+
+CLI:
+    python -m app.export csv -o races.csv
+    python -m app.export npz -o races.npz
+    python -m app.export analytics
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import Iterable, Iterator, Tuple
+
+from app.history import iter_races, locked_store
+from app.records import RaceRecord
+
+FORMATS = ("csv", "ndjson", "npz")
+
+CSV_COLUMNS = ["race_id", "name", "total_laps", "started_at", "ended_at", "lap", "lap_ms", "elapsed_ms"]
+
+
+def iter_csv(races: Iterable[Tuple[int, RaceRecord]]) -> Iterator[str]:
+    """랩 단위 CSV 를 레이스 하나씩 문자열 조각으로 생성"""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS)
+    yield buf.getvalue()
+    for race_id, race in races:
+        buf.seek(0)
+        buf.truncate()
+        for lap, (split, elapsed) in enumerate(zip(race.splits(), race.lap_times), 1):
+            writer.writerow([race_id, race.name, race.total_laps,
+                             race.started_at or "", race.ended_at or "", lap, split, elapsed])
+        yield buf.getvalue()
+
+
+def iter_ndjson(races: Iterable[Tuple[int, RaceRecord]]) -> Iterator[str]:
+    for race_id, race in races:
+        yield json.dumps(race.to_dict(race_id), ensure_ascii=False) + "\n"
+
+
+def build_npz() -> bytes:
+    """열 단위 아카이브 생성 (랩 열 + 레이스 열 + 드라이버 이름표)"""
+    import numpy as np
+    from app.results import lap_splits
+
+    with locked_store() as store:
+        n = len(store)
+        elapsed = np.frombuffer(store.laps, dtype=np.uint32)[: store.offsets[n]].copy()
+        offsets = np.frombuffer(store.offsets, dtype=np.uint64)[: n + 1].astype(np.int64)
+        race_driver = np.frombuffer(store.driver, dtype=np.uint32)[:n].copy()
+        total_laps = np.frombuffer(store.total_laps, dtype=np.uint32)[:n].copy()
+        started_at = np.frombuffer(store.started_at, dtype=np.uint64)[:n].copy()
+        ended_at = np.frombuffer(store.ended_at, dtype=np.uint64)[:n].copy()
+        names = np.array(store.names, dtype=str)
+
+    laps_per_race = np.diff(offsets)
+    race_id = np.repeat(np.arange(n, dtype=np.uint32), laps_per_race)
+    splits = lap_splits(elapsed, offsets, laps_per_race).astype(np.uint32)
+    lap = (np.arange(len(elapsed)) - np.repeat(offsets[:-1], laps_per_race) + 1).astype(np.uint32)
+
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        lap_race_id=race_id, lap_number=lap, lap_ms=splits, lap_elapsed_ms=elapsed,
+        race_driver=race_driver, race_total_laps=total_laps,
+        race_started_at=started_at, race_ended_at=ended_at,
+        driver_names=names,
+    )
+    return buf.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RC Tracker 레이스 기록 내보내기")
+    parser.add_argument("format", choices=FORMATS + ("analytics",))
+    parser.add_argument("-o", "--output", help="출력 파일 (기본: 표준출력, npz 는 필수)")
+    parser.add_argument("--driver", help="analytics: 특정 드라이버만")
+    args = parser.parse_args(argv)
+
+    if args.format == "analytics":
+        from app.analytics import driver_report
+        with locked_store() as store:
+            report = driver_report(store, driver=args.driver)
+        text = json.dumps(report, ensure_ascii=False, indent=2) + "\n"
+        chunks: Iterable[str] = [text]
+    elif args.format == "npz":
+        if not args.output:
+            parser.error("npz 형식은 -o/--output 이 필요합니다")
+        with open(args.output, "wb") as f:
+            f.write(build_npz())
+        print(f"✅ {args.output} 저장 완료")
+        return
+    else:
+        chunks = iter_csv(iter_races()) if args.format == "csv" else iter_ndjson(iter_races())
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.writelines(chunks)
+        print(f"✅ {args.output} 저장 완료")
+    else:
+        sys.stdout.writelines(chunks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# app/heats.py
+"""
+히트(출전 대기열) + 자동 진행
+
+운영자가 참가자를 미리 대기열에 넣어두면, 레이스 결과가 insert_result 로 저장되는 즉시
+다음 참가자를 지정하고 START n 을 보낸다 (auto_advance). 대기열이 바뀔 때마다
+SSE "heats" 이벤트로 전체 상태를 보낸다.
+
+교체 시간(changeover): 이전 레이스 결과 저장 → 다음 레이스 RACE_STARTED 까지 (트랙이 비어 있던 시간)
+    heat_changeover_ms  히스토그램
+    heat_arm_ms         결과 저장 → 다음 START 의 WAITING_FOR_TRIGGER 응답까지
+
+펌웨어는 마지막 LAP 직후 RACE_ENDED 를 보내므로, 그 줄이 처리된 뒤(최대 RACE_ENDED_GRACE 초)
+START 를 보낸다. 먼저 보내면 이전 레이스의 RACE_ENDED 가 새 레이스를 끝난 것으로 만든다.
+
+START 응답이 없으면 히트를 맨 앞으로 되돌리고, 자동 진행 중이면 RETRY_BASE 초부터 두 배씩
+(최대 RETRY_MAX 초) 늘려 가며 다시 시도한다. 재시도 상태는 snapshot()["stalled"] 로 보인다.
+
+이벤트/결과 리스너는 server.run() 에서 install() 로 등록한다 (ingest/standalone 노드만).
+"""
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app import events, leaderboard, metrics
+
+CHANGEOVER_HISTOGRAM = "heat_changeover_ms"
+ARM_HISTOGRAM = "heat_arm_ms"
+# 교체 시간은 수 초 ~ 수 분
+CHANGEOVER_BUCKETS_MS = (250, 500, 1000, 2000, 3000, 5000, 10000, 20000, 30000, 60000, 120000, 300000)
+RACE_ENDED_GRACE = 1.0  # 초
+RETRY_BASE = 1.0        # 초, START 실패 후 첫 재시도까지
+RETRY_MAX = 30.0
+
+_lock = threading.Lock()
+_queue: List[Dict[str, Any]] = []
+_ids = itertools.count(1)
+_state: Dict[str, Any] = {
+    "auto_advance": True,
+    "current": None,        # 지금 트랙에 있는 히트 (대기열에서 꺼낸 것)
+    "finished_at": None,    # 마지막 결과 저장 시각 (perf_counter), 다음 RACE_STARTED 에서 소비
+    "last_changeover_ms": None,
+    "stalled": None,        # START 실패 후 재시도 대기 {"name", "attempts", "error", "retry_in_s"}
+}
+_race_ended = threading.Event()
+_retry_timer: Optional[threading.Timer] = None
+_replica: Optional[Dict[str, Any]] = None
+_changeover = metrics.histogram(CHANGEOVER_HISTOGRAM, CHANGEOVER_BUCKETS_MS)
+_arm = metrics.histogram(ARM_HISTOGRAM, CHANGEOVER_BUCKETS_MS)
+
+
+# ── 상태 ─────────────────────────────────────────────────
+def snapshot() -> Dict[str, Any]:
+    """대기열 상태 (JSON 직렬화 가능, SSE/클러스터 복제용)"""
+    if _replica is not None:
+        return dict(_replica)
+    with _lock:
+        return _snapshot_locked()
+
+
+def _snapshot_locked() -> Dict[str, Any]:
+    return {
+        "queue": [dict(entry) for entry in _queue],
+        "current": dict(_state["current"]) if _state["current"] else None,
+        "auto_advance": _state["auto_advance"],
+        "last_changeover_ms": _state["last_changeover_ms"],
+        "stalled": dict(_state["stalled"]) if _state["stalled"] else None,
+    }
+
+
+def set_replica(snap: Dict[str, Any]) -> None:
+    """web 노드: ingest 노드의 대기열 상태를 그대로 사용"""
+    global _replica
+    _replica = dict(snap)
+
+
+def _publish() -> None:
+    events.publish_heats(snapshot())
+
+
+# ── 대기열 조작 ─────────────────────────────────────────
+def enqueue(name: str, laps: int) -> Dict[str, Any]:
+    entry = {"id": next(_ids), "name": name, "laps": int(laps), "enqueued_at": int(time.time() * 1000)}
+    with _lock:
+        _queue.append(entry)
+        # 트랙이 비어 있는 상태(직전 레이스 종료 후 대기열이 비어 있었음)면 바로 진행
+        start_now = _state["auto_advance"] and _state["current"] is None and _state["finished_at"] is not None
+    print(f"📋 대기열 추가: {name} ({laps} laps) #{entry['id']}")
+    _publish()
+    if start_now:
+        advance()
+    return entry
+
+
+def remove(heat_id: int) -> bool:
+    with _lock:
+        for i, entry in enumerate(_queue):
+            if entry["id"] == heat_id:
+                del _queue[i]
+                break
+        else:
+            return False
+    _publish()
+    return True
+
+
+def move(heat_id: int, position: int) -> bool:
+    """히트를 position(0 = 다음 차례) 으로 이동"""
+    with _lock:
+        for i, entry in enumerate(_queue):
+            if entry["id"] == heat_id:
+                _queue.insert(max(0, min(position, len(_queue) - 1)), _queue.pop(i))
+                break
+        else:
+            return False
+    _publish()
+    return True
+
+
+def clear() -> None:
+    with _lock:
+        _queue.clear()
+        _cancel_retry_locked()
+    _publish()
+
+
+def set_auto_advance(enabled: bool) -> None:
+    with _lock:
+        _state["auto_advance"] = bool(enabled)
+        if not enabled and _retry_timer is not None:
+            _retry_timer.cancel()   # stalled 는 남겨서 운영자가 /api/heats/next 로 처리
+        stalled = _state["stalled"]
+    _publish()
+    if enabled and stalled:
+        _retry(stalled["id"])   # 다시 켜면 멈춰 있던 히트를 바로 재시도
+
+
+# ── 진행 ─────────────────────────────────────────────────
+def advance():
+    """
+    대기열 맨 앞 히트를 지정하고 START 전송
+    반환값: set_target_runner 의 Future (대기열이 비어 있으면 None)
+    """
+    from app.bluetooth.communication import set_target_runner
+
+    with _lock:
+        if not _queue:
+            return None
+        entry = _queue.pop(0)
+        _state["current"] = entry
+        finished_at = _state["finished_at"]
+
+    print(f"⏭️ 다음 히트: {entry['name']} ({entry['laps']} laps)")
+    ack = set_target_runner(entry["name"], entry["laps"])
+    _publish()
+
+    def on_ack(future):
+        error = future.exception()
+        if error:
+            # 펌웨어가 START 를 받지 못함 → 다시 맨 앞에 두고, 자동 진행 중이면 잠시 뒤 재시도
+            with _lock:
+                if _state["current"] is entry:
+                    _state["current"] = None
+                _queue.insert(0, entry)
+                delay = _schedule_retry_locked(entry, error)
+            if delay is None:
+                print(f"⚠️ 히트 시작 실패, 대기열 맨 앞으로 복귀: {entry['name']}")
+            else:
+                print(f"⚠️ 히트 시작 실패, {delay:g}초 뒤 재시도: {entry['name']}")
+            _publish()
+            return
+        with _lock:
+            recovered = _state["stalled"] is not None
+            _cancel_retry_locked()
+        if recovered:
+            _publish()
+        if finished_at is not None:
+            _arm.observe((time.perf_counter() - finished_at) * 1000)
+
+    ack.add_done_callback(on_ack)
+    return ack
+
+
+def _schedule_retry_locked(entry: Dict[str, Any], error: BaseException) -> Optional[float]:
+    """START 실패 기록 + 자동 진행 중이면 백오프 재시도 예약 → 대기 초 (예약 안 함: None)"""
+    global _retry_timer
+    stalled = _state["stalled"]
+    attempts = stalled["attempts"] + 1 if stalled and stalled["id"] == entry["id"] else 1
+    delay = min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1)) if _state["auto_advance"] else None
+    _state["stalled"] = {"id": entry["id"], "name": entry["name"], "attempts": attempts,
+                         "error": str(error), "retry_in_s": delay}
+    if _retry_timer is not None:
+        _retry_timer.cancel()
+        _retry_timer = None
+    if delay is not None:
+        _retry_timer = threading.Timer(delay, _retry, args=(entry["id"],))
+        _retry_timer.daemon = True
+        _retry_timer.start()
+    return delay
+
+
+def _cancel_retry_locked() -> None:
+    global _retry_timer
+    if _retry_timer is not None:
+        _retry_timer.cancel()
+        _retry_timer = None
+    _state["stalled"] = None
+
+
+def _retry(heat_id: int) -> None:
+    with _lock:
+        # 그 사이 수동 시작/삭제/자동 진행 끄기가 있었으면 건너뜀
+        ready = (_state["auto_advance"] and _state["current"] is None
+                 and bool(_queue) and _queue[0]["id"] == heat_id)
+    if ready:
+        advance()
+
+
+def on_result(name: str, laps: int, avg_lap_time: int) -> None:
+    """leaderboard.insert_result 에서 결과 저장 직후 호출"""
+    with _lock:
+        _state["finished_at"] = time.perf_counter()
+        _state["current"] = None
+        auto = _state["auto_advance"] and bool(_queue)
+    _race_ended.clear()
+    _publish()
+    if auto:
+        threading.Thread(target=_advance_after_race_end, name="heat-advance", daemon=True).start()
+
+
+def _advance_after_race_end() -> None:
+    _race_ended.wait(RACE_ENDED_GRACE)
+    with _lock:
+        busy = _state["current"] is not None  # 그 사이 수동 /start 가 있었음
+    if not busy:
+        advance()
+
+
+def _on_event(event_type: str, payload: Dict[str, Any]) -> None:
+    if event_type == "race_ended":
+        _race_ended.set()
+    elif event_type == "target_set":
+        # 수동 /start 로 다른 참가자가 지정된 경우에도 트랙이 사용 중임을 기록
+        with _lock:
+            current = _state["current"]
+            if current is None or current["name"] != payload.get("name"):
+                _state["current"] = {"id": None, "name": payload.get("name"), "laps": payload.get("laps")}
+                _cancel_retry_locked()   # 수동 START 가 성공함 → 재시도 대기 해제
+    elif event_type == "reset":
+        with _lock:
+            _state["current"] = None
+    elif event_type == "race_started":
+        with _lock:
+            finished_at, _state["finished_at"] = _state["finished_at"], None
+            if finished_at is not None:
+                elapsed = (time.perf_counter() - finished_at) * 1000
+                _state["last_changeover_ms"] = round(elapsed, 1)
+        if finished_at is not None:
+            _changeover.observe(elapsed)
+            print(f"🔄 교체 시간: {elapsed / 1000:.1f}s")
+            _publish()
+
+
+def install() -> None:
+    """레이스 이벤트/결과 저장 리스너 등록 (server.run() 에서 한 번)"""
+    events.add_listener(_on_event)
+    leaderboard.on_result(on_result)
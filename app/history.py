@@ -0,0 +1,215 @@
+# app/history.py
+"""
+전체 레이스 기록 저장소
+
+leaderboard.json 은 상위 N개의 평균만 남기므로, 분석/내보내기를 위해
+완료된 레이스를 랩 시간까지 포함해 races.bin 에 RaceRecord 단위로 추가한다.
+메모리에는 열(column) 단위의 typed array 로 보관해서 NumPy 가 복사 없이 읽을 수 있다.
+"""
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import CONFIG
+from app.records import HEADER, LAP_TYPECODE, MAGIC, RaceRecord, extend_laps_le, iter_serialized
+from app.results import ResultIndex
+
+# ✅ CONFIG에서 경로 가져오기
+HISTORY_FILE = Path(CONFIG.data.history_path)
+
+
+class RaceStore:
+    """레이스 기록을 열 단위 배열로 보관 (race i 의 랩 = laps[offsets[i]:offsets[i + 1]])"""
+
+    def __init__(self):
+        self.names: List[str] = []           # 드라이버 코드 -> 이름
+        self._codes: Dict[str, int] = {}     # 이름 -> 드라이버 코드
+        self.driver = array("I")             # race -> 드라이버 코드
+        self.total_laps = array("I")         # race -> 목표 랩 수
+        self.started_at = array("Q")         # race -> 시작 시각 (epoch ms, 0 = 알 수 없음)
+        self.ended_at = array("Q")           # race -> 종료 시각 (epoch ms)
+        self.offsets = array("Q", [0])       # race -> laps 시작 위치
+        self.laps = array(LAP_TYPECODE)      # 모든 랩의 누적 시간 (펌웨어 LAP 값, ms)
+        self._results: Optional[ResultIndex] = None  # /api/results 페이지 인덱스 (처음 조회할 때 생성)
+
+    def __len__(self) -> int:
+        return len(self.driver)
+
+    def driver_id(self, name: str) -> Optional[int]:
+        """이름 -> 드라이버 코드 (기록이 없는 드라이버면 None, 새로 만들지 않음)"""
+        return self._codes.get(name)
+
+    def driver_code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self._codes[name] = code
+            self.names.append(name)
+        return code
+
+    def _append_row(self, name: str, total_laps: int, started_at: int, ended_at: int) -> int:
+        code = self.driver_code(name)
+        self.driver.append(code)
+        self.total_laps.append(int(total_laps))
+        self.started_at.append(int(started_at or 0))
+        self.ended_at.append(int(ended_at or 0))
+        self.offsets.append(len(self.laps))
+        race_id = len(self.driver) - 1
+        if self._results is not None:
+            self._results.add(race_id, code, self.laps[self.offsets[race_id]:self.offsets[race_id + 1]])
+        return race_id
+
+    def result_index(self) -> ResultIndex:
+        """정렬/페이지 인덱스 (락 안에서 호출)"""
+        if self._results is None:
+            self._results = ResultIndex.build(self)
+        return self._results
+
+    def append(self, record: RaceRecord) -> int:
+        """레코드를 추가하고 race_id 반환 (랩 배열은 memcpy 한 번)"""
+        self.laps.extend(record.lap_times)
+        return self._append_row(record.name, record.total_laps, record.started_at, record.ended_at)
+
+    def append_serialized(self, name: str, total_laps: int, started_at: int, ended_at: int,
+                          lap_bytes: memoryview) -> int:
+        extend_laps_le(self.laps, lap_bytes)
+        return self._append_row(name, total_laps, started_at, ended_at)
+
+    def record(self, race_id: int) -> RaceRecord:
+        start, end = self.offsets[race_id], self.offsets[race_id + 1]
+        return RaceRecord(
+            self.names[self.driver[race_id]],
+            self.total_laps[race_id],
+            self.laps[start:end],
+            self.started_at[race_id] or None,
+            self.ended_at[race_id] or None,
+        )
+
+
+_lock = threading.Lock()
+_store: Optional[RaceStore] = None
+
+
+# user-026 의 이전 기록 형식 (한 줄에 레이스 하나, JSON)
+LEGACY_HISTORY_FILE = HISTORY_FILE.with_name("races.ndjson")
+
+
+def _migrate_legacy() -> None:
+    """
+    races.ndjson 이 남아 있고 races.bin 이 없으면 한 번 변환
+    변환이 끝나면 원본은 races.ndjson.migrated 로 이름을 바꿔 둔다 (삭제하지 않음)
+    """
+    if HISTORY_FILE.exists() or not LEGACY_HISTORY_FILE.exists():
+        return
+    records = []
+    with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+                records.append(RaceRecord(rec["name"], rec["total_laps"], rec["lap_times"],
+                                          rec.get("started_at") or None, rec.get("ended_at") or None))
+            except (ValueError, KeyError, TypeError, OverflowError):
+                print("⚠️ 이전 레이스 기록 한 줄 파싱 실패, 건너뜀")
+    tmp = HISTORY_FILE.with_suffix(HISTORY_FILE.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        for record in records:
+            record.write_to(f)
+    os.replace(tmp, HISTORY_FILE)
+    LEGACY_HISTORY_FILE.rename(LEGACY_HISTORY_FILE.with_name(LEGACY_HISTORY_FILE.name + ".migrated"))
+    print(f"♻️ 이전 레이스 기록 {len(records)}건을 {HISTORY_FILE.name} 으로 변환")
+
+
+def _load_store() -> RaceStore:
+    store = RaceStore()
+    _migrate_legacy()
+    if not HISTORY_FILE.exists():
+        return store
+    buf = HISTORY_FILE.read_bytes()
+    valid = len(MAGIC) if buf[:len(MAGIC)] == MAGIC else 0
+    try:
+        for fields in iter_serialized(buf):
+            store.append_serialized(*fields)
+            name, lap_bytes = fields[0], fields[4]
+            valid += HEADER.size + len(name.encode("utf-8")) + len(lap_bytes)
+    except ValueError as e:
+        print(f"⚠️ 레이스 기록 로드 실패: {e}")
+        if valid == 0:
+            return store   # 형식이 다른 파일 → 건드리지 않음
+
+    # 잘린/손상된 꼬리를 남겨 두면 다음 append_race 가 그 뒤에 이어 써서 이후 기록이 모두 읽히지 않음
+    # (Journal.replay 와 같이 마지막 정상 레코드 끝까지 잘라냄)
+    if valid < len(buf):
+        print(f"⚠️ 레이스 기록 끝부분 손상 ({len(buf) - valid} bytes) → 잘라냄 (원본 꼬리는 .corrupt 로 보관)")
+        HISTORY_FILE.with_name(HISTORY_FILE.name + ".corrupt").write_bytes(buf[valid:])
+        with open(HISTORY_FILE, "r+b") as f:
+            f.truncate(valid)
+            os.fsync(f.fileno())
+    return store
+
+
+def get_store() -> RaceStore:
+    """메모리 저장소 (최초 호출 시 파일에서 로드)"""
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = _load_store()
+    return _store
+
+
+@contextmanager
+def locked_store() -> Iterator[RaceStore]:
+    """
+    저장소를 잠근 상태로 사용 (분석용)
+    np.frombuffer 로 버퍼를 빌려 쓰는 동안 append 가 배열 크기를 바꾸지 못하게 한다.
+    """
+    store = get_store()
+    with _lock:
+        yield store
+
+
+def append_race(name: str, total_laps: int, lap_times: Sequence[int],
+                started_at: Optional[int] = None) -> int:
+    """완료된 레이스를 파일과 메모리 저장소에 추가"""
+    record = RaceRecord(name, total_laps, array(LAP_TYPECODE, lap_times),
+                        started_at, int(time.time() * 1000))
+    store = get_store()
+    with _lock:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(HISTORY_FILE, "ab") as f:
+            if f.tell() == 0:
+                f.write(MAGIC)
+            record.write_to(f)
+        return store.append(record)
+
+
+def find_last_race(name: str, total_laps: int, lap_times: Sequence[int],
+                   started_at: Optional[int] = None) -> Optional[int]:
+    """마지막으로 저장된 레이스가 이 레이스면 race_id (저널 복구 시 중복 저장 방지용)"""
+    store = get_store()
+    with _lock:
+        if not len(store):
+            return None
+        race_id = len(store) - 1
+        record = store.record(race_id)
+    if (record.name, record.total_laps, record.started_at) != (name, int(total_laps), started_at or None):
+        return None
+    return race_id if record.lap_times.tolist() == list(lap_times) else None
+
+
+def iter_races() -> Iterator[Tuple[int, RaceRecord]]:
+    """호출 시점까지 저장된 (race_id, RaceRecord) 를 순서대로 하나씩 반환 (스트리밍용)"""
+    store = get_store()
+    with _lock:
+        count = len(store)
+    for race_id in range(count):
+        yield race_id, store.record(race_id)
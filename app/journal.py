@@ -0,0 +1,355 @@
+# app/journal.py
+"""
+진행 중 레이스 저널 (크래시 복구용)
+
+runner / lap_data / race_status 는 메모리에만 있으므로, 레이스 이벤트를 순서대로
+race.journal 에 추가 기록하고 서버 시작 시 재생해 진행 중이던 레이스를 그대로 복구한다.
+
+레코드: [u16 길이][u32 CRC32][payload]   payload = [u8 종류] + 필드 (little-endian)
+    TARGET_SET    u16 laps, utf8 name
+    RACE_STARTED  u64 ts (epoch ms)
+    LAP           u32 누적 랩 시간 (펌웨어 LAP 값)
+    RACE_ENDED    u64 ts
+    RESULT_SAVED  (없음)  - 리더보드/기록 저장 완료
+    RESET         (없음)
+
+- 기록: 호출 스레드(시리얼 리스너)는 큐에 넣기만 하고, 저널 스레드가 COMMIT_DELAY 동안 모인
+  레코드를 한 번에 write + fsync 한다 (group commit). fsync 중에 들어온 레코드는 다음 배치로.
+- 압축: 새 러너 지정(TARGET_SET)이나 RESET 이면 이전 레이스 레코드는 필요 없으므로
+  그 레코드 하나만 담은 새 파일로 원자적으로 교체한다 (파일 크기 = 레이스 하나).
+- 복구: CRC 가 맞지 않거나 잘린 꼬리(쓰는 도중 전원 차단)는 버리고 그 앞까지 재생한다.
+"""
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from app import metrics
+from app.bluetooth.state import runner, lap_data, race_status
+
+TARGET_SET = 1
+RACE_STARTED = 2
+LAP = 3
+RACE_ENDED = 4
+RESULT_SAVED = 5
+RESET = 6
+
+# 첫 레코드 후 잠깐 기다렸다가 모아서 커밋 (commit delay). 저널 스레드가 랩 처리 도중
+# 깨어나 GIL 을 나눠 쓰지 않고, 처리가 끝난 뒤에 기록하도록 한다.
+COMMIT_DELAY = 0.002  # 초
+
+COMMIT_HISTOGRAM = "journal_commit_ms"
+COMMIT_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_FRAME = struct.Struct("<HI")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+# 다음 레이스부터 새 파일로 (압축)
+_ROTATE = (TARGET_SET, RESET)
+
+
+def _frame(kind: int, body: bytes = b"") -> bytes:
+    payload = bytes((kind,)) + body
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _encode(kind: int, value) -> bytes:
+    if kind == LAP:
+        return _frame(kind, _U32.pack(value))
+    if kind in (RACE_STARTED, RACE_ENDED):
+        return _frame(kind, _U64.pack(value))
+    if kind == TARGET_SET:
+        name, laps = value
+        return _frame(kind, _U16.pack(laps) + name.encode("utf-8"))
+    return _frame(kind)
+
+
+def iter_records(buf: bytes) -> Iterator[Tuple[int, bytes, int]]:
+    """(종류, 필드 바이트, 레코드 끝 위치) - 손상/잘린 레코드에서 멈춤"""
+    pos = 0
+    while pos + _FRAME.size <= len(buf):
+        length, crc = _FRAME.unpack_from(buf, pos)
+        start, end = pos + _FRAME.size, pos + _FRAME.size + length
+        if length == 0 or end > len(buf):
+            return
+        payload = buf[start:end]
+        if zlib.crc32(payload) != crc:
+            return
+        yield payload[0], payload[1:], end
+        pos = end
+
+
+class Journal:
+    """레이스 이벤트 저널 (기록은 비동기 group commit)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._queue: "SimpleQueue[Tuple[int, bytes]]" = SimpleQueue()
+        self._file = None
+        self._appended = 0        # 큐에 넣은 레코드 수
+        self._committed = 0       # fsync 까지 끝난 레코드 수
+        self._failed = 0          # 기록 실패한 배치의 레코드 수 (committed 에 넣지 않음)
+        # 기록 실패: (실패한 첫 레코드 번호, 예외). 이후 압축(새 파일로 교체)이 성공하면 해제
+        self._error: Optional[Tuple[int, OSError]] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.commit_ms = metrics.histogram(COMMIT_HISTOGRAM, COMMIT_BUCKETS_MS)
+
+    # ── 기록 (호출 스레드는 큐에 넣기만 함) ──────────────────
+    # 인코딩(struct/CRC)은 저널 스레드에서 → 호출 쪽은 C 로 구현된 SimpleQueue.put 한 번
+    def _append(self, kind: int, value=None) -> None:
+        # 리스너 외에 Flask 요청/히트 진행 스레드에서도 호출됨 → flush() 가 보는 개수와 순서를 맞춤
+        with self._cond:
+            self._appended += 1
+            self._queue.put((kind, value))
+
+    def target_set(self, name: str, laps: int) -> None:
+        self._append(TARGET_SET, (name, int(laps)))
+
+    def race_started(self, ts_ms: int) -> None:
+        self._append(RACE_STARTED, int(ts_ms))
+
+    def lap(self, lap_ms: int) -> None:
+        self._append(LAP, int(lap_ms))
+
+    def race_ended(self, ts_ms: int) -> None:
+        self._append(RACE_ENDED, int(ts_ms))
+
+    def result_saved(self) -> None:
+        self._append(RESULT_SAVED)
+
+    def reset(self) -> None:
+        self._append(RESET)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        지금까지 넣은 레코드가 디스크에 반영될 때까지 대기 (시간 초과면 False)
+        그 레코드들 중 기록에 실패한 것이 있으면 OSError
+        """
+        with self._cond:
+            target = self._appended
+            if not self._cond.wait_for(lambda: self._committed + self._failed >= target, timeout):
+                return False
+            if self._error and self._error[0] <= target:
+                raise OSError(f"journal write failed: {self._error[1]}")
+            return True
+
+    # ── 저널 스레드 ───────────────────────────────────────
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+        self._thread = threading.Thread(target=self._run, name="race-journal", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            time.sleep(COMMIT_DELAY)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            started = time.perf_counter()
+            try:
+                rotated = self._commit(batch)
+            except OSError as e:
+                print(f"❌ 저널 기록 실패: {e}")
+                metrics.inc("journal_failures")
+                with self._cond:
+                    if self._error is None:
+                        self._error = (self._committed + self._failed + 1, e)
+                    self._failed += len(batch)
+                    self._cond.notify_all()
+                continue
+            self.commit_ms.observe((time.perf_counter() - started) * 1000)
+            metrics.inc("journal_batches")
+            metrics.inc("journal_records", len(batch))
+            with self._cond:
+                self._committed += len(batch)
+                if rotated:
+                    self._error = None   # 새 파일에는 실패 이전 레이스가 남아 있지 않음
+                self._cond.notify_all()
+
+    def _commit(self, batch: List[Tuple[int, object]]) -> bool:
+        """배치 기록 → 새 파일로 교체(압축)했으면 True"""
+        # 마지막 TARGET_SET/RESET 이전 레코드는 버리고 새 파일에서 시작
+        rotate_at = max((i for i, (kind, _) in enumerate(batch) if kind in _ROTATE), default=None)
+        if rotate_at is not None:
+            self._rewrite(b"".join(_encode(kind, value) for kind, value in batch[rotate_at:]))
+            return True
+        self._file.write(b"".join(_encode(kind, value) for kind, value in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return False
+
+    def _rewrite(self, data: bytes) -> None:
+        """임시 파일에 쓰고 fsync 후 rename (중간에 죽어도 이전 파일 또는 새 파일 중 하나)"""
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path.parent)
+        self._file = open(self.path, "ab")
+
+    # ── 복구 ─────────────────────────────────────────────
+    def replay(self) -> Optional[dict]:
+        """
+        저널을 재생해 runner / lap_data / race_status 복구
+        반환값: 복구한 레이스 정보 (저널이 비어 있으면 None)
+        """
+        if not self.path.exists():
+            return None
+        buf = self.path.read_bytes()
+        valid = 0
+        saved = False
+        started_at = None
+        for kind, body, end in iter_records(buf):
+            valid = end
+            if kind == TARGET_SET:
+                (laps,) = _U16.unpack_from(body)
+                _apply_target(body[_U16.size:].decode("utf-8"), laps)
+                saved, started_at = False, None
+            elif kind == RACE_STARTED:
+                started_at = _U64.unpack(body)[0]
+                race_status["ended"] = False
+                race_status["start_time"] = started_at
+            elif kind == LAP:
+                _apply_lap(_U32.unpack(body)[0])
+            elif kind == RACE_ENDED:
+                race_status["ended"] = True
+            elif kind == RESULT_SAVED:
+                saved = True
+            elif kind == RESET:
+                _apply_target(None, 0)
+                saved, started_at = False, None
+
+        if valid < len(buf):
+            print(f"⚠️ 저널 끝부분 손상 ({len(buf) - valid} bytes) → 잘라냄")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+                os.fsync(f.fileno())
+
+        name = runner["name"]
+        if not name:
+            return None
+        laps = lap_data[name] if name in lap_data else []
+        return {
+            "name": name,
+            "total_laps": runner["total_laps"],
+            "laps": len(laps),
+            "complete": len(laps) >= runner["total_laps"] > 0,
+            "saved": saved,
+            "started_at": started_at,
+        }
+
+
+def _fsync_dir(path: Path) -> None:
+    # rename 자체를 디스크에 반영 (디렉터리 fsync 는 POSIX 에서만 가능)
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _apply_target(name: Optional[str], laps: int) -> None:
+    # communication.set_target_runner / reset_lap_data 와 같은 상태 변경 (명령 전송 없음)
+    runner["name"] = name
+    runner["total_laps"] = laps
+    lap_data.clear()
+    race_status["ended"] = False
+    race_status["avg_lap_time"] = 0
+    race_status["start_time"] = None
+
+
+def _apply_lap(lap_ms: int) -> None:
+    # listener.handle_message 의 LAP 처리와 같은 상태 변경 (콜백/이벤트 없음)
+    name, total = runner["name"], runner["total_laps"]
+    if not name or total == 0:
+        return
+    laps = lap_data[name]
+    laps.append(lap_ms)
+    if len(laps) >= total:
+        durations = [laps[i] - laps[i - 1] for i in range(1, len(laps))]
+        race_status["ended"] = True
+        race_status["avg_time"] = sum(durations) // len(durations) if durations else 0
+        race_status["start_time"] = laps[0]
+
+
+# ── 모듈 전역 저널 ─────────────────────────────────────
+_journal: Optional[Journal] = None
+
+
+def get_journal() -> Optional[Journal]:
+    """recover() 이후의 저널 (비활성화 또는 web 노드면 None)"""
+    return _journal
+
+
+# === 공개 API (리스너/communication 에서 호출, 저널이 없으면 아무것도 안 함) ===
+def record_target_set(name: str, laps: int) -> None:
+    if _journal:
+        _journal.target_set(name, laps)
+
+def record_race_started(ts_ms: int) -> None:
+    if _journal:
+        _journal.race_started(ts_ms)
+
+def record_lap(lap_ms: int) -> None:
+    if _journal:
+        _journal.lap(lap_ms)
+
+def record_race_ended(ts_ms: int) -> None:
+    if _journal:
+        _journal.race_ended(ts_ms)
+
+def record_result_saved() -> None:
+    if _journal:
+        _journal.result_saved()
+
+def record_reset() -> None:
+    if _journal:
+        _journal.reset()
+
+
+def recover(path: str, insert_result_callback: Callable[..., object]) -> Optional[Journal]:
+    """
+    서버 시작 시 한 번: 저널 재생 → 진행 중 레이스 복구 → 기록 시작
+    마지막 랩까지 기록됐는데 RESULT_SAVED 가 없으면 저장한다. RESULT_SAVED 는 비동기로
+    커밋되므로 기록/리더보드에 이미 들어간 경우가 있다 → race_id 로 확인해서 빠진 쪽만 저장.
+    """
+    global _journal
+    journal = Journal(Path(path))
+    info = journal.replay()
+    journal.start()
+    _journal = journal
+
+    if info:
+        print(f"♻️ 저널 복구: {info['name']} {info['laps']}/{info['total_laps']} laps")
+        if info["complete"] and not info["saved"]:
+            from app.history import append_race, find_last_race
+            from app.leaderboard import has_race
+
+            name, total, laps = info["name"], info["total_laps"], lap_data[info["name"]]
+            avg = race_status.get("avg_time", 0)
+            race_id = find_last_race(name, total, laps, info["started_at"])
+            if race_id is None:
+                race_id = append_race(name, total, laps, info["started_at"])
+            if not has_race(race_id):
+                insert_result_callback(name, total, avg, race_id)
+                print(f"✅ 저장되지 않았던 결과 복구: {name} 평균 {avg}ms")
+            else:
+                print(f"ℹ️ 이미 저장된 결과: {name} (race #{race_id})")
+            journal.result_saved()
+    return journal
@@ -1,18 +1,43 @@
 # leaderboard.py
 import json
 from pathlib import Path
-from app.config import CONFIG
+from app.config import CONFIG, get_config
 
 # ✅ CONFIG에서 경로 가져오기
 LEADERBOARD_FILE = Path(CONFIG.data.leaderboard_path)
 
+# 변경 알림 (클러스터 전달용) / 웹 노드에서는 파일 대신 복제본 사용
+_change_listeners = []
+_result_listeners = []
+_replica = None
+
+def on_change(listener):
+    """리더보드 저장 시 listener(board) 호출"""
+    _change_listeners.append(listener)
+
+def on_result(listener):
+    """insert_result 로 레이스 결과가 저장된 직후 listener(name, laps, avg_lap_time) 호출"""
+    _result_listeners.append(listener)
+
+def set_replica(board):
+    """웹 노드: ingest 노드에서 받은 리더보드를 로컬 복제본으로 사용"""
+    global _replica
+    _replica = list(board)
+
 def load_leaderboard():
+    if _replica is not None:
+        return [dict(entry) for entry in _replica]
+
     # 데이터 디렉토리가 없으면 생성
     LEADERBOARD_FILE.parent.mkdir(parents=True, exist_ok=True)
     
     if LEADERBOARD_FILE.exists():
         with open(LEADERBOARD_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+            board = json.load(f)
+        # 예전 파일의 중복 필드 정리
+        for entry in board:
+            entry.pop("avg_lap_time_sec", None)
+        return board
     return []
 
 def save_leaderboard(data):
@@ -22,25 +47,45 @@ def save_leaderboard(data):
     with open(LEADERBOARD_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
-def insert_result(name, laps, avg_lap_time):
+    for listener in list(_change_listeners):
+        try:
+            listener(data)
+        except Exception as e:
+            print(f"⚠️ 리더보드 변경 알림 오류: {e}")
+
+def insert_result(name, laps, avg_lap_time, race_id=None):
+    """race_id: history 의 레이스 번호 (저널 복구 시 이미 저장된 결과인지 확인용)"""
     board = load_leaderboard()
-    board.append({
+    entry = {
         "name": name,
         "laps": laps,
-        "avg_lap_time": avg_lap_time,  # ms 단위
-        "avg_lap_time_sec": round(avg_lap_time / 1000, 2)  # 초 단위 추가
-    })
+        "avg_lap_time": avg_lap_time,  # ms 단위 (초 단위는 /result 에서 계산)
+    }
+    if race_id is not None:
+        entry["race_id"] = race_id
+    board.append(entry)
     board.sort(key=lambda x: x["avg_lap_time"])
-    # ✅ CONFIG에서 최대 항목 수 가져오기
-    board = board[:CONFIG.race.max_leaderboard_entries]
+    # ✅ 현재 설정에서 최대 항목 수 가져오기 (핫 리로드 반영)
+    board = board[:get_config().race.max_leaderboard_entries]
 
     for i, entry in enumerate(board):
         entry["rank"] = i + 1
 
     save_leaderboard(board)
+
+    for listener in list(_result_listeners):
+        try:
+            listener(name, laps, avg_lap_time)
+        except Exception as e:
+            print(f"⚠️ 결과 저장 알림 오류: {e}")
     return board
 
 
+def has_race(race_id):
+    """이 레이스의 결과가 리더보드에 있는지 (상위 N개에서 밀려난 경우도 False)"""
+    return any(entry.get("race_id") == race_id for entry in load_leaderboard())
+
+
 def get_rank(avg_lap_time):
     board = load_leaderboard()
     sorted_board = sorted(board, key=lambda x: x["avg_lap_time"])
@@ -0,0 +1,105 @@
+# app/metrics.py
+"""
+간단한 메트릭 저장소 (카운터 / 히스토그램)
+
+외부 의존성 없이 /api/metrics 로 내보낼 수 있는 형태만 유지한다.
+"""
+import bisect
+import math
+import threading
+from typing import Dict, List, Optional, Sequence
+
+# ms 단위 기본 버킷 (블루투스 왕복 ~ 레이스 교체 시간까지 커버)
+DEFAULT_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (상한 기준, 마지막 버킷은 +Inf)"""
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS_MS, unit: str = "ms"):
+        self.name = name
+        self.unit = unit
+        self.buckets: List[float] = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """버킷 경계로 근사한 퍼센타일 (버킷 안에서는 선형 보간)"""
+        with self._lock:
+            counts = list(self._counts)
+            total, lo_bound, hi_bound = self.count, self.min, self.max
+        if total == 0:
+            return None
+        rank = q / 100.0 * total
+        seen = 0
+        for idx, c in enumerate(counts):
+            if c and seen + c >= rank:
+                lower = self.buckets[idx - 1] if idx > 0 else lo_bound
+                upper = self.buckets[idx] if idx < len(self.buckets) else hi_bound
+                lower, upper = max(lower, lo_bound), min(upper, hi_bound)
+                return lower + (upper - lower) * ((rank - seen) / c)
+            seen += c
+        return hi_bound
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total, vmin, vmax = self.count, self.total, self.min, self.max
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "unit": self.unit,
+            "count": count,
+            "mean": round(total / count, 2) if count else None,
+            "min": _round(vmin),
+            "max": _round(vmax),
+            "p50": _round(self.percentile(50)),
+            "p90": _round(self.percentile(90)),
+            "p99": _round(self.percentile(99)),
+            "buckets": [[le, c] for le, c in zip(bounds, counts)],  # [상한, 개수]
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None or math.isnan(value) else round(value, 2)
+
+
+_lock = threading.Lock()
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[str, int] = {}
+
+
+def histogram(name: str, buckets: Sequence[float] = DEFAULT_BUCKETS_MS, unit: str = "ms") -> Histogram:
+    """이름으로 히스토그램을 가져오거나 생성"""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram(name, buckets, unit)
+        return hist
+
+
+def inc(name: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def snapshot() -> Dict:
+    with _lock:
+        hists = list(_histograms.values())
+        counters = dict(_counters)
+    return {
+        "counters": counters,
+        "histograms": {h.name: h.snapshot() for h in hists},
+    }
@@ -0,0 +1,116 @@
+# app/records.py
+"""
+레이스 기록 타입과 바이너리 직렬화
+
+RaceRecord 는 __slots__ 클래스이고 랩 시간은 array('I') (uint32, ms) 로 보관한다.
+파일 형식은 [MAGIC] + (헤더 + 이름(utf-8) + 랩 배열 바이트) 반복이고 모든 정수는 little-endian 이다.
+little-endian 호스트에서는 쓰기는 배열 버퍼를 그대로 write 하고 읽기는 memoryview 슬라이스를
+그대로 넘긴다 (big-endian 호스트만 laps_to_le / extend_laps_le 에서 byteswap).
+"""
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+LAP_TYPECODE = "I"
+assert array(LAP_TYPECODE).itemsize == 4, "array('I') 는 4바이트여야 합니다"
+
+MAGIC = b"RCR1"
+# name_len, total_laps, lap_count, started_at, ended_at (little-endian)
+HEADER = struct.Struct("<HIIQQ")
+_NEEDS_SWAP = sys.byteorder != "little"
+
+
+class RaceRecord:
+    """완료된 레이스 한 건 (lap_times 는 펌웨어 LAP 누적값, ms)"""
+
+    __slots__ = ("name", "total_laps", "started_at", "ended_at", "lap_times")
+
+    def __init__(self, name: str, total_laps: int, lap_times: Sequence[int],
+                 started_at: Optional[int] = None, ended_at: Optional[int] = None):
+        self.name = name
+        self.total_laps = int(total_laps)
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.lap_times = lap_times if isinstance(lap_times, array) and lap_times.typecode == LAP_TYPECODE \
+            else array(LAP_TYPECODE, lap_times)
+
+    def __repr__(self) -> str:
+        return f"RaceRecord({self.name!r}, {self.total_laps}, laps={len(self.lap_times)})"
+
+    def splits(self) -> array:
+        """랩별 구간 시간 (ms)"""
+        out = array(LAP_TYPECODE)
+        prev = 0
+        for t in self.lap_times:
+            out.append(max(0, t - prev))
+            prev = t
+        return out
+
+    def to_dict(self, race_id: Optional[int] = None) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "total_laps": self.total_laps,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "splits": self.splits().tolist(),
+            "lap_times": self.lap_times.tolist(),
+        }
+        if race_id is not None:
+            data = {"race_id": race_id, **data}
+        return data
+
+    # ── 직렬화 ───────────────────────────────────────────
+    def write_to(self, f) -> None:
+        """헤더와 랩 배열 버퍼를 그대로 기록 (little-endian 호스트에서는 랩 데이터 복사 없음)"""
+        name = self.name.encode("utf-8")
+        f.write(HEADER.pack(len(name), self.total_laps, len(self.lap_times),
+                            self.started_at or 0, self.ended_at or 0))
+        f.write(name)
+        f.write(laps_to_le(self.lap_times))
+
+
+# 파일의 랩 배열은 항상 little-endian uint32 (호스트와 무관)
+def laps_to_le(laps: array) -> array:
+    """기록용 little-endian 랩 배열 (little-endian 호스트면 그대로 반환)"""
+    if not _NEEDS_SWAP:
+        return laps
+    swapped = array(LAP_TYPECODE, laps)
+    swapped.byteswap()
+    return swapped
+
+
+def extend_laps_le(target: array, lap_bytes) -> None:
+    """파일에서 읽은 little-endian 랩 바이트를 target 뒤에 추가"""
+    start = len(target)
+    target.frombytes(lap_bytes)
+    if _NEEDS_SWAP:
+        tail = target[start:]
+        tail.byteswap()
+        target[start:] = tail
+
+
+def iter_serialized(buf) -> Iterator[Tuple[str, int, int, int, memoryview]]:
+    """
+    직렬화된 버퍼에서 (name, total_laps, started_at, ended_at, lap_bytes) 를 순서대로 반환
+    lap_bytes 는 원본 버퍼의 memoryview 슬라이스이다. 잘린 마지막 레코드는 무시한다.
+    """
+    view = memoryview(buf)
+    if len(view) == 0:
+        return
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("레이스 기록 파일 형식이 아닙니다")
+
+    pos = len(MAGIC)
+    end = len(view)
+    while pos + HEADER.size <= end:
+        name_len, total_laps, lap_count, started_at, ended_at = HEADER.unpack_from(view, pos)
+        name_at = pos + HEADER.size
+        laps_at = name_at + name_len
+        next_pos = laps_at + lap_count * 4
+        if next_pos > end:
+            print("⚠️ 마지막 레이스 기록이 잘려 있어 무시합니다")
+            return
+        name = str(view[name_at:laps_at], "utf-8")
+        yield name, total_laps, started_at, ended_at, view[laps_at:next_pos]
+        pos = next_pos
@@ -0,0 +1,187 @@
+# app/results.py
+"""
+전체 레이스 결과 조회 (/api/results 페이지네이션)
+
+leaderboard.json 은 상위 N개만 남기므로, 페이지 조회는 history.RaceStore 의 전체 레이스를 대상으로 한다.
+정렬 기준(평균/최고 랩)마다 (값 << 32 | race_id) 를 정렬된 array('Q') 로 유지해서
+keyset 페이지네이션(after=커서)이 bisect 한 번 + limit 개 읽기로 끝난다 (전체 건수와 무관).
+
+랩 구간(split) 정의 - analytics/export 도 lap_splits() 로 같은 정의를 쓴다:
+    펌웨어 LAP 값은 RACE_STARTED(첫 통과) 기준 누적 ms 이므로 첫 구간 = laps[0],
+    이후 구간 = laps[i] - laps[i-1] (음수는 0)
+- avg: 구간 평균 (정수 ms, 내림). 리더보드(/result)의 평균은 예전 계산(첫 랩 제외)을 그대로 둔다
+- best: 가장 빠른 구간
+- 드라이버 필터는 드라이버별 인덱스를 따로 두고, 랩 수 필터는 스캔하며 건너뛴다
+"""
+import bisect
+import json
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SORT_KEYS = ("avg", "best")
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 10000
+CHUNK_ROWS = 200        # 스트리밍 시 한 번에 내보내는 행 수
+SCAN_FACTOR = 20        # 필터로 건너뛸 수 있는 최대 행 수 = limit × SCAN_FACTOR (최소 MIN_SCAN)
+MIN_SCAN = 5000
+_NO_LAPS = 0xFFFFFFFF   # 랩이 없는 기록은 맨 뒤로
+_ID_MASK = 0xFFFFFFFF
+
+
+def lap_splits(elapsed, offsets, laps_per_race):
+    """레이스별 누적 랩 시간 (NumPy) -> 구간 시간 (각 레이스 첫 구간은 누적값 그대로, 음수는 0)"""
+    import numpy as np
+
+    elapsed = np.asarray(elapsed, dtype=np.float64)
+    prev = np.empty_like(elapsed)
+    if len(elapsed):
+        prev[0] = 0
+        prev[1:] = elapsed[:-1]
+        prev[offsets[:-1][laps_per_race > 0]] = 0
+    return np.clip(elapsed - prev, 0, None)
+
+
+def lap_stats(laps) -> Tuple[int, int]:
+    """누적 랩 배열 → (구간 평균 ms, 최고 구간 ms), lap_splits 와 같은 구간 정의"""
+    n = len(laps)
+    if n == 0:
+        return _NO_LAPS, _NO_LAPS
+    total = best = laps[0]
+    for i in range(1, n):
+        split = max(0, laps[i] - laps[i - 1])
+        total += split
+        if split < best:
+            best = split
+    return total // n, best
+
+
+def encode_cursor(value: int, race_id: int) -> str:
+    return f"{value}-{race_id}"
+
+
+def decode_cursor(cursor: str) -> int:
+    """커서 → 정렬 키 (형식이 틀리면 ValueError)"""
+    value, _, race_id = cursor.partition("-")
+    value, race_id = int(value), int(race_id)
+    if not (0 <= value <= _NO_LAPS and 0 <= race_id <= _ID_MASK):
+        raise ValueError("cursor out of range")
+    return (value << 32) | race_id
+
+
+class ResultIndex:
+    """정렬 기준별 keyset 인덱스 (RaceStore 가 append 할 때 같이 갱신)"""
+
+    def __init__(self):
+        self.avg_ms = array("I")    # race -> 평균 랩
+        self.best_ms = array("I")   # race -> 최고 구간
+        self._all: Dict[str, array] = {key: array("Q") for key in SORT_KEYS}
+        self._by_driver: Dict[int, Dict[str, array]] = {}
+
+    def _keys(self, sort: str, driver: Optional[int]) -> array:
+        if driver is None:
+            return self._all[sort]
+        per_driver = self._by_driver.get(driver)
+        return per_driver[sort] if per_driver else array("Q")
+
+    def add(self, race_id: int, driver: int, laps) -> None:
+        avg, best = lap_stats(laps)
+        self.avg_ms.append(avg)
+        self.best_ms.append(best)
+        per_driver = self._by_driver.setdefault(driver, {key: array("Q") for key in SORT_KEYS})
+        for sort, value in (("avg", avg), ("best", best)):
+            key = (value << 32) | race_id
+            # 대부분 새 기록은 뒤쪽 → insort 의 memmove 는 배열 크기에 비례하지만 C 수준이라 충분히 빠름
+            bisect.insort(self._all[sort], key)
+            bisect.insort(per_driver[sort], key)
+
+    @classmethod
+    def build(cls, store) -> "ResultIndex":
+        """기존 기록으로 한 번에 생성 (NumPy 로 통계 계산 + 정렬 한 번, 20만 건 ~0.2초)"""
+        import numpy as np  # 서버 시작 시간에서 빼기 위해 처음 조회할 때만 로드
+
+        index = cls()
+        n_races = len(store)
+        if n_races == 0:
+            return index
+        offsets = np.frombuffer(store.offsets, dtype=np.uint64)[: n_races + 1].astype(np.int64)
+        elapsed = np.frombuffer(store.laps, dtype=np.uint32)[: offsets[-1]].astype(np.int64)
+        starts, counts = offsets[:-1], np.diff(offsets)
+        has_laps = counts > 0
+        avg = np.full(n_races, _NO_LAPS, dtype=np.int64)
+        best = np.full(n_races, _NO_LAPS, dtype=np.int64)
+        if len(elapsed):
+            lap_starts = starts[has_laps]
+            splits = lap_splits(elapsed, offsets, counts).astype(np.int64)
+            # lap_stats 와 같은 정수 계산
+            avg[has_laps] = np.add.reduceat(splits, lap_starts) // counts[has_laps]
+            best[has_laps] = np.minimum.reduceat(splits, lap_starts)
+
+        index.avg_ms = array("I", avg.astype(np.uint32).tobytes())
+        index.best_ms = array("I", best.astype(np.uint32).tobytes())
+        race_ids = np.arange(n_races, dtype=np.uint64)
+        drivers = np.frombuffer(store.driver, dtype=np.uint32)[:n_races]
+        per_driver: Dict[int, Dict[str, array]] = {}
+        for sort, values in (("avg", avg), ("best", best)):
+            keys = (values.astype(np.uint64) << np.uint64(32)) | race_ids
+            index._all[sort] = array("Q", np.sort(keys).tobytes())
+            # 드라이버별: (드라이버, 키) 순으로 정렬한 뒤 드라이버 경계에서 자름
+            order = np.lexsort((keys, drivers))
+            sorted_keys, sorted_drivers = keys[order], drivers[order]
+            bounds = np.flatnonzero(np.diff(sorted_drivers)) + 1
+            for part_keys, part_drivers in zip(np.split(sorted_keys, bounds), np.split(sorted_drivers, bounds)):
+                per_driver.setdefault(int(part_drivers[0]), {})[sort] = array("Q", part_keys.tobytes())
+        index._by_driver = per_driver
+        return index
+
+    def page(self, sort: str, after: Optional[int], limit: int, driver: Optional[int],
+             total_laps: Optional[int], store) -> Tuple[List[int], Optional[str]]:
+        """
+        race_id 목록과 다음 페이지 커서 (락 안에서 호출, 결과는 limit 개 이하)
+        커서가 None 이면 마지막 페이지
+        """
+        keys = self._keys(sort, driver)
+        pos = bisect.bisect_right(keys, after) if after is not None else 0
+        # 랩 수 필터가 거의 안 맞아도 한 요청이 훑는 양은 제한 (남은 건 다음 커서로)
+        budget = max(limit * SCAN_FACTOR, MIN_SCAN)
+        race_ids: List[int] = []
+        last_key = None
+        while pos < len(keys) and len(race_ids) < limit and budget > 0:
+            key = keys[pos]
+            pos += 1
+            budget -= 1
+            last_key = key
+            race_id = key & _ID_MASK
+            if total_laps is not None and store.total_laps[race_id] != total_laps:
+                continue
+            race_ids.append(race_id)
+        cursor = None
+        if pos < len(keys) and last_key is not None:
+            cursor = encode_cursor(last_key >> 32, last_key & _ID_MASK)
+        return race_ids, cursor
+
+
+def _seconds(ms: int) -> Optional[float]:
+    return None if ms == _NO_LAPS else round(ms / 1000, 2)
+
+
+def iter_page_json(store, race_ids: List[int], cursor: Optional[str]) -> Iterator[str]:
+    """{"items": [...], "next": 커서} 를 CHUNK_ROWS 행씩 나눠 내보냄 (chunked 전송용)"""
+    index = store.result_index()
+    yield '{"items":['
+    chunk: List[str] = []
+    for n, race_id in enumerate(race_ids):
+        row = {
+            "race_id": race_id,
+            "name": store.names[store.driver[race_id]],
+            "laps": store.total_laps[race_id],
+            "avg_lap_time": _seconds(index.avg_ms[race_id]),   # 초 단위 (구간 평균, 첫 랩 포함)
+            "best_lap_time": _seconds(index.best_ms[race_id]),
+            "ended_at": store.ended_at[race_id] or None,
+        }
+        chunk.append(("," if n else "") + json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+        if len(chunk) >= CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+    yield '],"next":' + json.dumps(cursor) + "}"
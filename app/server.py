@@ -1,15 +1,23 @@
 import os
 import json
+import time
+import struct
+from concurrent.futures import TimeoutError as FutureTimeout
+from queue import Empty
 from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
-from threading import Thread
+from threading import Thread, Lock, Event
 
-from app.bluetooth.listener import start_listener
-from app.bluetooth.communication import set_target_runner, reset_lap_data, get_current_laps
+from app.bluetooth.communication import set_target_runner, reset_lap_data, get_current_laps, set_telemetry
 from app.leaderboard import load_leaderboard, save_leaderboard, insert_result
 from app.bluetooth.state import runner
-from app.events import sse_generator   # ✅ events.py의 SSE 제너레이터 사용
-from app.config import CONFIG  # ✅ CONFIG 추가
+from app.bluetooth.commands import CommandError
+from app.events import sse_generator, publish_config_updated   # ✅ events.py의 SSE 제너레이터 사용
+from app.config import get_config, start_config_watcher, subscribe  # ✅ 핫 리로드 설정
+from app.history import iter_races, locked_store
+from app import heats, metrics, telemetry
+from app.export import FORMATS, iter_csv, iter_ndjson, build_npz
+from app.results import SORT_KEYS, DEFAULT_LIMIT, MAX_LIMIT, decode_cursor, iter_page_json
 
 # ── 프로젝트 경로 설정 ───────────────────────────────────
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -45,49 +53,199 @@ def serve_static(filename):
 
 # ── API 엔드포인트 ──────────────────────────────────────
 
-@app.post("/start")
-def start_race():
-    data = request.get_json() or {}
+READ_ONLY_ERROR = "Read-only web node: send race control requests to the ingest node"
+# web 노드에는 리더보드/레이스 상태만 복제됨 (기록/분석/텔레메트리는 ingest 노드에만 있음)
+INGEST_ONLY_ERROR = "Not replicated to web nodes: query race history and telemetry on the ingest node"
+
+def _web_node_response(error=READ_ONLY_ERROR):
+    """web 노드는 읽기 전용 (레이스 제어는 ingest 노드에서)"""
+    if get_config().cluster.role == "web":
+        return jsonify({"error": error}), 409
+    return None
+
+def _validate_entry(data):
+    """참가자 이름/랩 수 검증 → 오류 메시지 (정상이면 None)"""
     name = data.get("name")
     laps = data.get("laps")
 
     if not name or not laps:
-        return jsonify({"error": "Missing name or laps"}), 400
+        return "Missing name or laps"
 
     # ✅ CONFIG 기반 검증
     if not isinstance(name, str) or len(name.strip()) == 0:
-        return jsonify({"error": "Invalid driver name"}), 400
+        return "Invalid driver name"
     
-    if not isinstance(laps, int) or laps < CONFIG.race.min_laps or laps > CONFIG.race.max_laps:
-        return jsonify({"error": f"Laps must be between {CONFIG.race.min_laps} and {CONFIG.race.max_laps}"}), 400
+    race_cfg = get_config().race
+    if not isinstance(laps, int) or laps < race_cfg.min_laps or laps > race_cfg.max_laps:
+        return f"Laps must be between {race_cfg.min_laps} and {race_cfg.max_laps}"
+    return None
+
+def _start_race(data):
+    """START 요청 처리 → (응답 body, 상태 코드). HTTP /start 와 WebSocket 이 공유"""
+    if get_config().cluster.role == "web":
+        return {"error": READ_ONLY_ERROR}, 409
+
+    error = _validate_entry(data)
+    if error:
+        return {"error": error}, 400
+    name, laps = data["name"], data["laps"]
 
     try:
-        set_target_runner(name.strip(), int(laps))
-        return jsonify({"message": "Race started", "driver": name.strip(), "laps": laps}), 200
+        ack = set_target_runner(name.strip(), int(laps))
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return {"error": str(e)}, 500
+
+    # ✅ wait=false 면 응답을 기다리지 않고 202 (결과는 SSE command 이벤트로 전달)
+    if data.get("wait", True) is False:
+        return {"message": "Start command sent", "driver": name.strip(), "laps": laps}, 202
+
+    serial_cfg = get_config().serial
+    try:
+        rtt_ms = ack.result(timeout=serial_cfg.command_timeout * (serial_cfg.command_retries + 1) + 1)
+    except (CommandError, FutureTimeout) as e:
+        return {"error": f"Lap timer did not acknowledge START: {e}"}, 504
+    return {"message": "Race started", "driver": name.strip(), "laps": laps, "ack_rtt_ms": rtt_ms}, 200
+
+@app.post("/start")
+def start_race():
+    body, status = _start_race(request.get_json() or {})
+    return jsonify(body), status
 
 @app.post("/reset")
 def reset():
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
     save_leaderboard([])
     reset_lap_data()
     return jsonify({"message": "리더보드 초기화 완료"})
 
-@app.get("/result")
-def get_leaderboard():
+# ✅ 히트 대기열 (결과 저장 시 다음 참가자 자동 시작)
+@app.get("/api/heats")
+def get_heats():
+    return jsonify(heats.snapshot())
+
+@app.post("/api/heats")
+def enqueue_heat():
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    data = request.get_json() or {}
+    error = _validate_entry(data)
+    if error:
+        return jsonify({"error": error}), 400
+    entry = heats.enqueue(data["name"].strip(), data["laps"])
+    return jsonify(entry), 201
+
+@app.delete("/api/heats/<int:heat_id>")
+def remove_heat(heat_id):
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    if not heats.remove(heat_id):
+        return jsonify({"error": "Heat not found"}), 404
+    return jsonify(heats.snapshot())
+
+@app.post("/api/heats/<int:heat_id>/move")
+def move_heat(heat_id):
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    position = (request.get_json() or {}).get("position")
+    if not isinstance(position, int) or position < 0:
+        return jsonify({"error": "position must be a non-negative integer"}), 400
+    if not heats.move(heat_id, position):
+        return jsonify({"error": "Heat not found"}), 404
+    return jsonify(heats.snapshot())
+
+@app.post("/api/heats/next")
+def next_heat():
+    """대기열 맨 앞 참가자를 지금 시작 (응답 확인은 SSE command 이벤트로)"""
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    if heats.advance() is None:
+        return jsonify({"error": "Heat queue is empty"}), 409
+    return jsonify(heats.snapshot()), 202
+
+@app.post("/api/heats/auto")
+def auto_advance():
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    enabled = (request.get_json() or {}).get("enabled")
+    if not isinstance(enabled, bool):
+        return jsonify({"error": "enabled must be true or false"}), 400
+    heats.set_auto_advance(enabled)
+    return jsonify(heats.snapshot())
+
+@app.delete("/api/heats")
+def clear_heats():
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    heats.clear()
+    return jsonify(heats.snapshot())
+
+def _result_rows():
     data = load_leaderboard()
-    return jsonify([
+    return [
         {
             "rank": item.get("rank", idx + 1),
             "name": item["name"],
             "laps": item["laps"],
-            "avg_lap_time": item.get("avg_lap_time_sec", round(item["avg_lap_time"] / 1000, 2))
+            "avg_lap_time": round(item["avg_lap_time"] / 1000, 2)  # 초 단위
         }
         for idx, item in enumerate(data)
-    ])
+    ]
 
-@app.get("/laps")
-def laps():
+@app.get("/result")
+def get_leaderboard():
+    return jsonify(_result_rows())
+
+# ✅ 전체 레이스 기록 페이지 조회: ?sort=avg|best&limit=N&after=커서&driver=이름&laps=N
+# (리더보드가 아닌 history 기준, web 노드에는 기록이 복제되지 않으므로 409)
+@app.get("/api/results")
+def get_results():
+    blocked = _web_node_response(INGEST_ONLY_ERROR)
+    if blocked:
+        return blocked
+
+    sort = request.args.get("sort", "avg")
+    if sort not in SORT_KEYS:
+        return jsonify({"error": f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+    try:
+        limit = int(request.args.get("limit", DEFAULT_LIMIT))
+        total_laps = int(request.args["laps"]) if "laps" in request.args else None
+    except ValueError:
+        return jsonify({"error": "limit and laps must be integers"}), 400
+    if not 1 <= limit <= MAX_LIMIT:
+        return jsonify({"error": f"limit must be between 1 and {MAX_LIMIT}"}), 400
+    try:
+        after = decode_cursor(request.args["after"]) if request.args.get("after") else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    with locked_store() as store:
+        driver = None
+        if "driver" in request.args:
+            driver = store.driver_id(request.args["driver"])
+            if driver is None:
+                return jsonify({"items": [], "next": None})
+        race_ids, cursor = store.result_index().page(sort, after, limit, driver, total_laps, store)
+
+    # 행 JSON 은 락 밖에서 조금씩 만들어 보냄 (저장소는 추가만 되므로 race_id 는 그대로 유효)
+    return Response(stream_with_context(iter_page_json(store, race_ids, cursor)),
+                    mimetype="application/json")
+
+def _laps_body():
     status = get_current_laps() or {}
 
     # rank 계산 (네가 쓰던 방식 유지)
@@ -99,7 +257,7 @@ def laps():
                 rank = entry.get("rank")
                 break
 
-    return jsonify({
+    return {
         "laps": status.get("lap_times", []),
         "status": "ENDED" if status.get("ended") else "RACING",
         "avg_lap_time": status.get("avg_lap_time"),   # ms
@@ -107,28 +265,272 @@ def laps():
         "start_time": status.get("start_time"),
         "name": runner.get("name"),                   # ✅ 추가
         "total_laps": runner.get("total_laps"),
-    })
+    }
+
+@app.get("/laps")
+def laps():
+    return jsonify(_laps_body())
 
 # ✅ 설정 정보 API 추가
 @app.get("/api/config")
-def get_config():
+def get_config_info():
     """현재 설정 정보 반환 (민감한 정보 제외)"""
+    config = get_config()
     return jsonify({
-        "serial_port": CONFIG.serial.port,
-        "serial_baudrate": CONFIG.serial.baudrate,
-        "max_leaderboard_entries": CONFIG.race.max_leaderboard_entries,
-        "min_laps": CONFIG.race.min_laps,
-        "max_laps": CONFIG.race.max_laps,
-        "default_laps": CONFIG.race.default_laps,
-        "debug_mode": CONFIG.server.debug
+        "serial_port": config.serial.port,
+        "serial_baudrate": config.serial.baudrate,
+        "max_leaderboard_entries": config.race.max_leaderboard_entries,
+        "min_laps": config.race.min_laps,
+        "max_laps": config.race.max_laps,
+        "default_laps": config.race.default_laps,
+        "debug_mode": config.server.debug
     })
 
+# ✅ 레이스 기록 내보내기 (스트리밍)
+@app.get("/api/export/<fmt>")
+def export_races(fmt):
+    blocked = _web_node_response(INGEST_ONLY_ERROR)
+    if blocked:
+        return blocked
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Unsupported format (use one of {', '.join(FORMATS)})"}), 400
+
+    if fmt == "npz":
+        return Response(build_npz(), mimetype="application/octet-stream",
+                        headers={"Content-Disposition": "attachment; filename=races.npz"})
+
+    if fmt == "csv":
+        body, mimetype = iter_csv(iter_races()), "text/csv"
+    else:
+        body, mimetype = iter_ndjson(iter_races()), "application/x-ndjson"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename=races.{fmt}"})
+
+# ✅ 드라이버별 분석
+@app.get("/api/analytics")
+def analytics():
+    blocked = _web_node_response(INGEST_ONLY_ERROR)
+    if blocked:
+        return blocked
+    from app.analytics import driver_report, DEFAULT_PERCENTILES
+
+    percentiles = DEFAULT_PERCENTILES
+    if request.args.get("percentiles"):
+        try:
+            percentiles = tuple(float(q) for q in request.args["percentiles"].split(","))
+        except ValueError:
+            return jsonify({"error": "percentiles must be comma separated numbers"}), 400
+        if any(q < 0 or q > 100 for q in percentiles):
+            return jsonify({"error": "percentiles must be between 0 and 100"}), 400
+
+    with locked_store() as store:
+        report = driver_report(store, percentiles, driver=request.args.get("driver"))
+    return jsonify(report)
+
+# ✅ 센서 텔레메트리 (거리값, 다운샘플링)
+def _telemetry_params(defaults):
+    """points/mode (+ from/to 또는 window) 파싱 → (값 dict, 오류 메시지)"""
+    args = request.args
+    max_points = get_config().telemetry.max_points
+    mode = args.get("mode", "minmax")
+    if mode not in telemetry.MODES:
+        return None, f"mode must be one of {', '.join(telemetry.MODES)}"
+    try:
+        values = {key: int(args[key]) if key in args else default for key, default in defaults.items()}
+        points = int(args.get("points", min(telemetry.DEFAULT_POINTS, max_points)))
+    except ValueError:
+        return None, f"{', '.join(defaults)} and points must be integers"
+    if not 3 <= points <= max_points:
+        return None, f"points must be between 3 and {max_points}"
+    values.update(points=points, mode=mode, track=args.get("track", telemetry.DEFAULT_TRACK))
+    return values, None
+
+@app.get("/api/telemetry")
+def get_telemetry():
+    blocked = _web_node_response(INGEST_ONLY_ERROR)
+    if blocked:
+        return blocked
+    params, error = _telemetry_params({"from": None, "to": None})
+    if error:
+        return jsonify({"error": error}), 400
+    body = telemetry.query(params["track"], params["from"], params["to"], params["points"], params["mode"])
+    if body is None:
+        return jsonify({"error": f"No telemetry for track '{params['track']}'"}), 404
+    body["enabled"] = telemetry.is_enabled()
+    return jsonify(body)
+
+@app.get("/api/telemetry/stream")
+def stream_telemetry():
+    blocked = _web_node_response(INGEST_ONLY_ERROR)
+    if blocked:
+        return blocked
+    params, error = _telemetry_params({"window": 30000})
+    if error:
+        return jsonify({"error": error}), 400
+    headers = {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+    }
+    body = telemetry.iter_stream(params["track"], params["window"], params["points"], params["mode"],
+                                 get_config().telemetry.stream_interval)
+    return Response(stream_with_context(body), headers=headers)
+
+@app.post("/api/telemetry")
+def toggle_telemetry():
+    blocked = _web_node_response()
+    if blocked:
+        return blocked
+
+    enabled = (request.get_json() or {}).get("enabled")
+    if not isinstance(enabled, bool):
+        return jsonify({"error": "enabled must be a boolean"}), 400
+
+    ack = set_telemetry(enabled)
+    serial_cfg = get_config().serial
+    try:
+        rtt_ms = ack.result(timeout=serial_cfg.command_timeout * (serial_cfg.command_retries + 1) + 1)
+    except (CommandError, FutureTimeout) as e:
+        return jsonify({"error": f"Lap timer did not acknowledge {telemetry.command(enabled)[0]}: {e}"}), 504
+    return jsonify({"enabled": enabled, "ack_rtt_ms": rtt_ms})
+
+# ✅ 메트릭 (명령 왕복 시간 히스토그램 등)
+@app.get("/api/metrics")
+def get_metrics():
+    return jsonify(metrics.snapshot())
+
+# ── WebSocket (선택) ─────────────────────────────────────
+# flask-sock 이 설치되어 있으면 /ws 하나로 이벤트 구독 + 제어 명령을 처리한다.
+# 메시지 형식은 app/wire.py 참고. 없으면 기존 SSE + HTTP 만 사용.
+WS_PING_INTERVAL = 25  # 초 (SSE keep-alive 와 같은 주기)
+
+def _ws_session(ws, disconnect_errors):
+    """연결 하나: 이벤트 전송 스레드 + 요청 수신 루프 (disconnect_errors: 연결 끊김 예외들)"""
+    from app import events, wire
+
+    send_lock = Lock()   # 이벤트 전송 스레드와 요청 응답이 같은 소켓에 씀
+    closed = Event()
+    channels = [wire.CH_ALL]
+
+    def send(frame):
+        with send_lock:
+            ws.send(frame)
+
+    def respond(req_id, handler, *args):
+        try:
+            body, status = handler(*args)
+        except Exception as e:
+            body, status = {"error": str(e)}, 500
+        try:
+            send(wire.encode_response(req_id, status, body))
+        except disconnect_errors:
+            closed.set()
+
+    def pump(q):
+        try:
+            while not closed.is_set():
+                try:
+                    ev = q.get(timeout=1.0)
+                except Empty:
+                    continue
+                et = ev.get("type") or "message"
+                if not wire.channel_of(et) & channels[0]:
+                    continue
+                try:
+                    frame = wire.encode_event(et, ev.get("payload") or {})
+                except (struct.error, ValueError, TypeError, KeyError) as e:
+                    # 이벤트 하나가 잘못돼도 전송 스레드가 죽어 세션이 조용히 멈추면 안 됨
+                    print(f"⚠️ [WS] 이벤트 인코딩 실패, 건너뜀: {et} ({e})")
+                    continue
+                send(frame)
+        except disconnect_errors:
+            pass
+        finally:
+            closed.set()
+
+    q = events.subscribe()
+    Thread(target=pump, args=(q,), daemon=True).start()
+    try:
+        while not closed.is_set():
+            frame = ws.receive(timeout=1.0)   # 연결이 끊기면 disconnect_errors
+            if frame is None:
+                continue
+            if isinstance(frame, str):
+                frame = frame.encode("utf-8")
+            try:
+                kind, fields = wire.decode_client(frame)
+            except ValueError as e:
+                print(f"⚠️ [WS] 잘못된 메시지: {e}")
+                continue
+
+            if kind == wire.PING:
+                send(wire.encode_pong(fields["client_ts"], time.time() * 1000))
+            elif kind == wire.SUBSCRIBE:
+                channels[0] = fields["mask"]
+            elif kind == wire.GET_LAPS:
+                respond(fields["req_id"], lambda: (_laps_body(), 200))
+            elif kind == wire.GET_RESULT:
+                respond(fields["req_id"], lambda: (_result_rows(), 200))
+            elif kind == wire.START:
+                # 응답 확인까지 수 초 걸릴 수 있으므로 수신 루프를 막지 않도록 별도 스레드
+                data = {"name": fields["name"], "laps": fields["laps"]}
+                Thread(target=respond, args=(fields["req_id"], _start_race, data), daemon=True).start()
+    finally:
+        closed.set()
+        events.unsubscribe(q)
+
+def _register_websocket():
+    """/ws 등록 (flask-sock + wsproto import 가 ~35 ms 라 import 시점이 아닌 run() 에서)"""
+    try:
+        from flask_sock import Sock, ConnectionClosed
+    except ImportError:
+        print("ℹ️ flask-sock 미설치 → WebSocket(/ws) 비활성화 (SSE 만 사용)")
+        return False
+
+    app.config.setdefault("SOCK_SERVER_OPTIONS", {"ping_interval": WS_PING_INTERVAL})
+    sock = Sock(app)
+
+    @sock.route("/ws")
+    def ws_endpoint(ws):
+        try:
+            _ws_session(ws, (ConnectionClosed, OSError))
+        except (ConnectionClosed, OSError):
+            pass
+    return True
+
 # ── 실행 ────────────────────────────────────────────────
 def run():
-    Thread(target=start_listener, args=(insert_result,), daemon=True).start()
+    # ✅ 설정 파일 변경 감시 (포트/랩 제한 등을 재시작 없이 반영)
+    subscribe(lambda old, new: publish_config_updated())
+    start_config_watcher()
+    config = get_config()
+
+    # ✅ 저널 재생으로 재시작 전 진행 중이던 레이스 복구 (ingest/standalone 만, 발행 시작 전에)
+    if config.cluster.role != "web" and config.data.journal_file:
+        from app.journal import recover
+        recover(config.data.journal_path, insert_result)
+
+    # ✅ 히트 대기열 자동 진행 (결과 저장/레이스 이벤트 리스너, web 노드는 복제본만 사용)
+    if config.cluster.role != "web":
+        heats.install()
+
+    # ✅ 다중 노드: ingest 는 변경분 발행, web 은 ingest 복제본으로만 응답
+    from app.cluster import start_node
+    start_node(config)
+    _register_websocket()
+
+    if config.cluster.role != "web":
+        # ✅ 시리얼 포트 열기는 백그라운드 스레드에서 (pyserial import 포함) → 첫 페이지 응답을 막지 않음
+        from app.bluetooth.listener import start_listener
+        Thread(target=start_listener, args=(insert_result,), daemon=True).start()
+
     # ✅ CONFIG 기반 서버 실행
+    # reloader 는 프로세스를 두 번 띄워 기동이 느리고 시리얼 포트를 두 번 열려고 하므로 끔
+    print(f"🖥️ 노드 역할: {config.cluster.role}")
     app.run(
-        debug=CONFIG.server.debug,
-        host=CONFIG.server.host,
-        port=CONFIG.server.port
+        debug=config.server.debug,
+        host=config.server.host,
+        port=config.server.port,
+        use_reloader=False,
     )
@@ -0,0 +1,242 @@
+# app/telemetry.py
+"""
+센서 거리 텔레메트리 (랩 누락/중복 감지 원인 분석용)
+
+펌웨어에 TELEMETRY ON 을 보내면 loop() 마다(50ms) 초음파 거리값을 "D:<cm>" 로 보낸다.
+서버는 받은 시각(epoch ms)과 함께 트랙별 고정 크기 링 버퍼에 넣고, 조회할 때만
+min/max 또는 LTTB 로 points 개 이하로 줄여서 보낸다 → 확대/축소와 관계없이 응답 크기 일정.
+
+- 수집: 리스너가 "D:" 줄을 디코딩/출력/이벤트 없이 바로 ingest_line() 으로 넘김 (샘플당 수 µs)
+- 조회: 락 안에서는 배열 복사만 하고, NumPy 계산은 락 밖에서 (리스너를 막지 않음)
+- 다중 노드: 링 버퍼는 시리얼을 여는 노드(standalone/ingest)에만 있다
+- 켜기/끄기: 설정/API/재연결 모두 응답 확인 명령 채널(listener.request_telemetry)로 보내고,
+  펌웨어가 TELEMETRY_ON/OFF 로 응답한 뒤에만 set_enabled() 로 상태를 바꾼다
+"""
+import json
+import threading
+import time
+from array import array
+from typing import Dict, Iterator, Optional
+
+from app import metrics
+from app.config import get_config, subscribe
+
+PREFIX = b"D:"
+DEFAULT_TRACK = "main"          # 리스너(시리얼 포트) 하나 = 트랙 하나
+MODES = ("minmax", "lttb", "raw")
+DEFAULT_POINTS = 500
+KEEPALIVE_INTERVAL = 25         # 초 (SSE keep-alive, events.py 와 같은 주기)
+
+CMD_ON, ACK_ON = "TELEMETRY ON", "TELEMETRY_ON"
+CMD_OFF, ACK_OFF = "TELEMETRY OFF", "TELEMETRY_OFF"
+
+
+class TelemetryRing:
+    """(수신 시각 ms, 거리 cm) 고정 크기 링 버퍼 - 가득 차면 가장 오래된 샘플부터 덮어씀"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.t = array("Q", bytes(8 * capacity))
+        self.d = array("I", bytes(4 * capacity))
+        self.count = 0              # 지금까지 받은 샘플 수 (덮어쓴 것 포함)
+        self._lock = threading.Lock()
+
+    def append(self, t_ms: int, distance: int) -> None:
+        with self._lock:
+            i = self.count % self.capacity
+            self.t[i] = t_ms
+            self.d[i] = distance
+            self.count += 1
+
+    def snapshot(self):
+        """시간 순으로 정렬된 (t, d) NumPy 복사본"""
+        import numpy as np
+
+        with self._lock:
+            n = min(self.count, self.capacity)
+            head = self.count % self.capacity
+            t = np.frombuffer(self.t, dtype=np.uint64)
+            d = np.frombuffer(self.d, dtype=np.uint32)
+            if self.count <= self.capacity:
+                return t[:n].astype(np.int64), d[:n].astype(np.int64)
+            return (np.concatenate((t[head:], t[:head])).astype(np.int64),
+                    np.concatenate((d[head:], d[:head])).astype(np.int64))
+
+    def resize(self, capacity: int) -> None:
+        """용량 변경 (최근 샘플부터 새 용량만큼 유지)"""
+        t, d = self.snapshot()
+        keep = min(len(t), capacity)
+        with self._lock:
+            self.capacity = capacity
+            self.t = array("Q", bytes(8 * capacity))
+            self.d = array("I", bytes(4 * capacity))
+            self.t[:keep] = array("Q", t[len(t) - keep:].astype("uint64").tobytes())
+            self.d[:keep] = array("I", d[len(d) - keep:].astype("uint32").tobytes())
+            self.count = keep
+
+
+_rings: Dict[str, TelemetryRing] = {}
+_rings_lock = threading.Lock()
+_wanted: Optional[bool] = None    # 응답까지 확인된 마지막 요청 (None = 설정값 사용), 재연결 때 다시 보냄
+_enabled = False                  # 펌웨어가 응답으로 확인한 현재 상태
+
+
+def get_ring(track: str = DEFAULT_TRACK, create: bool = False) -> Optional[TelemetryRing]:
+    ring = _rings.get(track)
+    if ring is None and create:
+        with _rings_lock:
+            ring = _rings.setdefault(track, TelemetryRing(get_config().telemetry.capacity))
+    return ring
+
+
+def ingest_line(raw: bytes, track: str = DEFAULT_TRACK) -> None:
+    """리스너가 받은 "D:<cm>" 한 줄 저장 (시리얼 리스너 스레드에서 호출)"""
+    try:
+        distance = int(raw[2:])   # int() 는 bytes 의 앞뒤 공백/CRLF 를 무시
+    except ValueError:
+        metrics.inc("telemetry_bad_lines")
+        return
+    ring = _rings.get(track) or get_ring(track, create=True)
+    ring.append(int(time.time() * 1000), max(0, distance))
+
+
+def is_wanted() -> bool:
+    """포트를 열 때 켜야 하는지"""
+    return get_config().telemetry.enabled if _wanted is None else _wanted
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    """TELEMETRY_ON / TELEMETRY_OFF 응답을 받은 뒤 호출"""
+    global _enabled, _wanted
+    _enabled = _wanted = bool(enabled)
+
+
+def port_closed() -> None:
+    """포트가 닫히면 펌웨어 상태를 알 수 없음 (다시 열 때 is_wanted() 로 재전송)"""
+    global _enabled
+    _enabled = False
+
+
+def command(enabled: bool):
+    """(전송할 명령, 기대 응답)"""
+    return (CMD_ON, ACK_ON) if enabled else (CMD_OFF, ACK_OFF)
+
+
+def _on_config_change(old, new):
+    if old.telemetry.capacity != new.telemetry.capacity:
+        for ring in list(_rings.values()):
+            ring.resize(new.telemetry.capacity)
+        print(f"📈 텔레메트리 버퍼 크기 변경: {new.telemetry.capacity} 샘플")
+
+
+subscribe(_on_config_change)
+
+
+# ── 다운샘플링 (NumPy, 입력은 시간 순 int64 배열) ───────────
+def downsample_minmax(t, d, points: int):
+    """points/2 개 구간마다 최솟값/최댓값 두 점 (스파이크/드롭이 사라지지 않음)"""
+    import numpy as np
+
+    n = len(t)
+    if n <= points:
+        return t, d
+    buckets = max(1, points // 2)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+    picks = []
+    for reduce in (np.minimum, np.maximum):
+        values = reduce.reduceat(d, edges[:-1])
+        hit = np.flatnonzero(d == values[bucket_of])
+        # 구간마다 처음 일치하는 위치
+        _, first = np.unique(bucket_of[hit], return_index=True)
+        picks.append(hit[first])
+    idx = np.unique(np.concatenate(picks))
+    return t[idx], d[idx]
+
+
+def downsample_lttb(t, d, points: int):
+    """Largest-Triangle-Three-Buckets: 모양을 가장 잘 유지하는 points 개 선택"""
+    import numpy as np
+
+    n = len(t)
+    if n <= points or points < 3:
+        return t, d
+    x = (t - t[0]).astype(np.float64)
+    y = d.astype(np.float64)
+    # 첫/끝 점은 고정, 나머지 n-2 개를 points-2 개 구간으로
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    idx = np.empty(points, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return t[idx], d[idx]
+
+
+_DOWNSAMPLERS = {"minmax": downsample_minmax, "lttb": downsample_lttb}
+
+
+def query(track: str, start_ms: Optional[int], end_ms: Optional[int],
+          points: int = DEFAULT_POINTS, mode: str = "minmax") -> Optional[dict]:
+    """
+    [start_ms, end_ms] 구간을 points 개 이하로 줄인 결과 (트랙이 없으면 None)
+    mode: minmax / lttb / raw (다운샘플 없이 가장 최근 points 개)
+    t 는 t0 기준 상대 ms (응답 크기를 줄이기 위해)
+    """
+    import numpy as np
+
+    ring = get_ring(track)
+    if ring is None:
+        return None
+    t, d = ring.snapshot()
+    lo = 0 if start_ms is None else int(np.searchsorted(t, start_ms, side="left"))
+    hi = len(t) if end_ms is None else int(np.searchsorted(t, end_ms, side="right"))
+    t, d = t[lo:hi], d[lo:hi]
+    count = len(t)
+    if mode in _DOWNSAMPLERS:
+        t, d = _DOWNSAMPLERS[mode](t, d, points)
+    else:
+        t, d = t[-points:], d[-points:]   # raw: 구간 끝쪽 points 개 (원본 그대로)
+    t0 = int(t[0]) if len(t) else None
+    return {
+        "track": track,
+        "mode": mode,
+        "count": count,            # 구간 안의 원본 샘플 수
+        "t0": t0,
+        "t": (t - t0).tolist() if len(t) else [],
+        "d": d.tolist(),
+    }
+
+
+def iter_stream(track: str, window_ms: int, points: int, mode: str, interval: float) -> Iterator[str]:
+    """
+    최근 window_ms 구간을 interval 마다 다운샘플해서 SSE 로 보냄 (새 샘플이 없으면 건너뜀)
+    연결마다 창 크기가 달라도 한 번에 보내는 점 수는 points 이하
+    """
+    yield "event: ping\ndata: {}\n\n"
+    last_count = None
+    idle = 0.0
+    while True:
+        ring = get_ring(track)
+        count = ring.count if ring else 0
+        if count != last_count:
+            last_count = count
+            idle = 0.0
+            now = int(time.time() * 1000)
+            body = query(track, now - window_ms, None, points, mode)
+            if body is not None:
+                yield f"event: telemetry\ndata: {json.dumps(body, separators=(',', ':'))}\n\n"
+        elif idle >= KEEPALIVE_INTERVAL:
+            idle = 0.0
+            yield "event: ping\ndata: {}\n\n"
+        time.sleep(interval)
+        idle += interval
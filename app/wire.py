@@ -0,0 +1,159 @@
+# app/wire.py
+"""
+WebSocket 용 바이너리 메시지 형식
+
+첫 바이트가 메시지 종류, 나머지는 little-endian 고정 필드 + (필요하면) UTF-8 문자열.
+자주 오는 이벤트(lap 등)는 10바이트 안팎으로 끝나고, 드문 메시지는 JSON 을 감싸서 보낸다.
+프론트엔드(frontend/app.js 의 WsTransport)는 DataView 로 같은 형식을 읽는다.
+
+서버 → 클라이언트
+    0x01 race_started   f64 ts
+    0x02 lap            f64 id, u32 ms
+    0x03 race_ended     f64 ts
+    0x04 target_set     u16 laps, utf8 name
+    0x05 reset          f64 ts
+    0x06 config_updated f64 ts
+    0x0F event (JSON)   utf8 {"type": ..., "payload": ...}   (위에 없는 이벤트, 고정 필드 범위를 벗어난 lap/target_set)
+    0x20 response       u16 req_id, u16 status, utf8 JSON body
+    0x7F pong           f64 client_ts, f64 server_ts
+
+클라이언트 → 서버
+    0x81 subscribe      u32 channel mask
+    0x82 start          u16 req_id, u16 laps, utf8 name
+    0x83 get laps       u16 req_id
+    0x84 get result     u16 req_id
+    0x85 ping           f64 client_ts
+"""
+import json
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+# 서버 → 클라이언트
+RACE_STARTED = 0x01
+LAP = 0x02
+RACE_ENDED = 0x03
+TARGET_SET = 0x04
+RESET = 0x05
+CONFIG_UPDATED = 0x06
+EVENT_JSON = 0x0F
+RESPONSE = 0x20
+PONG = 0x7F
+
+# 클라이언트 → 서버
+SUBSCRIBE = 0x81
+START = 0x82
+GET_LAPS = 0x83
+GET_RESULT = 0x84
+PING = 0x85
+
+# 구독 채널 (비트 마스크)
+CH_RACE = 0x01      # race_started / lap / race_ended / target_set / reset
+CH_CONFIG = 0x02    # config_updated
+CH_OTHER = 0x04     # 그 외 JSON 이벤트 (command 등)
+CH_ALL = 0xFFFFFFFF
+
+U16_MAX = 0xFFFF
+U32_MAX = 0xFFFFFFFF
+
+_TS = struct.Struct("<Bd")
+_LAP = struct.Struct("<BdI")
+_TARGET = struct.Struct("<BH")
+_RESPONSE = struct.Struct("<BHH")
+_PONG = struct.Struct("<Bdd")
+
+_TS_EVENTS = {"race_started": RACE_STARTED, "race_ended": RACE_ENDED, "reset": RESET,
+              "config_updated": CONFIG_UPDATED}
+_RACE_EVENTS = {"race_started", "lap", "race_ended", "target_set", "reset"}
+
+
+def channel_of(event_type: str) -> int:
+    if event_type in _RACE_EVENTS:
+        return CH_RACE
+    if event_type == "config_updated":
+        return CH_CONFIG
+    return CH_OTHER
+
+
+def encode_event(event_type: str, payload: Dict[str, Any]) -> bytes:
+    """SSE 와 같은 (event_type, payload) 를 바이너리 프레임으로"""
+    # 고정 필드(u32 ms, u16 laps)에 들어가지 않는 값은 struct.error 대신 JSON 프레임으로 보냄
+    if event_type == "lap" and 0 <= int(payload["ms"]) <= U32_MAX:
+        return _LAP.pack(LAP, float(payload["id"]), int(payload["ms"]))
+    if event_type in _TS_EVENTS:
+        return _TS.pack(_TS_EVENTS[event_type], float(payload.get("ts") or 0))
+    if event_type == "target_set" and 0 <= int(payload["laps"]) <= U16_MAX:
+        return _TARGET.pack(TARGET_SET, int(payload["laps"])) + str(payload["name"]).encode("utf-8")
+    body = json.dumps({"type": event_type, "payload": payload}, ensure_ascii=False, separators=(",", ":"))
+    return bytes([EVENT_JSON]) + body.encode("utf-8")
+
+
+def encode_response(req_id: int, status: int, body: Any) -> bytes:
+    data = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _RESPONSE.pack(RESPONSE, req_id, status) + data
+
+
+def encode_pong(client_ts: float, server_ts: float) -> bytes:
+    return _PONG.pack(PONG, client_ts, server_ts)
+
+
+def decode_client(frame: bytes) -> Tuple[int, Dict[str, Any]]:
+    """클라이언트 프레임 → (종류, 필드). 형식이 틀리면 ValueError"""
+    if not frame:
+        raise ValueError("empty frame")
+    kind = frame[0]
+    try:
+        if kind == SUBSCRIBE:
+            (mask,) = struct.unpack_from("<I", frame, 1)
+            return kind, {"mask": mask}
+        if kind == START:
+            req_id, laps = struct.unpack_from("<HH", frame, 1)
+            return kind, {"req_id": req_id, "laps": laps, "name": frame[5:].decode("utf-8")}
+        if kind in (GET_LAPS, GET_RESULT):
+            (req_id,) = struct.unpack_from("<H", frame, 1)
+            return kind, {"req_id": req_id}
+        if kind == PING:
+            (client_ts,) = struct.unpack_from("<d", frame, 1)
+            return kind, {"client_ts": client_ts}
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"bad frame 0x{kind:02x}: {e}")
+    raise ValueError(f"unknown frame 0x{kind:02x}")
+
+
+# ── 클라이언트 쪽 인코더/디코더 (벤치마크/테스트 스크립트용) ─────────────
+def encode_client(kind: int, req_id: int = 0, laps: int = 0, name: str = "",
+                  mask: int = CH_ALL, client_ts: float = 0.0) -> bytes:
+    if kind == SUBSCRIBE:
+        return struct.pack("<BI", kind, mask)
+    if kind == START:
+        return struct.pack("<BHH", kind, req_id, laps) + name.encode("utf-8")
+    if kind in (GET_LAPS, GET_RESULT):
+        return struct.pack("<BH", kind, req_id)
+    if kind == PING:
+        return struct.pack("<Bd", kind, client_ts)
+    raise ValueError(f"unknown frame 0x{kind:02x}")
+
+
+def decode_server(frame: bytes) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """서버 프레임 → (이벤트 이름, payload)"""
+    kind = frame[0]
+    if kind == LAP:
+        _, lap_id, ms = _LAP.unpack(frame)
+        return "lap", {"id": int(lap_id), "ms": ms}
+    for name, code in _TS_EVENTS.items():
+        if kind == code:
+            _, ts = _TS.unpack(frame)
+            return name, {"ts": int(ts)}
+    if kind == TARGET_SET:
+        _, laps = _TARGET.unpack_from(frame)
+        return "target_set", {"laps": laps, "name": frame[_TARGET.size:].decode("utf-8")}
+    if kind == EVENT_JSON:
+        ev = json.loads(frame[1:].decode("utf-8"))
+        return ev["type"], ev["payload"]
+    if kind == RESPONSE:
+        _, req_id, status = _RESPONSE.unpack_from(frame)
+        return "response", {"req_id": req_id, "status": status,
+                             "body": json.loads(frame[_RESPONSE.size:].decode("utf-8"))}
+    if kind == PONG:
+        _, client_ts, server_ts = _PONG.unpack(frame)
+        return "pong", {"client_ts": client_ts, "server_ts": server_ts}
+    raise ValueError(f"unknown frame 0x{kind:02x}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+레이스 저널 벤치마크
+
+listener.handle_message("LAP:...") 한 번에 걸리는 시간을 저널 없음/있음으로 비교하고,
+group commit 이 몇 개의 레코드를 한 번의 fsync 로 묶었는지 보여준다.
+(print 출력은 측정에서 빼기 위해 /dev/null 로 보냄)
+
+    python benchmarks/journal.py --laps 5000 --rate 20
+"""
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="rc-journal-"))
+os.environ.setdefault("CONFIG_FILE", os.path.join(os.environ["DATA_DIR"], "config.json"))
+
+from app import journal, metrics  # noqa: E402
+from app.bluetooth import listener, state  # noqa: E402
+
+
+def run_race(laps, rate, j):
+    """
+    목표 랩 수를 크게 잡아 결과 저장 없이 LAP 처리만 측정 (rate: 초당 랩, 0 = 최대 속도)
+    저널 있음/없음을 한 랩씩 번갈아 측정해 CPU 상태(캐시, 클럭) 차이를 양쪽에 똑같이 반영
+    """
+    state.runner["name"], state.runner["total_laps"] = "bench", laps + 1
+    state.lap_data.clear()
+    interval = 1.0 / rate if rate else 0.0
+    samples = {False: [], True: []}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        listener.handle_message("RACE_STARTED", lambda *a: None)
+        for lap in range(1, laps + 1):
+            enabled = lap % 2 == 0
+            journal._journal = j if enabled else None
+            line = f"LAP:{lap * 1000}"
+            t0 = time.perf_counter()
+            listener.handle_message(line, lambda *a: None)
+            samples[enabled].append((time.perf_counter() - t0) * 1e6)
+            if interval:
+                time.sleep(interval)
+    journal._journal = j
+    return samples[False], samples[True]
+
+
+def fmt(samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"median {statistics.median(samples):6.1f} µs  p99 {p99:6.1f} µs  max {samples[-1]:8.1f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RC Tracker 레이스 저널 벤치마크")
+    parser.add_argument("--laps", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=0.0, help="초당 랩 수 (0 = 쉬지 않고)")
+    args = parser.parse_args()
+
+    path = Path(os.environ["DATA_DIR"]) / "bench.journal"
+    j = journal.Journal(path)
+    j.start()
+    j.target_set("bench", args.laps + 1)
+    baseline, journaled = run_race(args.laps, args.rate, j)
+    j.flush()
+
+    snap = metrics.snapshot()
+    batches = snap["counters"].get("journal_batches", 0)
+    records = snap["counters"].get("journal_records", 0)
+    commit = snap["histograms"][journal.COMMIT_HISTOGRAM]
+
+    print("📒 RC Tracker 레이스 저널 벤치마크")
+    print("=" * 64)
+    print(f"LAP 처리 {args.laps}회, 저널 있음/없음 번갈아" + (f" ({args.rate:g}/s)" if args.rate else " (최대 속도)"))
+    print(f"  저널 없음   {fmt(baseline)}")
+    print(f"  저널 있음   {fmt(journaled)}")
+    print(f"group commit  레코드 {records}개 / fsync {batches}회 (배치당 {records / max(1, batches):.1f}개), "
+          f"커밋 p50 {commit['p50']} ms, p99 {commit['p99']} ms")
+    print(f"저널 크기     {path.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+레이스 기록 메모리 벤치마크
+
+기존 방식(dict + int 리스트)과 RaceRecord(__slots__ + array('I')),
+RaceStore(열 단위 배열)의 레이스당 메모리 사용량을 tracemalloc 으로 비교한다.
+
+    python benchmarks/race_memory.py --races 10000 --laps 10
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.history import RaceStore  # noqa: E402
+from app.records import MAGIC, RaceRecord, iter_serialized  # noqa: E402
+
+
+def make_races(n_races, n_laps, n_drivers=200, seed=1):
+    rng = random.Random(seed)
+    races = []
+    for i in range(n_races):
+        t, laps = 0, []
+        for _ in range(n_laps):
+            t += rng.randint(8000, 14000)
+            laps.append(t)
+        races.append((f"driver{i % n_drivers}", n_laps, laps, 1_700_000_000_000 + i * 60_000))
+    return races
+
+
+def build_dicts(races):
+    """기존 레이아웃: leaderboard 항목 dict + lap_data 리스트"""
+    out = []
+    for name, total, laps, started in races:
+        avg = (laps[-1] - laps[0]) // max(1, len(laps) - 1)
+        out.append({
+            "name": name,
+            "laps": total,
+            "avg_lap_time": avg,
+            "avg_lap_time_sec": round(avg / 1000, 2),
+            "start_time": started,
+            "lap_times": [int(t) for t in laps],
+        })
+    return out
+
+
+def build_records(races):
+    return [RaceRecord(name, total, laps, started, started + laps[-1]) for name, total, laps, started in races]
+
+
+def build_store(races):
+    store = RaceStore()
+    for rec in build_records(races):
+        store.append(rec)
+    return store
+
+
+def measure(builder, races):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = builder(races)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return obj, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--races", type=int, default=10_000)
+    parser.add_argument("--laps", type=int, default=10)
+    args = parser.parse_args()
+
+    races = make_races(args.races, args.laps)
+    print(f"📊 {args.races}개 레이스 x {args.laps}랩")
+    print("=" * 60)
+
+    results = {}
+    for label, builder in (("dict + list (기존)", build_dicts),
+                           ("RaceRecord (__slots__ + array)", build_records),
+                           ("RaceStore (열 단위 배열)", build_store)):
+        obj, size = measure(builder, races)
+        results[label] = size
+        print(f"{label:<32} {size / 1024:>10.1f} KiB   레이스당 {size / args.races:>7.1f} B")
+        del obj
+
+    base = results["dict + list (기존)"]
+    for label, size in results.items():
+        print(f"   {label:<32} 기존 대비 {size / base * 100:5.1f}%")
+
+    # 직렬화: 랩 배열 버퍼를 그대로 쓰고, 읽을 때는 memoryview 슬라이스를 그대로 사용
+    records = build_records(races)
+    buf = io.BytesIO()
+    buf.write(MAGIC)
+    t0 = time.perf_counter()
+    for rec in records:
+        rec.write_to(buf)
+    write_ms = (time.perf_counter() - t0) * 1000
+    data = buf.getvalue()
+
+    t0 = time.perf_counter()
+    store = RaceStore()
+    for fields in iter_serialized(data):
+        store.append_serialized(*fields)
+    read_ms = (time.perf_counter() - t0) * 1000
+
+    print("=" * 60)
+    print(f"💾 직렬화 크기: {len(data) / 1024:.1f} KiB (레이스당 {len(data) / args.races:.1f} B)")
+    print(f"   쓰기 {write_ms:.1f} ms / 읽기 {read_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
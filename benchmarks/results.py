@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+/api/results 페이지 조회 벤치마크
+
+레이스 수를 늘려 가며 ResultIndex 생성 시간/메모리와 페이지 하나(첫 페이지, 중간 커서,
+드라이버 필터, 랩 수 필터)를 만드는 시간을, 전체 목록을 한 번에 JSON 으로 만드는
+기존 방식과 비교한다. 페이지 시간은 레이스 수와 무관하게 거의 같아야 한다.
+
+    python benchmarks/results.py --sizes 1000,10000,100000,200000 --limit 50
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy  # noqa: F401  (ResultIndex.build 가 처음 불릴 때의 import 시간/메모리는 빼고 측정)
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.results import ResultIndex, decode_cursor, iter_page_json  # noqa: E402
+from race_memory import build_store, make_races  # noqa: E402
+
+
+def timed(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def render(store, sort, after, limit, driver=None, laps=None):
+    race_ids, cursor = store.result_index().page(sort, after, limit, driver, laps, store)
+    return "".join(iter_page_json(store, race_ids, cursor)), cursor
+
+
+def legacy(store):
+    """페이지 없이 전체 행을 리스트로 만들고 한 번에 직렬화"""
+    index = store.result_index()
+    rows = [{"rank": i + 1, "name": store.names[store.driver[i]], "laps": store.total_laps[i],
+             "avg_lap_time": round(index.avg_ms[i] / 1000, 2)} for i in range(len(store))]
+    return json.dumps(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,200000")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--laps", type=int, default=10)
+    args = parser.parse_args()
+
+    print("🏁 RC Tracker /api/results 페이지 조회 벤치마크")
+    print("=" * 96)
+    print(f"{'races':>8} {'index 생성':>10} {'index 메모리':>12} {'첫 페이지':>9} {'중간 커서':>9} "
+          f"{'드라이버':>8} {'랩 수':>7} {'append':>9} {'전체 목록':>10}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        # 랩 수를 5/10 섞어서 랩 수 필터가 절반을 건너뛰게 함
+        races = [(name, args.laps if i % 2 else 5, laps if i % 2 else laps[:5], started)
+                 for i, (name, _, laps, started) in enumerate(make_races(size, args.laps))]
+        store = build_store(races)
+
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        store._results = ResultIndex.build(store)
+        build_ms = (time.perf_counter() - t0) * 1000
+        index_kib = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+
+        # 중간 커서 = 정렬 순서 한가운데 행
+        middle = store.result_index()._all["avg"][size // 2]
+        mid_cursor = decode_cursor(f"{middle >> 32}-{middle & 0xFFFFFFFF}")
+
+        first = timed(lambda: render(store, "avg", None, args.limit))
+        mid = timed(lambda: render(store, "best", mid_cursor, args.limit))
+        driver = timed(lambda: render(store, "avg", None, args.limit, driver=store.driver_id("driver7")))
+        by_laps = timed(lambda: render(store, "avg", mid_cursor, args.limit, laps=5))
+        append_us = timed(lambda: store.append(store.record(size // 3)), repeat=200) * 1000
+        full = timed(lambda: legacy(store), repeat=3)
+
+        print(f"{size:>8} {build_ms:>8.1f}ms {index_kib:>9.0f} KiB {first:>7.2f}ms {mid:>7.2f}ms "
+              f"{driver:>6.2f}ms {by_laps:>5.2f}ms {append_us:>7.1f}µs {full:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
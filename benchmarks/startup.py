@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+기동 시간 벤치마크
+
+1. import 시간: 새 파이썬 프로세스에서 `import app.server` 에 걸린 시간 (예산 초과 시 종료 코드 1)
+2. 첫 `/` 응답까지 걸린 시간: main.py 프로세스 시작 → GET / 200
+3. 첫 시리얼 바이트 처리까지 걸린 시간: SERIAL_PORT=socket://... 로 가짜 포트를 열게 하고
+   RACE_STARTED 를 보낸 뒤, /laps 의 start_time 이 채워지는 시점
+   (pyserial 의 socket:// open() 이 reset_input_buffer() 로 먼저 온 바이트를 버리므로
+   start_time 이 보일 때까지 RESEND_INTERVAL 마다 다시 보냄 → 오차는 그 간격 이내)
+레이스 기록/저널은 임시 DATA_DIR 에 만든다 (작업 트리의 data/ 를 건드리지 않음)
+
+    python benchmarks/startup.py --runs 5 --budget-ms 400
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESEND_INTERVAL = 0.005  # 초
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import_ms():
+    code = "import time; t = time.perf_counter(); import app.server; print((time.perf_counter() - t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+class FakeSerial:
+    """socket:// 로 접속해 오는 리스너에게 done 이 set 될 때까지 RACE_STARTED 를 반복해서 보내는 가짜 시리얼 장치"""
+
+    def __init__(self):
+        self.port = free_port()
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", self.port))
+        self.sock.listen(1)
+        self.connected_at = None
+        self.conn = None
+        self.done = threading.Event()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        try:
+            self.conn, _ = self.sock.accept()
+        except OSError:
+            return
+        self.connected_at = time.perf_counter()
+        while not self.done.is_set():
+            try:
+                self.conn.sendall(b"RACE_STARTED\n")
+            except OSError:
+                return
+            self.done.wait(RESEND_INTERVAL)
+
+    def close(self):
+        self.done.set()
+        for s in (self.conn, self.sock):
+            if s:
+                s.close()
+
+
+def http_get(url, timeout=0.5):
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return resp.status, resp.read()
+
+
+def measure_startup(timeout=30.0):
+    web_port = free_port()
+    fake = FakeSerial()
+    data_dir = tempfile.TemporaryDirectory(prefix="rc-startup-")
+    env = dict(os.environ, SERVER_HOST="127.0.0.1", SERVER_PORT=str(web_port), DATA_DIR=data_dir.name,
+               SERIAL_PORT=f"socket://127.0.0.1:{fake.port}", PYTHONUNBUFFERED="1")
+    base = f"http://127.0.0.1:{web_port}"
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_page = first_byte = None
+    try:
+        while time.perf_counter() - t0 < timeout and (first_page is None or first_byte is None):
+            try:
+                if first_page is None:
+                    status, _ = http_get(base + "/")
+                    if status == 200:
+                        first_page = time.perf_counter() - t0
+                if first_byte is None:
+                    _, body = http_get(base + "/laps")
+                    if json.loads(body).get("start_time"):
+                        first_byte = time.perf_counter() - t0
+                        fake.done.set()
+            except OSError:
+                pass
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+        fake.close()
+        data_dir.cleanup()
+
+    serial_open = fake.connected_at - t0 if fake.connected_at else None
+    return first_page, serial_open, first_byte
+
+
+def fmt(values):
+    values = [v * 1000 for v in values if v is not None]
+    if not values:
+        return "측정 실패"
+    return f"median {statistics.median(values):7.1f} ms  (min {min(values):.1f} / max {max(values):.1f})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RC Tracker 기동 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="import app.server 허용 시간")
+    args = parser.parse_args()
+
+    imports = [measure_import_ms() for _ in range(args.runs)]
+    runs = [measure_startup() for _ in range(args.runs)]
+
+    print("🚀 RC Tracker 기동 벤치마크")
+    print("=" * 60)
+    print(f"import app.server        {fmt([v / 1000 for v in imports])}")
+    print(f"첫 / 응답                {fmt([r[0] for r in runs])}")
+    print(f"시리얼 포트 열림          {fmt([r[1] for r in runs])}")
+    print(f"첫 시리얼 바이트 처리      {fmt([r[2] for r in runs])}")
+
+    median_import = statistics.median(imports)
+    if median_import > args.budget_ms:
+        print(f"❌ import 예산 초과: {median_import:.1f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"✅ import 예산 이내: {median_import:.1f} ms <= {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
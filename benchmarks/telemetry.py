@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+센서 텔레메트리 벤치마크
+
+1. 리스너가 D:<cm> 한 줄을 링 버퍼에 넣는 시간
+2. LAP 처리 시간: 텔레메트리 없음 / 랩 사이에 D 줄 섞임 / + 스트림 구독자 N명이 동시에 다운샘플링
+   (구독자는 별도 스레드에서 interval 마다 query() → GIL 경쟁까지 포함)
+3. 버퍼가 가득 찬 상태에서 창 크기별 조회 시간과 응답 크기 (points 고정이면 크기 일정)
+(print 출력은 측정에서 빼기 위해 /dev/null 로 보냄)
+
+    python benchmarks/telemetry.py --laps 2000 --per-lap 200 --clients 10
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="rc-telemetry-"))
+os.environ.setdefault("CONFIG_FILE", os.path.join(os.environ["DATA_DIR"], "config.json"))
+
+from app import telemetry  # noqa: E402
+from app.bluetooth import listener, state  # noqa: E402
+
+
+def fmt(samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"median {statistics.median(samples):6.1f} µs  p99 {p99:6.1f} µs  max {samples[-1]:8.1f} µs"
+
+
+def run_laps(laps, per_lap):
+    """LAP 줄 처리 시간 (per_lap: 랩 사이에 넣을 D 줄 수)"""
+    state.runner["name"], state.runner["total_laps"] = "bench", laps + 1
+    state.lap_data.clear()
+    samples = []
+    noop = lambda *a: None  # noqa: E731
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        listener.handle_raw(b"RACE_STARTED\r\n", noop)
+        for lap in range(1, laps + 1):
+            for i in range(per_lap):
+                listener.handle_raw(b"D:%d\r\n" % (200 - i % 7), noop)
+            line = b"LAP:%d\r\n" % (lap * 1000)
+            t0 = time.perf_counter()
+            listener.handle_raw(line, noop)
+            samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def stream_clients(n, interval, stop):
+    """SSE 구독자 흉내: interval 마다 최근 30초를 minmax 300점으로"""
+    def client(i):
+        mode = "lttb" if i % 2 else "minmax"
+        while not stop.is_set():
+            now = int(time.time() * 1000)
+            telemetry.query(telemetry.DEFAULT_TRACK, now - 30_000, None, 300, mode)
+            stop.wait(interval)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RC Tracker 센서 텔레메트리 벤치마크")
+    parser.add_argument("--laps", type=int, default=2000)
+    parser.add_argument("--per-lap", type=int, default=200, help="랩 사이 D 줄 수 (20Hz × 10초 랩 = 200)")
+    parser.add_argument("--clients", type=int, default=10, help="동시 스트림 구독자 수")
+    parser.add_argument("--interval", type=float, default=0.5, help="구독자 갱신 주기 (초)")
+    args = parser.parse_args()
+
+    print("📈 RC Tracker 센서 텔레메트리 벤치마크")
+    print("=" * 72)
+
+    ring = telemetry.get_ring(create=True)
+    n = 100_000
+    t0 = time.perf_counter()
+    for i in range(n):
+        telemetry.ingest_line(b"D:%d\r\n" % (i % 300))
+    print(f"D 줄 수집       {(time.perf_counter() - t0) / n * 1e6:6.2f} µs/줄 (버퍼 {ring.capacity} 샘플)")
+
+    run_laps(200, 0)  # 워밍업
+    baseline = run_laps(args.laps, 0)
+    mixed = run_laps(args.laps, args.per_lap)
+    stop = threading.Event()
+    stream_clients(args.clients, args.interval, stop)
+    time.sleep(0.1)
+    loaded = run_laps(args.laps, args.per_lap)
+    stop.set()
+
+    print(f"LAP 처리 {args.laps}회")
+    print(f"  텔레메트리 없음             {fmt(baseline)}")
+    print(f"  랩마다 D {args.per_lap}줄             {fmt(mixed)}")
+    print(f"  + 구독자 {args.clients}명 ({args.interval:g}s 주기)   {fmt(loaded)}")
+
+    # 가득 찬 버퍼를 20Hz 간격으로 다시 채우고 창 크기별 조회
+    now = int(time.time() * 1000)
+    for i in range(ring.capacity):
+        ring.append(now - (ring.capacity - i) * 50, 200 - (i % 40 == 0) * 195)
+    print(f"조회 (points=300, 버퍼 {ring.capacity} 샘플 = {ring.capacity / 20 / 60:.0f}분)")
+    for window_s in (10, 60, 600):
+        cells = []
+        for mode in ("minmax", "lttb"):
+            body = telemetry.query(telemetry.DEFAULT_TRACK, now - window_s * 1000, None, 300, mode)
+            ms = statistics.median(
+                _timed(lambda: telemetry.query(telemetry.DEFAULT_TRACK, now - window_s * 1000, None, 300, mode))
+                for _ in range(20))
+            cells.append(f"{mode} {ms:5.2f} ms {len(json.dumps(body, separators=(',', ':'))):>5} B")
+        print(f"  최근 {window_s:>3}s (원본 {body['count']:>5}개)   " + "   ".join(cells))
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+전송 방식 벤치마크: SSE + HTTP 폴링 vs WebSocket(/ws, app/wire.py 바이너리)
+
+main.py 를 가짜 시리얼 장치(socket://)와 함께 띄우고, 랩 라인을 보낸 순간부터
+각 클라이언트가 화면에 그릴 데이터를 받은 순간까지(lap-to-screen)를 같은 시계로 잰다.
+
+- SSE      : /events 스트림에서 lap 이벤트 수신
+- 폴링     : /laps 를 --poll-ms 간격으로 조회해 랩 수가 늘어난 것을 발견
+- WebSocket: /ws 에서 lap 프레임 수신
+
+메시지당 바이트(전송 계층 프레이밍 포함)와 요청 1회(/laps vs GET_LAPS) 왕복 시간도 비교한다.
+flask-sock / simple-websocket 이 필요하다.
+
+    python benchmarks/transport.py --laps 20 --races 5 --poll-ms 250
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from app import wire  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeLapTimer:
+    """START n 에 WAITING_FOR_TRIGGER 로 응답하고, 요청 시 RACE_STARTED / LAP 줄을 보내는 가짜 장치"""
+
+    def __init__(self):
+        self.port = free_port()
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", self.port))
+        self.sock.listen(1)
+        self.conn = None
+        self.connected = threading.Event()
+        self.armed = threading.Event()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        try:
+            self.conn, _ = self.sock.accept()
+        except OSError:
+            return
+        self.connected.set()
+        for line in self.conn.makefile("rb"):
+            if line.strip().startswith(b"START"):
+                self.conn.sendall(b"WAITING_FOR_TRIGGER\n")
+                self.armed.set()
+
+    def send(self, line):
+        self.conn.sendall(line.encode() + b"\n")
+
+    def close(self):
+        for s in (self.conn, self.sock):
+            if s:
+                s.close()
+
+
+class SseClient:
+    """raw 소켓으로 /events 를 읽음 (HTTP chunked 프레이밍까지 바이트 수에 포함)"""
+
+    def __init__(self, host, port):
+        self.laps = []          # 수신 시각 (perf_counter)
+        self.lap_bytes = []     # lap 이벤트 하나당 수신 바이트
+        self.sock = socket.create_connection((host, port))
+        self.sock.sendall(f"GET /events HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        stream = self.sock.makefile("rb")
+        while stream.readline() not in (b"\r\n", b""):   # 응답 헤더
+            pass
+        # Transfer-Encoding: chunked → 청크 하나가 이벤트 하나 (yield 단위)
+        while True:
+            try:
+                size_line = stream.readline()
+                if not size_line:
+                    return
+                size = int(size_line.strip(), 16)
+                chunk = stream.read(size + 2)
+            except (OSError, ValueError):
+                return
+            if chunk.startswith(b"event: lap"):
+                self.laps.append(time.perf_counter())
+                self.lap_bytes.append(len(size_line) + len(chunk))
+
+    def close(self):
+        self.sock.close()
+
+
+class WsClient:
+    def __init__(self, url):
+        import simple_websocket
+        self.ws = simple_websocket.Client.connect(url)
+        self.laps = []
+        self.lap_bytes = []
+        self.responses = {}
+        self._cond = threading.Condition()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        while True:
+            try:
+                frame = self.ws.receive()
+            except Exception:
+                return
+            now = time.perf_counter()
+            if not isinstance(frame, (bytes, bytearray)):
+                continue
+            event, payload = wire.decode_server(bytes(frame))
+            if event == "lap":
+                self.laps.append(now)
+                self.lap_bytes.append(ws_frame_size(len(frame)))
+            elif event == "response":
+                with self._cond:
+                    self.responses[payload["req_id"]] = (now, len(frame))
+                    self._cond.notify_all()
+
+    def request(self, kind, req_id):
+        """요청 1회 왕복 (ms, 요청 바이트, 응답 바이트)"""
+        frame = wire.encode_client(kind, req_id=req_id)
+        t0 = time.perf_counter()
+        self.ws.send(frame)
+        with self._cond:
+            self._cond.wait_for(lambda: req_id in self.responses, timeout=5)
+            received_at, size = self.responses.pop(req_id)
+        # 클라이언트 → 서버 프레임은 마스킹 키 4바이트 추가
+        return (received_at - t0) * 1000, ws_frame_size(len(frame)) + 4, ws_frame_size(size)
+
+    def close(self):
+        self.ws.close()
+
+
+def ws_frame_size(payload_len):
+    """서버 → 클라이언트 WebSocket 프레임 크기 (헤더 2/4/10 바이트 + payload)"""
+    if payload_len < 126:
+        return payload_len + 2
+    if payload_len < 65536:
+        return payload_len + 4
+    return payload_len + 10
+
+
+def http_get_raw(host, port, path):
+    """요청 1회 (ms, 요청 바이트, 응답 바이트, body)"""
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode()
+    t0 = time.perf_counter()
+    with socket.create_connection((host, port)) as s:
+        s.sendall(request)
+        chunks = []
+        while True:
+            data = s.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    elapsed = (time.perf_counter() - t0) * 1000
+    raw = b"".join(chunks)
+    return elapsed, len(request), len(raw), raw.split(b"\r\n\r\n", 1)[1]
+
+
+class Poller:
+    """대시보드처럼 /laps 를 주기적으로 조회해 새 랩을 발견한 시각을 기록"""
+
+    def __init__(self, host, port, interval_ms):
+        self.host, self.port = host, port
+        self.interval = interval_ms / 1000
+        self.laps = []
+        self.polls = 0
+        self.bytes = 0
+        self.seen = 0
+        self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while self.running:
+            try:
+                _, sent, received, body = http_get_raw(self.host, self.port, "/laps")
+            except OSError:
+                time.sleep(self.interval)
+                continue
+            now = time.perf_counter()
+            self.polls += 1
+            self.bytes += sent + received
+            count = len(json.loads(body).get("laps") or [])
+            if count < self.seen:  # 새 레이스
+                self.seen = 0
+            self.laps.extend([now] * (count - self.seen))
+            self.seen = count
+            time.sleep(self.interval)
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def latencies(sent, received):
+    return [(r - s) * 1000 for s, r in zip(sent, received)]
+
+
+def fmt(values):
+    if not values:
+        return "측정 실패"
+    values = sorted(values)
+    p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+    return f"median {statistics.median(values):7.2f} ms  p90 {p90:7.2f}  max {values[-1]:7.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RC Tracker 전송 방식 벤치마크 (SSE/폴링 vs WebSocket)")
+    parser.add_argument("--laps", type=int, default=20, help="레이스당 랩 수")
+    parser.add_argument("--races", type=int, default=5)
+    parser.add_argument("--lap-interval-ms", type=float, default=200.0, help="랩 라인 전송 간격")
+    parser.add_argument("--poll-ms", type=float, default=250.0, help="폴링 간격 (/laps)")
+    parser.add_argument("--requests", type=int, default=200, help="요청 왕복 측정 횟수")
+    args = parser.parse_args()
+
+    host, web_port = "127.0.0.1", free_port()
+    fake = FakeLapTimer()
+    data_dir = tempfile.mkdtemp(prefix="rc-transport-")
+    env = dict(os.environ, SERVER_HOST=host, SERVER_PORT=str(web_port), DATA_DIR=data_dir,
+               SERIAL_PORT=f"socket://127.0.0.1:{fake.port}", MAX_LAPS=str(max(args.laps, 20)),
+               CONFIG_FILE=os.path.join(data_dir, "config.json"), PYTHONUNBUFFERED="1")
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://{host}:{web_port}"
+    try:
+        if not wait_for(lambda: _reachable(base), 30) or not fake.connected.wait(30):
+            sys.exit("❌ 서버 기동 실패")
+
+        sse = SseClient(host, web_port)
+        ws = WsClient(f"ws://{host}:{web_port}/ws")
+        poller = Poller(host, web_port, args.poll_ms)
+        time.sleep(0.3)
+
+        sent = []
+        for race in range(args.races):
+            fake.armed.clear()
+            body = json.dumps({"name": f"bench-{race}", "laps": args.laps, "wait": False}).encode()
+            urllib.request.urlopen(urllib.request.Request(
+                base + "/start", data=body, headers={"Content-Type": "application/json"})).read()
+            fake.armed.wait(5)
+            fake.send("RACE_STARTED")
+            for lap in range(1, args.laps + 1):
+                time.sleep(args.lap_interval_ms / 1000)
+                sent.append(time.perf_counter())
+                fake.send(f"LAP:{int(lap * args.lap_interval_ms)}")
+            wait_for(lambda: len(sse.laps) >= len(sent) and len(ws.laps) >= len(sent), 5)
+            time.sleep(args.poll_ms / 1000 * 2)
+        poller.running = False
+
+        http_rtt, http_bytes = [], []
+        ws_rtt, ws_bytes = [], []
+        for i in range(args.requests):
+            elapsed, req, resp, _ = http_get_raw(host, web_port, "/laps")
+            http_rtt.append(elapsed)
+            http_bytes.append(req + resp)
+            elapsed, req, resp = ws.request(wire.GET_LAPS, i + 1)
+            ws_rtt.append(elapsed)
+            ws_bytes.append(req + resp)
+
+        n = len(sent)
+        print("📡 RC Tracker 전송 방식 벤치마크")
+        print("=" * 72)
+        print(f"랩 {n}개 ({args.races} 레이스 × {args.laps} 랩, 간격 {args.lap_interval_ms:.0f} ms)")
+        print()
+        print("lap → 화면 지연 (시리얼 라인 전송 → 클라이언트 수신)")
+        print(f"  SSE            {fmt(latencies(sent, sse.laps))}   수신 {len(sse.laps)}/{n}")
+        print(f"  WebSocket      {fmt(latencies(sent, ws.laps))}   수신 {len(ws.laps)}/{n}")
+        print(f"  폴링 {args.poll_ms:>4.0f} ms   {fmt(latencies(sent, poller.laps))}   수신 {len(poller.laps)}/{n}")
+        print()
+        print("lap 메시지당 바이트 (전송 계층 프레이밍 포함)")
+        if sse.lap_bytes:
+            print(f"  SSE            {statistics.mean(sse.lap_bytes):7.1f} B")
+        if ws.lap_bytes:
+            print(f"  WebSocket      {statistics.mean(ws.lap_bytes):7.1f} B")
+        if poller.polls:
+            print(f"  폴링           {poller.bytes / max(1, n):7.1f} B/랩  (조회 {poller.polls}회, "
+                  f"{poller.bytes / poller.polls:.0f} B/회)")
+        print()
+        print(f"요청 왕복 (/laps, {args.requests}회)")
+        print(f"  HTTP GET       {fmt(http_rtt)}   {statistics.mean(http_bytes):7.1f} B/회")
+        print(f"  WS GET_LAPS    {fmt(ws_rtt)}   {statistics.mean(ws_bytes):7.1f} B/회")
+
+        sse.close()
+        ws.close()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+        fake.close()
+
+
+def _reachable(base):
+    try:
+        with urllib.request.urlopen(base + "/api/config", timeout=0.5) as resp:
+            return resp.status == 200
+    except OSError:
+        return False
+
+
+if __name__ == "__main__":
+    main()
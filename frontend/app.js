@@ -1,4 +1,122 @@
 // 개선된 app.js - SSE 안정성 및 에러 처리 강화
+
+// 🔌 WebSocket 전송 (선택, ?transport=ws) - 서버 /ws 의 바이너리 프레임(app/wire.py)을 읽어
+// EventSource 와 같은 인터페이스(addEventListener / onopen / onerror / readyState)로 전달한다.
+// START / 랩 / 리더보드 조회도 같은 연결로 보낸다 (request(): req_id 로 0x20 응답과 짝을 맞춤).
+class WsEventSource {
+  constructor(url) {
+    this.url = url;
+    this.readyState = 0;   // EventSource 와 같은 값: 0 연결 중, 1 연결됨, 2 종료
+    this.opened = false;
+    this.onopen = null;
+    this.onerror = null;
+    this.onmessage = null;
+    this.target = new EventTarget();
+    this.decoder = new TextDecoder();
+    this.encoder = new TextEncoder();
+    this.nextReqId = 1;
+    this.pending = new Map();   // req_id → { resolve, reject }
+
+    this.ws = new WebSocket(url);
+    this.ws.binaryType = "arraybuffer";
+    this.ws.onopen = () => {
+      this.readyState = 1;
+      this.opened = true;
+      if (this.onopen) this.onopen();
+    };
+    this.ws.onclose = (ev) => {
+      this.readyState = 2;
+      this.failPending("WebSocket closed");
+      if (this.onerror) this.onerror(ev);
+    };
+    this.ws.onmessage = (ev) => this.dispatch(ev.data);
+  }
+
+  addEventListener(type, fn) {
+    this.target.addEventListener(type, fn);
+  }
+
+  emit(type, payload) {
+    this.target.dispatchEvent(new MessageEvent(type, { data: JSON.stringify(payload) }));
+  }
+
+  dispatch(buf) {
+    if (!(buf instanceof ArrayBuffer) || buf.byteLength === 0) return;
+    const view = new DataView(buf);
+    const text = (offset) => this.decoder.decode(new Uint8Array(buf, offset));
+    switch (view.getUint8(0)) {
+      case 0x01: this.emit("race_started", { ts: view.getFloat64(1, true) }); break;
+      case 0x02: this.emit("lap", { id: view.getFloat64(1, true), ms: view.getUint32(9, true) }); break;
+      case 0x03: this.emit("race_ended", { ts: view.getFloat64(1, true) }); break;
+      case 0x04: this.emit("target_set", { laps: view.getUint16(1, true), name: text(3) }); break;
+      case 0x05: this.emit("reset", { ts: view.getFloat64(1, true) }); break;
+      case 0x06: this.emit("config_updated", { ts: view.getFloat64(1, true) }); break;
+      case 0x0F: {
+        const ev = JSON.parse(text(1));
+        this.emit(ev.type, ev.payload);
+        break;
+      }
+      case 0x20: {
+        const req = this.pending.get(view.getUint16(1, true));
+        if (req) {
+          this.pending.delete(view.getUint16(1, true));
+          req.resolve({ status: view.getUint16(3, true), body: JSON.parse(text(5)) });
+        }
+        break;
+      }
+      default:
+        if (this.onmessage) this.onmessage({ data: buf });
+    }
+  }
+
+  // 요청 프레임 전송 → Promise<{ status, body }> (build(reqId) 가 프레임 바이트를 만듦)
+  request(build) {
+    const reqId = this.nextReqId;
+    this.nextReqId = (this.nextReqId % 0xFFFF) + 1;
+    return new Promise((resolve, reject) => {
+      this.pending.set(reqId, { resolve, reject });
+      this.ws.send(build(reqId));
+    });
+  }
+
+  // HTTP API 호출 중 WebSocket 으로 보낼 수 있는 것 → Promise (없으면 null → fetch 사용)
+  route(url, options = {}) {
+    if (this.readyState !== 1) return null;
+    const method = (options.method || "GET").toUpperCase();
+    if (url === "/laps" && method === "GET") return this.request((id) => this.frame(0x83, id));
+    if (url === "/result" && method === "GET") return this.request((id) => this.frame(0x84, id));
+    if (url === "/start" && method === "POST") {
+      const { name, laps } = JSON.parse(options.body || "{}");
+      if (typeof name !== "string" || !Number.isInteger(laps) || laps < 0 || laps > 0xFFFF) return null;
+      return this.request((id) => this.frame(0x82, id, laps, name));
+    }
+    return null;
+  }
+
+  frame(kind, reqId, laps, name) {
+    const nameBytes = name === undefined ? new Uint8Array(0) : this.encoder.encode(name);
+    const buf = new Uint8Array((laps === undefined ? 3 : 5) + nameBytes.length);
+    const view = new DataView(buf.buffer);
+    view.setUint8(0, kind);
+    view.setUint16(1, reqId, true);
+    if (laps !== undefined) view.setUint16(3, laps, true);
+    buf.set(nameBytes, laps === undefined ? 3 : 5);
+    return buf;
+  }
+
+  failPending(reason) {
+    for (const req of this.pending.values()) req.reject(new Error(reason));
+    this.pending.clear();
+  }
+
+  close() {
+    this.readyState = 2;
+    this.ws.onclose = null;
+    this.failPending("WebSocket closed");
+    this.ws.close();
+  }
+}
+
 class RaceTimerApp {
   constructor() {
     this.BASE_URL = "";
@@ -12,6 +130,9 @@ class RaceTimerApp {
     this.raceState = 'idle'; // idle, running, finished
     this.lapTimes = [];
     this.sseReconnectTimeout = null;
+    this.currentRunner = null; // target_set 으로 지정된 참가자 (결과 표시용)
+    // ?transport=ws 면 WebSocket 사용 (서버에 /ws 가 없으면 SSE 로 자동 전환)
+    this.useWebSocket = new URLSearchParams(window.location.search).get("transport") === "ws";
     
     this.initializeElements();
     this.bindEvents();
@@ -34,6 +155,9 @@ class RaceTimerApp {
       totalLaps: document.getElementById("totalLaps"),
       btnStart: document.getElementById("btnStart"),
       btnReset: document.getElementById("btnReset"),
+      btnEnqueue: document.getElementById("btnEnqueue"),
+      heatQueue: document.getElementById("heatQueue"),
+      heatChangeover: document.getElementById("heatChangeover"),
       toastHost: document.getElementById("toastHost")
     };
   }
@@ -41,6 +165,7 @@ class RaceTimerApp {
   bindEvents() {
     this.elements.btnStart.onclick = () => this.startRace();
     this.elements.btnReset.onclick = () => this.resetRace();
+    this.elements.btnEnqueue.onclick = () => this.enqueueHeat();
     
     // 엔터키로 레이스 시작
     this.elements.driverName.onkeypress = (e) => {
@@ -122,6 +247,16 @@ class RaceTimerApp {
   
   async makeRequest(url, options = {}) {
     try {
+      // WebSocket 연결 중이면 START / 랩 / 리더보드 조회는 같은 연결로 (응답 형식은 HTTP 와 같음)
+      const viaWs = this.eventSource instanceof WsEventSource && this.eventSource.route(url, options);
+      if (viaWs) {
+        const { status, body } = await viaWs;
+        if (status >= 400) {
+          throw new Error(body.error || `HTTP ${status}`);
+        }
+        return body;
+      }
+      
       const response = await fetch(this.BASE_URL + url, {
         headers: {
           'Content-Type': 'application/json',
@@ -361,6 +496,53 @@ class RaceTimerApp {
     }
   }
   
+  async enqueueHeat() {
+    const validation = this.validateInputs();
+    
+    if (!validation.valid) {
+      validation.errors.forEach(error => {
+        this.showToast(error, "warning");
+      });
+      return;
+    }
+    
+    try {
+      await this.makeRequest("/api/heats", {
+        method: "POST",
+        body: JSON.stringify({
+          name: validation.name,
+          laps: validation.laps
+        })
+      });
+      this.showToast(`${validation.name}님이 대기열에 추가되었습니다`, "info");
+      this.elements.driverName.value = "";
+    } catch (error) {
+      console.error("Failed to enqueue heat:", error);
+      this.showToast(`대기열 추가 실패: ${error.message}`, "error");
+    }
+  }
+  
+  async fetchHeats() {
+    try {
+      this.renderHeats(await this.makeRequest("/api/heats"));
+    } catch (error) {
+      console.error("Failed to fetch heats:", error);
+    }
+  }
+  
+  renderHeats(data) {
+    const list = this.elements.heatQueue;
+    list.innerHTML = "";
+    (data.queue || []).forEach((heat) => {
+      const li = document.createElement("li");
+      li.textContent = `${heat.name} (${heat.laps}랩)`;
+      list.appendChild(li);
+    });
+    this.elements.heatChangeover.textContent = data.last_changeover_ms != null
+        ? `· 교체 ${(data.last_changeover_ms / 1000).toFixed(1)}s`
+        : "";
+  }
+  
   async resetRace() {
     if (!confirm("정말로 모든 데이터를 초기화하시겠습니까?")) {
       return;
@@ -406,7 +588,12 @@ class RaceTimerApp {
     
     try {
       // 새로운 EventSource 생성
-      this.eventSource = new EventSource(this.BASE_URL + "/events");
+      if (this.useWebSocket) {
+        const base = this.BASE_URL || window.location.origin;
+        this.eventSource = new WsEventSource(base.replace(/^http/, "ws") + "/ws");
+      } else {
+        this.eventSource = new EventSource(this.BASE_URL + "/events");
+      }
       
       this.setupEventListeners();
       
@@ -501,10 +688,22 @@ class RaceTimerApp {
         this.elements.statusLine.textContent = "레이스 완료";
         this.showToast("레이스가 완료되었습니다!", "success");
         
+        const finishedRunner = this.currentRunner;
+        
         // 잠시 대기 후 결과 처리
         setTimeout(async () => {
           try {
-            const result = await this.makeRequest("/laps");
+            let result = await this.makeRequest("/laps");
+            if (finishedRunner && result.name !== finishedRunner) {
+              // 대기열에서 다음 참가자가 이미 지정됨 → 리더보드에서 결과 조회
+              const board = await this.makeRequest("/result");
+              const entry = board.find((row) => row.name === finishedRunner);
+              result = {
+                name: finishedRunner,
+                avg_lap_time: entry ? entry.avg_lap_time * 1000 : 0,
+                rank: entry ? entry.rank : "N/A",
+              };
+            }
             
             this.elements.rcName.textContent = result.name || "-";
             this.elements.rcAvg.textContent = result.avg_lap_time > 0 
@@ -517,11 +716,13 @@ class RaceTimerApp {
             this.elements.resultBox.style.display = "block";
             await this.fetchLeaderboard();
             
-            // 🔥 중요: UI 상태를 idle로 복구 및 버튼 활성화
-            this.raceState = 'idle';
-            this.elements.btnStart.disabled = false;
-            this.elements.btnStart.textContent = "경주 시작하기";
-            this.elements.statusLine.textContent = "준비 완료";
+            // 🔥 중요: UI 상태를 idle로 복구 및 버튼 활성화 (다음 히트가 이미 지정됐으면 유지)
+            if (this.raceState === 'finished') {
+              this.raceState = 'idle';
+              this.elements.btnStart.disabled = false;
+              this.elements.btnStart.textContent = "경주 시작하기";
+              this.elements.statusLine.textContent = "준비 완료";
+            }
             
             console.log("✅ race_ended 처리 완료 - 다음 레이스 준비됨");
             
@@ -537,10 +738,48 @@ class RaceTimerApp {
       }
     });
     
+    // target_set 이벤트 (수동 시작 또는 대기열 자동 진행으로 다음 참가자 지정)
+    this.eventSource.addEventListener("target_set", (ev) => {
+      const data = JSON.parse(ev.data);
+      this.currentRunner = data.name;
+      if (this.raceState !== 'waiting') {
+        // 대기열 자동 진행: 이전 레이스 결과는 남겨두고 랩 목록만 새로
+        this.stopUiTimer();
+        this.raceState = 'waiting';
+        this.lapCount = 0;
+        this.lapTimes = [];
+        this.ensureLapTable().innerHTML = "";
+        this.elements.mainTimer.textContent = "00:00.000";
+        this.elements.btnStart.disabled = true;
+        this.elements.btnStart.textContent = "레이스 진행 중";
+        this.elements.statusLine.textContent = `다음 참가자: ${data.name} (센서 감지 대기 중)`;
+      }
+    });
+    
+    // heats 이벤트 (대기열 상태)
+    this.eventSource.addEventListener("heats", (ev) => {
+      this.renderHeats(JSON.parse(ev.data));
+    });
+    
+    // config_updated 이벤트 (서버 설정 파일 리로드)
+    this.eventSource.addEventListener("config_updated", async () => {
+      console.log("🔧 서버 설정 변경 감지");
+      await this.fetchConfig();
+      this.showToast("서버 설정이 변경되었습니다", "info");
+    });
+    
     console.log("✅ SSE 이벤트 리스너 설정 완료");
   }
   
   handleSSEError() {
+    // WebSocket 이 한 번도 열리지 않았다면 서버에 /ws 가 없는 것 → SSE 로 전환
+    if (this.useWebSocket && this.eventSource && !this.eventSource.opened) {
+      console.log("ℹ️ WebSocket 사용 불가 → SSE 로 전환");
+      this.useWebSocket = false;
+      this.connectToSSE();
+      return;
+    }
+    
     if (this.eventSource && this.eventSource.readyState === EventSource.CLOSED) {
       console.log("🔄 SSE 연결이 끊어졌습니다. 재연결 시도...");
       
@@ -597,6 +836,7 @@ class RaceTimerApp {
       
       await this.fetchConfig();
       await this.fetchLeaderboard();
+      await this.fetchHeats();
       this.ensureLapTable();
       this.connectToSSE(); // 개선된 연결 함수 사용
       
@@ -16,6 +16,9 @@ unsigned long lapStartTime = 0;
 unsigned long lastDetectionTime = 0;  // 마지막 감지 시간
 bool isObjectDetected = false;        // 현재 객체 감지 상태
 
+// 텔레메트리: 켜면 loop() 마다 거리값을 "D:<cm>" 로 전송 (랩 누락/중복 원인 분석용)
+bool telemetryOn = false;
+
 void setup() {
   pinMode(TRIG_PIN, OUTPUT);
   pinMode(ECHO_PIN, INPUT);
@@ -53,9 +56,25 @@ void loop() {
       lastDetectionTime = 0;
       isObjectDetected = false;
       Serial.println("WAITING_FOR_TRIGGER");
+    } else if (cmd.startsWith("PING")) {
+      // 링크 품질 측정용 에코 (serial_port_checker.py --benchmark)
+      // "PING <seq> <t>" 를 받은 그대로 "PONG <seq> <t>" 로 돌려줌
+      cmd.trim();
+      Serial.print("PONG");
+      Serial.println(cmd.substring(4));
+    } else if (cmd.startsWith("TELEMETRY")) {
+      // "TELEMETRY ON" / "TELEMETRY OFF"
+      cmd.trim();
+      telemetryOn = cmd.endsWith("ON");
+      Serial.println(telemetryOn ? "TELEMETRY_ON" : "TELEMETRY_OFF");
     }
   }
 
+  if (telemetryOn) {
+    Serial.print("D:");
+    Serial.println(distance);
+  }
+
   // 대기 상태에서 첫 번째 감지 (쿨다운 적용)
   if (isWaiting && distance < 15) {
     if (!isObjectDetected && canDetectNewLap(currentTime)) {
@@ -2,15 +2,29 @@
 """
 시리얼 포트 확인 및 테스트 도구
 RC Tracker 프로젝트용 시리얼 포트 진단 유틸리티
+
+링크 품질 벤치마크 (펌웨어의 PING → PONG 에코 사용):
+    python serial_port_checker.py --benchmark COM5 COM7 --bauds 9600,38400 --count 200 --rate 10 --json link.json
+    python serial_port_checker.py --benchmark socket://127.0.0.1:7777    # 에뮬레이터
 """
 
+import argparse
+import json
 import serial
 import serial.tools.list_ports
+import threading
 import time
 import sys
 import platform
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
+
+# 벤치마크 기본값: 펌웨어 loop() 가 50ms 마다 한 줄씩 읽으므로 초당 20개를 넘기면 밀린다
+BENCH_RATE = 10.0          # 초당 프로브 수
+BENCH_COUNT = 100          # 보드레이트마다 보낼 프로브 수
+BENCH_TIMEOUT = 2.0        # 마지막 프로브 이후 응답을 기다리는 시간 (초)
+BENCH_SETTLE = 2.0         # 포트를 연 뒤 대기 (USB 아두이노는 DTR 로 리셋됨, 블루투스는 링크 연결)
+MAX_PROBE_SIZE = 60        # 아두이노 수신 버퍼(64바이트)를 넘지 않게
 
 
 @dataclass
@@ -27,6 +41,24 @@ class SerialPortInfo:
     error_message: str = ""
 
 
+@dataclass
+class LinkBenchmarkResult:
+    """포트 + 보드레이트 하나의 링크 품질 측정 결과 (시간 단위 ms)"""
+    port: str
+    baudrate: int
+    sent: int = 0
+    received: int = 0
+    duplicates: int = 0
+    other_lines: int = 0             # PONG 이 아닌 줄 (LAP 등) 또는 깨진 줄 - 보드레이트 불일치 의심
+    loss_pct: float = 100.0
+    rtt_ms: Dict[str, float] = field(default_factory=dict)   # min/p50/p90/p99/max/mean
+    jitter_ms: Optional[float] = None
+    tx_bytes_per_s: float = 0.0
+    rx_bytes_per_s: float = 0.0
+    duration_s: float = 0.0
+    error: str = ""
+
+
 class SerialPortChecker:
     """시리얼 포트 확인 및 테스트 클래스"""
 
@@ -181,6 +213,161 @@ class SerialPortChecker:
         except Exception as e:
             print(f"❌ 포트 테스트 실패: {e}")
 
+    # ── 링크 품질 벤치마크 ─────────────────────────────────
+    def benchmark_link(self, port: str, baudrate: int = 9600, count: int = BENCH_COUNT,
+                       rate: float = BENCH_RATE, probe_size: int = 0,
+                       timeout: float = BENCH_TIMEOUT, settle: float = BENCH_SETTLE) -> LinkBenchmarkResult:
+        """
+        "PING <seq> <송신 시각 µs>" 를 rate 간격으로 count 개 보내고 PONG 으로 돌아온 것을 측정
+        - 송신 시각이 프로브 안에 있으므로 응답 순서가 바뀌거나 빠져도 각각 RTT 계산 가능
+        - jitter: seq 순으로 이웃한 두 RTT 차이의 평균 (RFC 3550 의 패킷 간 지연 변동과 같은 개념)
+        - probe_size: 줄 길이(CRLF 포함)를 이만큼 채움 (0 = 패딩 없음)
+        """
+        result = LinkBenchmarkResult(port=port, baudrate=baudrate)
+        print(f"\n📶 {port} @ {baudrate} 링크 측정 중... (프로브 {count}개, {rate:g}/s)")
+
+        try:
+            ser = serial.serial_for_url(port, baudrate=baudrate, timeout=0.1)
+        except Exception as e:
+            result.error = f"포트 열기 실패: {e}"
+            print(f"❌ {result.error}")
+            return result
+
+        rtts: Dict[int, float] = {}
+        tx_bytes = rx_bytes = 0
+        sending_done = threading.Event()
+
+        def sender():
+            nonlocal tx_bytes
+            interval = 1.0 / rate if rate > 0 else 0.0
+            next_at = time.perf_counter()
+            for seq in range(count):
+                line = f"PING {seq} {time.perf_counter_ns() // 1000}"
+                pad = probe_size - len(line) - 3   # " " + CRLF
+                if pad > 0:
+                    line += " " + "x" * pad
+                data = (line + "\r\n").encode()
+                try:
+                    ser.write(data)
+                except Exception as e:
+                    result.error = f"송신 실패: {e}"
+                    break
+                tx_bytes += len(data)
+                result.sent += 1
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            sending_done.set()
+
+        with ser:
+            time.sleep(settle)
+            ser.reset_input_buffer()
+            started = time.perf_counter()
+            threading.Thread(target=sender, daemon=True).start()
+
+            deadline = None
+            while True:
+                if sending_done.is_set():
+                    if deadline is None:
+                        deadline = time.perf_counter() + timeout
+                    if len(rtts) >= result.sent or time.perf_counter() >= deadline:
+                        break
+                try:
+                    raw = ser.readline()
+                except Exception as e:
+                    result.error = f"수신 실패: {e}"
+                    break
+                now_us = time.perf_counter_ns() // 1000
+                if not raw:
+                    continue
+                rx_bytes += len(raw)
+                parts = raw.decode("ascii", errors="replace").split()
+                try:
+                    if parts[0] != "PONG":
+                        raise ValueError
+                    seq, sent_us = int(parts[1]), int(parts[2])
+                except (IndexError, ValueError):
+                    result.other_lines += 1
+                    continue
+                if seq in rtts or not 0 <= seq < count:
+                    result.duplicates += 1
+                    continue
+                rtts[seq] = (now_us - sent_us) / 1000
+            result.duration_s = round(time.perf_counter() - started, 3)
+
+        result.received = len(rtts)
+        if result.sent:
+            result.loss_pct = round((result.sent - result.received) / result.sent * 100, 2)
+        if result.duration_s:
+            result.tx_bytes_per_s = round(tx_bytes / result.duration_s, 1)
+            result.rx_bytes_per_s = round(rx_bytes / result.duration_s, 1)
+        if rtts:
+            ordered = [rtts[seq] for seq in sorted(rtts)]
+            samples = sorted(ordered)
+            result.rtt_ms = {
+                "min": round(samples[0], 2),
+                "p50": round(_percentile(samples, 50), 2),
+                "p90": round(_percentile(samples, 90), 2),
+                "p99": round(_percentile(samples, 99), 2),
+                "max": round(samples[-1], 2),
+                "mean": round(sum(samples) / len(samples), 2),
+            }
+            if len(ordered) > 1:
+                diffs = [abs(b - a) for a, b in zip(ordered, ordered[1:])]
+                result.jitter_ms = round(sum(diffs) / len(diffs), 2)
+
+        if result.error:
+            print(f"⚠️  {result.error}")
+        print(f"   수신 {result.received}/{result.sent} (손실 {result.loss_pct}%), "
+              f"RTT p50 {result.rtt_ms.get('p50', '-')} ms, p99 {result.rtt_ms.get('p99', '-')} ms")
+        return result
+
+    def benchmark_ports(self, ports: List[str], baudrates: List[int], **options) -> List[LinkBenchmarkResult]:
+        """후보 포트 × 보드레이트 조합을 차례로 측정"""
+        return [self.benchmark_link(port, baudrate, **options) for port in ports for baudrate in baudrates]
+
+    def display_benchmark(self, results: List[LinkBenchmarkResult]):
+        """측정 결과를 나란히 비교 출력 (손실 → p99 순으로 좋은 것부터)"""
+        if not results:
+            return
+        print(f"\n📊 링크 품질 비교 ({len(results)}개 조합):")
+        print("=" * 108)
+        print(f"{'포트':<28} {'baud':>7} {'손실%':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} "
+              f"{'jitter':>7} {'rx B/s':>8} {'기타줄':>6}")
+        for r in sorted(results, key=_benchmark_rank):
+            rtt = r.rtt_ms
+            cells = [f"{rtt[k]:>8.1f}" if k in rtt else f"{'-':>8}" for k in ("p50", "p90", "p99", "max")]
+            jitter = f"{r.jitter_ms:>7.1f}" if r.jitter_ms is not None else f"{'-':>7}"
+            print(f"{r.port:<28} {r.baudrate:>7} {r.loss_pct:>6.1f} {' '.join(cells)} "
+                  f"{jitter} {r.rx_bytes_per_s:>8.0f} {r.other_lines:>6}" + (f"  ❌ {r.error}" if r.error else ""))
+
+        best = self.best_link(results)
+        if best:
+            print(f"\n🏆 추천: {best.port} @ {best.baudrate} "
+                  f"(손실 {best.loss_pct}%, p99 {best.rtt_ms['p99']} ms)")
+        else:
+            print("\n❌ 응답한 포트가 없습니다. 펌웨어가 PING 을 지원하는지, 보드레이트가 맞는지 확인하세요.")
+
+    @staticmethod
+    def best_link(results: List[LinkBenchmarkResult]) -> Optional[LinkBenchmarkResult]:
+        candidates = [r for r in results if r.received and not r.error]
+        return min(candidates, key=_benchmark_rank) if candidates else None
+
+    def save_benchmark(self, results: List[LinkBenchmarkResult], path: str, params: Dict):
+        """측정 결과를 JSON 으로 저장 (히트 전에 포트/어댑터 비교용)"""
+        best = self.best_link(results)
+        report = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "host": platform.node(),
+            "params": params,
+            "results": [asdict(r) for r in results],
+            "best": {"port": best.port, "baudrate": best.baudrate} if best else None,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {path}")
+
     def check_permissions(self):
         """권한 상태 확인"""
         print("\n🔐 권한 상태 확인:")
@@ -241,8 +428,61 @@ class SerialPortChecker:
             print("3. 장치 관리자에서 드라이버 상태 확인")
 
 
+def _percentile(samples: List[float], q: float) -> float:
+    """정렬된 값의 q 퍼센타일 (선형 보간)"""
+    pos = (len(samples) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(samples) - 1)
+    return samples[lo] + (samples[hi] - samples[lo]) * (pos - lo)
+
+
+def _benchmark_rank(result: LinkBenchmarkResult):
+    # 손실이 적은 것 → 꼬리 지연(p99)이 짧은 것 → jitter 가 작은 것
+    return (result.loss_pct, result.rtt_ms.get("p99", float("inf")),
+            result.jitter_ms if result.jitter_ms is not None else float("inf"))
+
+
+def run_benchmark(args):
+    """--benchmark 모드: 후보 포트들을 측정하고 비교"""
+    print("📶 RC Tracker 시리얼 링크 품질 벤치마크")
+    print("=" * 50)
+
+    checker = SerialPortChecker()
+    ports = args.benchmark
+    if ports == ["auto"]:
+        checker.scan_ports()
+        ports = [p.device for p in checker.get_arduino_ports() if p.accessible]
+        if not ports:
+            print("❌ 측정할 아두이노/블루투스 포트가 없습니다.")
+            return
+    baudrates = [int(b) for b in args.bauds.split(",")]
+    options = dict(count=args.count, rate=args.rate, probe_size=min(args.size, MAX_PROBE_SIZE),
+                   timeout=args.timeout, settle=args.settle)
+
+    results = checker.benchmark_ports(ports, baudrates, **options)
+    checker.display_benchmark(results)
+    if args.json:
+        checker.save_benchmark(results, args.json, {"ports": ports, "baudrates": baudrates, **options})
+
+
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="RC Tracker 시리얼 포트 진단 도구")
+    parser.add_argument("--benchmark", nargs="+", metavar="PORT",
+                        help="링크 품질 측정할 포트들 (COM5, /dev/rfcomm0, socket://host:port, auto = 자동 검색)")
+    parser.add_argument("--bauds", default="9600", help="측정할 보드레이트 (쉼표 구분, 예: 9600,38400,115200)")
+    parser.add_argument("--count", type=int, default=BENCH_COUNT, help="보드레이트마다 보낼 프로브 수")
+    parser.add_argument("--rate", type=float, default=BENCH_RATE, help="초당 프로브 수")
+    parser.add_argument("--size", type=int, default=0, help=f"프로브 줄 길이 (최대 {MAX_PROBE_SIZE}, 0 = 최소)")
+    parser.add_argument("--timeout", type=float, default=BENCH_TIMEOUT, help="마지막 프로브 후 응답 대기 (초)")
+    parser.add_argument("--settle", type=float, default=BENCH_SETTLE, help="포트를 연 뒤 대기 (초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args)
+        return
+
     print("🚗 RC Tracker 시리얼 포트 진단 도구")
     print("=" * 50)
 
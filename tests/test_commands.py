@@ -0,0 +1,30 @@
+# tests/test_commands.py
+import time
+
+import pytest
+
+from app.bluetooth import communication, listener
+from app.bluetooth.commands import CommandChannel, CommandError
+from app.bluetooth.state import runner
+
+
+def test_write_failure_fails_immediately():
+    channel = CommandChannel(lambda cmd: False)
+    t0 = time.perf_counter()
+    future = channel.request("START 3", "WAITING_FOR_TRIGGER", timeout=2.0, retries=2)
+    with pytest.raises(CommandError):
+        future.result(timeout=0.5)
+    assert time.perf_counter() - t0 < 0.5
+    # 실패한 요청이 응답 대기열에 남지 않음
+    assert not channel.on_line("WAITING_FOR_TRIGGER")
+
+
+def test_failed_start_keeps_previous_target(monkeypatch):
+    monkeypatch.setattr(listener, "SER_HANDLE", None)
+    runner["name"], runner["total_laps"] = "previous", 3
+    try:
+        with pytest.raises(CommandError):
+            communication.set_target_runner("next", 5).result(timeout=0.5)
+        assert (runner["name"], runner["total_laps"]) == ("previous", 3)
+    finally:
+        runner["name"], runner["total_laps"] = None, 0
@@ -0,0 +1,57 @@
+# tests/test_heats.py
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from app import heats
+from app.bluetooth import communication
+from app.bluetooth.commands import CommandError
+
+
+@pytest.fixture
+def flaky_start(monkeypatch):
+    """처음 두 번은 START 실패, 그 다음부터 성공"""
+    calls = []
+
+    def set_target_runner(name, laps):
+        calls.append(name)
+        future = Future()
+        if len(calls) <= 2:
+            future.set_exception(CommandError("Serial port not open"))
+        else:
+            future.set_result(1.0)
+        return future
+
+    monkeypatch.setattr(communication, "set_target_runner", set_target_runner)
+    monkeypatch.setattr(heats, "RETRY_BASE", 0.05)
+    monkeypatch.setattr(heats, "_publish", lambda: None)
+    yield calls
+    heats.clear()
+    heats._state.update(current=None, finished_at=None, stalled=None, auto_advance=True)
+
+
+def test_failed_start_is_retried_with_backoff(flaky_start):
+    heats.enqueue("tester", 3)
+    heats.advance()
+
+    stalled = heats.snapshot()["stalled"]
+    assert stalled["name"] == "tester" and stalled["attempts"] == 1 and stalled["retry_in_s"] == 0.05
+    assert heats.snapshot()["queue"][0]["name"] == "tester"
+
+    deadline = time.monotonic() + 2
+    while len(flaky_start) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    snap = heats.snapshot()
+    assert flaky_start == ["tester"] * 3
+    assert snap["stalled"] is None
+    assert snap["queue"] == [] and snap["current"]["name"] == "tester"
+
+
+def test_no_retry_without_auto_advance(flaky_start):
+    heats.set_auto_advance(False)
+    heats.enqueue("tester", 3)
+    heats.advance()
+    time.sleep(0.2)
+    assert flaky_start == ["tester"]
+    assert heats.snapshot()["stalled"]["retry_in_s"] is None
@@ -0,0 +1,33 @@
+# tests/test_history.py
+import pytest
+
+from app import history
+
+
+@pytest.fixture
+def history_file(tmp_path, monkeypatch):
+    path = tmp_path / "races.bin"
+    monkeypatch.setattr(history, "HISTORY_FILE", path)
+    monkeypatch.setattr(history, "LEGACY_HISTORY_FILE", tmp_path / "races.ndjson")
+    monkeypatch.setattr(history, "_store", None)
+    return path
+
+
+def _reload(monkeypatch):
+    monkeypatch.setattr(history, "_store", None)
+    return history.get_store()
+
+
+def test_torn_tail_is_truncated_before_next_append(history_file, monkeypatch):
+    for i in range(3):
+        history.append_race(f"drv{i}", 3, [1000, 2000, 3000 + i], None)
+    # 마지막 레코드를 쓰는 도중 전원이 꺼진 것처럼 꼬리를 자름
+    history_file.write_bytes(history_file.read_bytes()[:-6])
+
+    store = _reload(monkeypatch)
+    assert store.names == ["drv0", "drv1"]
+    history.append_race("next", 3, [1000, 2000, 3000], None)
+
+    store = _reload(monkeypatch)
+    assert [store.record(i).name for i in range(len(store))] == ["drv0", "drv1", "next"]
+    assert store.record(2).lap_times.tolist() == [1000, 2000, 3000]
@@ -0,0 +1,77 @@
+# tests/test_journal.py
+import pytest
+
+from app import history, journal, leaderboard
+from app.bluetooth import listener
+from app.bluetooth.state import runner, lap_data
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_FILE", tmp_path / "races.bin")
+    monkeypatch.setattr(history, "LEGACY_HISTORY_FILE", tmp_path / "races.ndjson")
+    monkeypatch.setattr(history, "_store", None)
+    monkeypatch.setattr(leaderboard, "LEADERBOARD_FILE", tmp_path / "leaderboard.json")
+    yield tmp_path
+    monkeypatch.setattr(journal, "_journal", None)
+    runner["name"], runner["total_laps"] = None, 0
+    lap_data.clear()
+
+
+def _finish_race(path):
+    """레이스를 끝까지 진행하고 RESULT_SAVED 가 커밋되기 전에 죽은 것처럼 저널을 남김"""
+    j = journal.recover(str(path), leaderboard.insert_result)
+    j.target_set("tester", 3)
+    runner["name"], runner["total_laps"] = "tester", 3
+    lap_data.clear()
+    listener.handle_message("RACE_STARTED", leaderboard.insert_result)
+    for ms in (1000, 2100, 3300):
+        listener.handle_message(f"LAP:{ms}", leaderboard.insert_result)
+    assert j.flush(timeout=2)
+    # RESULT_SAVED 는 아직 커밋되지 않았음 → 저널에서 지움
+    data = path.read_bytes()
+    records = list(journal.iter_records(data))
+    if records[-1][0] == journal.RESULT_SAVED:
+        path.write_bytes(data[:records[-2][2]])
+
+
+def test_recover_does_not_duplicate_saved_result(data_dir):
+    path = data_dir / "race.journal"
+    _finish_race(path)
+    assert len(history.get_store()) == 1 and len(leaderboard.load_leaderboard()) == 1
+
+    journal.recover(str(path), leaderboard.insert_result)
+    assert len(history.get_store()) == 1
+    assert len(leaderboard.load_leaderboard()) == 1
+
+
+def test_recover_saves_missing_leaderboard_entry(data_dir):
+    path = data_dir / "race.journal"
+    _finish_race(path)
+    leaderboard.save_leaderboard([])   # 기록 저장 후 리더보드 저장 전에 죽은 경우
+
+    journal.recover(str(path), leaderboard.insert_result)
+    assert len(history.get_store()) == 1
+    board = leaderboard.load_leaderboard()
+    assert [(e["name"], e["race_id"]) for e in board] == [("tester", 0)]
+
+
+def test_flush_reports_failed_commit(tmp_path, monkeypatch):
+    j = journal.Journal(tmp_path / "race.journal")
+    j.start()
+    j.target_set("tester", 3)
+    assert j.flush(timeout=2)
+
+    def fail(batch):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(j, "_commit", fail)
+    j.lap(1000)
+    with pytest.raises(OSError):
+        j.flush(timeout=2)
+    assert j._committed == 1
+
+    # 다음 레이스(새 파일로 교체)가 기록되면 이전 실패는 더 이상 해당 없음
+    monkeypatch.undo()
+    j.target_set("next", 3)
+    assert j.flush(timeout=2)
@@ -0,0 +1,26 @@
+# tests/test_listener.py
+import pytest
+
+from app.bluetooth import listener
+from app.bluetooth.state import runner, lap_data
+
+
+@pytest.fixture
+def racing():
+    runner["name"], runner["total_laps"] = "tester", 5
+    lap_data.clear()
+    yield
+    runner["name"], runner["total_laps"] = None, 0
+    lap_data.clear()
+
+
+@pytest.mark.parametrize("line", ["LAP:-5", "LAP:5000000000", "LAP:abc"])
+def test_invalid_lap_is_ignored(racing, line):
+    # 범위를 벗어난 값도 예외 없이 무시 (리스너 루프가 포트를 닫으면 안 됨)
+    listener.handle_message(line, lambda *a: pytest.fail("결과 저장이 호출되면 안 됨"))
+    assert len(lap_data["tester"]) == 0
+
+
+def test_valid_lap_is_recorded(racing):
+    listener.handle_message("LAP:4294967295", lambda *a: None)
+    assert lap_data["tester"].tolist() == [4294967295]
@@ -0,0 +1,14 @@
+# tests/test_results.py
+from array import array
+
+import numpy as np
+
+from app.results import lap_splits, lap_stats
+
+
+def test_lap_stats_uses_same_splits_as_analytics():
+    # 누적 ms: 첫 구간 8000 (RACE_STARTED 기준), 뒤로 가는 값은 0 구간
+    laps = [8000, 17000, 16900, 25500]
+    splits = lap_splits(np.array(laps), np.array([0, len(laps)]), np.array([len(laps)]))
+    assert splits.tolist() == [8000, 9000, 0, 8600]
+    assert lap_stats(array("I", laps)) == (int(splits.sum()) // len(laps), int(splits.min()))